@@ -6,13 +6,53 @@ from allauth.socialaccount.helpers import ImmediateHttpResponse
 from django.shortcuts import redirect
 import logging
 from datetime import datetime
-from django.template.loader import render_to_string
 from django.conf import settings
-from django.core.mail import EmailMessage
+from django.contrib.sites.shortcuts import get_current_site
+from allauth.core import context as allauth_context
+from allauth.socialaccount.internal import jwtkit
+from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
+from allauth.socialaccount.providers.oauth2.client import OAuth2Error
+import jwt
+
+from core.email_rendering import WELCOME_EMAIL, get_email_template
+from core.http import get_session
+from core.jwks import JWKSCache, decode_id_token
+from core.mail import enqueue_email
 
 logger = logging.getLogger(__name__)
 
+google_jwks = JWKSCache(settings.GOOGLE_JWKS_URL, ttl=settings.GOOGLE_JWKS_TTL)
+
+
+class LocalGoogleOAuth2Adapter(GoogleOAuth2Adapter):
+    """
+    GoogleOAuth2Adapter verifying ID tokens against Google's signing keys
+    cached in memory, instead of downloading the certificates on every login.
+    """
+
+    def _decode_id_token(self, app, id_token):
+        try:
+            data = decode_id_token(
+                id_token,
+                google_jwks,
+                audience=app.client_id,
+                issuer=settings.GOOGLE_ID_TOKEN_ISSUERS,
+            )
+        except jwt.PyJWTError as e:
+            raise OAuth2Error("Invalid id_token") from e
+        # Same replay protection as allauth's own verification.
+        jwtkit.verify_jti(data)
+        return data
+
+
 class CustomSocialAccountAdapter(DefaultSocialAccountAdapter):
+    def get_requests_session(self):
+        """
+        Token exchanges, userinfo and certificate fetches go through the
+        process-wide keep-alive session instead of a new one per call.
+        """
+        return get_session()
+
     def pre_social_login(self, request, sociallogin):
         # If there's already a social account linked, `sociallogin.is_existing` is True.
         # The default flows might raise `assert not sociallogin.is_existing`.
@@ -52,7 +92,6 @@ class CustomSocialAccountAdapter(DefaultSocialAccountAdapter):
         """
         Sends a welcome email to the newly registered user.
         """
-        subject = 'Welcome to Our Platform!'
         from_email = settings.DEFAULT_FROM_EMAIL
         to_email = user.email
 
@@ -63,25 +102,44 @@ class CustomSocialAccountAdapter(DefaultSocialAccountAdapter):
         }
 
         try:
-            # Render the HTML template
-            html_content = render_to_string('account/email/welcome.html', context)
-
-            # Create the email message
-            email = EmailMessage(
-                subject=subject,
-                body=html_content,
-                from_email=from_email,
-                to=[to_email],
-            )
-            email.content_subtype = 'html'  # Set the content subtype to HTML
+            # Render the precompiled welcome templates (subject, text, HTML)
+            email = WELCOME_EMAIL.build_message(to_email, context, from_email=from_email)
 
-            # Send the email
-            email.send(fail_silently=False)
-            logger.info(f"Welcome email sent to {user.email}")
+            # Queue the email; `send_queued_mail` delivers it
+            enqueue_email(email)
+            logger.info(f"Welcome email queued for {user.email}")
         except Exception as e:
-            logger.error(f"Failed to send welcome email to {user.email}: {e}")
+            logger.error(f"Failed to queue welcome email for {user.email}: {e}")
 
 class CustomAccountAdapter(DefaultAccountAdapter):
+    def send_mail(self, template_prefix, email, context):
+        """
+        Same as allauth's send_mail, but queues the message in the outbox
+        instead of talking to the mail relay during the request.
+        """
+        request = allauth_context.request
+        ctx = {
+            "request": request,
+            "email": email,
+            "current_site": get_current_site(request),
+        }
+        ctx.update(context)
+        msg = self.render_mail(template_prefix, email, ctx)
+        enqueue_email(msg)
+
+    def render_mail(self, template_prefix, email, context, headers=None):
+        """
+        Renders through the templates compiled once per process in
+        core.email_rendering instead of three render_to_string calls.
+        """
+        return get_email_template(template_prefix).build_message(
+            email,
+            context,
+            from_email=self.get_from_email(),
+            headers=headers,
+            subject_format=self.format_email_subject,
+        )
+
     def get_email_confirmation_url(self, request, emailconfirmation):
         """
         Constructs the email confirmation (activation) url.
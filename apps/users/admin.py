@@ -3,18 +3,31 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from unfold.admin import ModelAdmin as UnfoldModelAdmin
 
 from import_export.admin import ImportExportModelAdmin
-from import_export import resources
+
+from core.admin_mixins import DataJobMixin, EstimatedCountMixin, QueryBudgetMixin, StreamingImportExportMixin
+from core.authentication import invalidate_user_snapshot
+from core.backends.auth import bump_permission_versions
+from core.resources import ChunkedModelResource
+from core.search import TrigramSearchMixin
 
 from .models import User, Address, Phone
 
 
 # 1. Define Import-Export Resources
-class UserResource(resources.ModelResource):
+class UserResource(ChunkedModelResource):
+    """
+    Users are written in bulk, without User.save() or the post_save
+    receivers, so what they do for a user is done here: setting
+    tos_accepted_at, and expiring the updated users' cached snapshots and
+    permissions.
+    """
+
     class Meta:
         model = User
         fields = (
@@ -25,8 +38,34 @@ class UserResource(resources.ModelResource):
         )
         export_order = fields
 
-
-class AddressResource(resources.ModelResource):
+    def init_instance(self, row=None):
+        # Imported accounts sign in after a password reset.
+        instance = super().init_instance(row)
+        instance.set_unusable_password()
+        return instance
+
+    def before_import(self, dataset, **kwargs):
+        super().before_import(dataset, **kwargs)
+        self.updated_pks = []
+
+    def before_save_instance(self, instance, row, **kwargs):
+        super().before_save_instance(instance, row, **kwargs)
+        if instance.tos_accepted and not instance.tos_accepted_at:
+            instance.tos_accepted_at = timezone.now()
+        if not instance._state.adding:
+            self.updated_pks.append(instance.pk)
+
+    def after_import(self, dataset, result, **kwargs):
+        super().after_import(dataset, result, **kwargs)
+        if self._is_dry_run(kwargs):
+            return
+        # Both expire the entries now and again once the chunk commits.
+        bump_permission_versions(self.updated_pks)
+        for pk in self.updated_pks:
+            invalidate_user_snapshot(pk)
+
+
+class AddressResource(ChunkedModelResource):
     class Meta:
         model = Address
         fields = (
@@ -36,8 +75,11 @@ class AddressResource(resources.ModelResource):
         )
         export_order = fields
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('user')
+
 
-class PhoneResource(resources.ModelResource):
+class PhoneResource(ChunkedModelResource):
     class Meta:
         model = Phone
         fields = (
@@ -47,6 +89,9 @@ class PhoneResource(resources.ModelResource):
         )
         export_order = fields
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('content_type')
+
 
 # 2. Define Custom User Forms
 class CustomUserCreationForm(UserCreationForm):
@@ -69,11 +114,16 @@ class CustomUserChangeForm(UserChangeForm):
 
 # 3. Register Custom User Admin
 @admin.register(User)
-class CustomUserAdmin(ImportExportModelAdmin, DjangoUserAdmin):
+class CustomUserAdmin(QueryBudgetMixin, EstimatedCountMixin, TrigramSearchMixin, DataJobMixin, StreamingImportExportMixin, ImportExportModelAdmin, DjangoUserAdmin):
     """
     Custom User Admin integrating:
     - django-import-export for data import/export
     - Inherits from Django's built-in UserAdmin
+    - Search backed by the pg_trgm indexes from migration 0004
+    - Estimated changelist counts on large tables
+    - Query budget on changelist renders
+    - Streaming exports and chunked bulk imports
+    - Large imports/exports queued as background jobs
     """
     resource_class = UserResource
     add_form = CustomUserCreationForm
@@ -105,14 +155,20 @@ class CustomUserAdmin(ImportExportModelAdmin, DjangoUserAdmin):
 
 # 4. Register Address Admin
 @admin.register(Address)
-class AddressAdmin(ImportExportModelAdmin, UnfoldModelAdmin):
+class AddressAdmin(QueryBudgetMixin, EstimatedCountMixin, TrigramSearchMixin, DataJobMixin, StreamingImportExportMixin, ImportExportModelAdmin, UnfoldModelAdmin):
     """
     Address Admin integrating:
     - django-import-export for data import/export
     - django-unfold for enhanced UI
+    - Search on user__email backed by the users_user trigram index
+    - Estimated changelist counts on large tables
+    - Query budget on changelist renders
+    - Streaming exports and chunked bulk imports
+    - Large imports/exports queued as background jobs
     """
     resource_class = AddressResource
     list_display = ('id', 'user', 'address_type', 'full_name', 'city', 'country', 'is_primary')
+    list_select_related = ('user',)
     list_filter = ('address_type', 'is_primary', 'country')
     search_fields = ('full_name', 'city', 'postal_code', 'user__email')
     ordering = ('-is_primary', 'full_name')
@@ -121,15 +177,23 @@ class AddressAdmin(ImportExportModelAdmin, UnfoldModelAdmin):
 
 # 5. Register Phone Admin
 @admin.register(Phone)
-class PhoneAdmin(ImportExportModelAdmin, UnfoldModelAdmin):
+class PhoneAdmin(QueryBudgetMixin, EstimatedCountMixin, DataJobMixin, StreamingImportExportMixin, ImportExportModelAdmin, UnfoldModelAdmin):
     """
     Phone Admin integrating:
     - django-import-export for data import/export
     - django-unfold for enhanced UI
+    - Estimated changelist counts on large tables
+    - Query budget on changelist renders
+    - Streaming exports and chunked bulk imports
+    - Large imports/exports queued as background jobs
     """
     resource_class = PhoneResource
-    list_display = ('id', 'phone_type', 'country_code', 'number', 'is_verified', 'is_primary', 'created_at')
+    list_display = ('id', 'phone_type', 'country_code', 'number', 'content_object', 'is_verified', 'is_primary', 'created_at')
     list_filter = ('phone_type', 'is_verified', 'is_primary')
-    search_fields = ('number', 'user__email')  # Adjust if using GenericForeignKey
+    search_fields = ('number', 'address_owner__user__email')
     ordering = ('-is_primary', 'phone_type')
     readonly_fields = ('id', 'created_at', 'updated_at')
+
+    def get_queryset(self, request):
+        # One query per owner model for the generic FK, not one per row.
+        return super().get_queryset(request).prefetch_related('content_object')
@@ -1,9 +1,15 @@
 # apps/users/api/serializers.py
 
+from dj_rest_auth.jwt_auth import CookieTokenRefreshSerializer
 from dj_rest_auth.serializers import PasswordResetConfirmSerializer
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenVerifySerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import UntypedToken
 from django.utils.translation import gettext_lazy as _
 
+from core.tokens import RefreshToken, is_blacklisted
+
 class CustomPasswordResetConfirmSerializer(PasswordResetConfirmSerializer):
     new_password1 = serializers.CharField(
         required=True,
@@ -24,3 +30,23 @@ class CustomPasswordResetConfirmSerializer(PasswordResetConfirmSerializer):
 
     def save(self, **kwargs):
         return super().save(**kwargs)
+
+
+class CachedTokenRefreshSerializer(CookieTokenRefreshSerializer):
+    """
+    Refresh serializer whose blacklist check goes through the Bloom filter.
+    """
+    token_class = RefreshToken
+
+
+class CachedTokenVerifySerializer(TokenVerifySerializer):
+    """
+    TokenVerifySerializer with the blacklist check going through the Bloom
+    filter.
+    """
+
+    def validate(self, attrs):
+        token = UntypedToken(attrs['token'])
+        if jwt_settings.BLACKLIST_AFTER_ROTATION and is_blacklisted(token.get(jwt_settings.JTI_CLAIM)):
+            raise serializers.ValidationError(_("Token is blacklisted"))
+        return {}
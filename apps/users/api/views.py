@@ -3,6 +3,7 @@ from allauth.account.utils import send_email_confirmation
 from rest_framework.exceptions import APIException
 from rest_framework import status
 
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 from django.views.decorators.debug import sensitive_post_parameters
 from django.utils.decorators import method_decorator
@@ -11,8 +12,14 @@ from rest_framework import status
 from rest_framework.generics import GenericAPIView
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from apps.users.api.serializers import CustomPasswordResetConfirmSerializer
+from rest_framework_simplejwt.views import TokenVerifyView
+from apps.users.api.serializers import (
+    CachedTokenRefreshSerializer,
+    CachedTokenVerifySerializer,
+    CustomPasswordResetConfirmSerializer,
+)
 from dj_rest_auth import app_settings
+from dj_rest_auth.jwt_auth import get_refresh_view
 
 
 class CustomPasswordResetConfirmView(GenericAPIView):
@@ -25,7 +32,7 @@ class CustomPasswordResetConfirmView(GenericAPIView):
     """
     serializer_class = CustomPasswordResetConfirmSerializer
     permission_classes = (AllowAny,)
-    throttle_scope = 'dj_rest_auth'
+    throttle_scope = 'password_reset'
 
     @method_decorator(sensitive_post_parameters('new_password1', 'new_password2'))
     def dispatch(self, *args, **kwargs):
@@ -44,16 +51,26 @@ class CustomPasswordResetConfirmView(GenericAPIView):
         )
 
 class CustomRegisterView(RegisterView):
+    throttle_scope = 'register'
+
     def perform_create(self, serializer):
-        user = serializer.save(self.get_cleaned_data())
-        try:
-            # Attempt to send email confirmation
-            send_email_confirmation(self.request, user)
-        except Exception as e:
-            # If email sending fails, delete the user and raise an error
-            user.delete()
-            raise APIException(
-                detail="Email confirmation could not be sent. Please try again.",
-                code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+        # The confirmation email is written to the outbox in the same
+        # transaction as the user, so both are committed or neither is.
+        with transaction.atomic():
+            user = serializer.save(self.request)
+            try:
+                send_email_confirmation(self.request, user, signup=True)
+            except Exception:
+                raise APIException(
+                    detail="Email confirmation could not be sent. Please try again.",
+                    code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )
         return user
+
+
+class CachedTokenRefreshView(get_refresh_view()):
+    serializer_class = CachedTokenRefreshSerializer
+
+
+class CachedTokenVerifyView(TokenVerifyView):
+    serializer_class = CachedTokenVerifySerializer
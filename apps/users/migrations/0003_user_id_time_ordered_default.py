@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-18 20:17
+
+import core.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_user_is_active'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='id',
+            field=models.UUIDField(default=core.ids.default_uuid, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# Expression indexes matching what Django emits for `field__icontains` on
+# PostgreSQL: UPPER("users_user"."email"::text) LIKE UPPER('%term%').
+SEARCH_COLUMNS = ('email', 'username', 'first_name', 'last_name')
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS users_user_{column}_trgm '
+            f'ON users_user USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS users_user_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and avoids
+    # locking the users table against writes while the indexes build.
+    atomic = False
+
+    dependencies = [
+        ('users', '0003_user_id_time_ordered_default'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
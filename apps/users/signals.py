@@ -1,12 +1,10 @@
 # apps/users/signals.py
 
-from django.conf import settings
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from allauth.account.signals import email_confirmed
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from core.email_rendering import WELCOME_EMAIL
+from core.mail import enqueue_email
 from .models import User
 
 # This signal runs when email is confirmed
@@ -28,20 +26,12 @@ def handle_email_confirmation(sender, request, email_address, **kwargs):
 
 def send_welcome_email(user):
     """Centralized welcome email function"""
-    subject = 'Welcome to Our Platform!'
     context = {
         'user': user,
         'site_name': 'Your Site Name'
     }
-    
-    html_message = render_to_string('account/email/welcome.html', context)
-    plain_message = strip_tags(html_message)
-    
-    send_mail(
-        subject=subject,
-        message=plain_message,
-        html_message=html_message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[user.email],
-        fail_silently=False
-    )
\ No newline at end of file
+
+    email = WELCOME_EMAIL.build_message(user.email, context)
+
+    # Queued, not sent: this runs inside the email confirmation request
+    enqueue_email(email)
\ No newline at end of file
@@ -0,0 +1,46 @@
+# apps/users/tests/test_admin.py
+import pytest
+from django.contrib.admin import site
+from django.urls import reverse
+
+from apps.users.models import Address, Phone, User
+from core.admin_mixins import QueryBudgetExceeded
+
+ROWS = 20
+
+
+@pytest.fixture
+def admin_client(client, db):
+    admin = User.objects.create_superuser(email='admin@example.com', username='admin', password='password')
+    client.force_login(admin)
+    return client
+
+
+@pytest.fixture
+def populated(db):
+    users = User.objects.bulk_create(
+        User(email=f'user{i}@example.com', username=f'user{i}') for i in range(ROWS)
+    )
+    addresses = Address.objects.bulk_create(
+        Address(
+            user=user, full_name=f'User {i}', street_address1='1 Main St',
+            city='Paris', state_province='IDF', postal_code='75001', country='FR',
+        )
+        for i, user in enumerate(users)
+    )
+    for address in addresses:
+        Phone.objects.create(content_object=address, number='0612345678')
+
+
+@pytest.mark.parametrize('model', [User, Address, Phone])
+def test_changelist_stays_within_query_budget(admin_client, populated, model):
+    url = reverse(f'admin:users_{model._meta.model_name}_changelist')
+    response = admin_client.get(url)
+    assert response.status_code == 200
+    assert len(response.context['cl'].result_list) >= ROWS
+
+
+def test_query_budget_catches_n_plus_one(admin_client, populated, monkeypatch):
+    monkeypatch.setattr(site._registry[Address], 'list_select_related', ())
+    with pytest.raises(QueryBudgetExceeded):
+        admin_client.get(reverse('admin:users_address_changelist'))
@@ -0,0 +1,92 @@
+# apps/users/tests/test_async_views.py
+import pytest
+from allauth.account.models import EmailAddress, EmailConfirmationHMAC
+from allauth.socialaccount.models import SocialApp
+from allauth.socialaccount.providers.oauth2.client import OAuth2Client
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory
+
+from apps.users.models import User
+from apps.users.views import AsyncConfirmEmailView, AsyncGoogleLoginView
+
+
+@pytest.fixture
+def email_address(db):
+    user = User.objects.create_user(email='async@example.com', username='async', password='password')
+    return EmailAddress.objects.create(user=user, email=user.email, verified=False, primary=True)
+
+
+def test_async_confirm_email(email_address):
+    view = AsyncConfirmEmailView.as_view()
+    key = EmailConfirmationHMAC(email_address).key
+    request = AsyncRequestFactory().get('/')
+    request._messages = CookieStorage(request)
+
+    response = async_to_sync(view)(request, key=key)
+    assert response.url == f'{settings.WEBSITE_FRONTEND_URL}/email-verified'
+    email_address.refresh_from_db()
+    assert email_address.verified
+
+    # Used keys no longer match an unverified address.
+    response = async_to_sync(view)(request, key=key)
+    assert response.url == f'{settings.WEBSITE_FRONTEND_URL}/email-verification-failed'
+
+
+def test_async_confirm_email_does_not_hide_errors(email_address, monkeypatch):
+    def confirm(self, request):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(EmailConfirmationHMAC, 'confirm', confirm)
+    request = AsyncRequestFactory().get('/')
+    with pytest.raises(RuntimeError):
+        async_to_sync(AsyncConfirmEmailView.as_view())(request, key=EmailConfirmationHMAC(email_address).key)
+
+
+def test_async_google_login_exchanges_code_first(db, monkeypatch):
+    site, _ = Site.objects.get_or_create(pk=settings.SITE_ID, defaults={'domain': 'testserver', 'name': 'test'})
+    SocialApp.objects.create(provider='google', name='Google', client_id='client', secret='secret').sites.add(site)
+    monkeypatch.setattr(
+        OAuth2Client, 'get_access_token',
+        lambda self, code: {'access_token': f'access-{code}', 'id_token': 'id', 'expires_in': 3600},
+    )
+    seen = []
+
+    def login_view(request, exchanged_tokens=None):
+        seen.append(exchanged_tokens)
+        return HttpResponse()
+
+    monkeypatch.setattr(AsyncGoogleLoginView, 'login_view', staticmethod(login_view))
+    request = AsyncRequestFactory().post('/', {'code': 'abc'}, content_type='application/json')
+    response = async_to_sync(AsyncGoogleLoginView.as_view())(request)
+    assert response.status_code == 200
+    assert seen == [{'access_token': 'access-abc', 'id_token': 'id'}]
+
+
+def test_async_google_login_is_throttled_before_the_exchange(db, settings, monkeypatch):
+    cache.clear()
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'google': '1/min'},
+    }
+    exchanged = []
+
+    async def exchange_code(self, request, code):
+        exchanged.append(code)
+        return {'access_token': 'access'}
+
+    def login_view(request, exchanged_tokens=None):
+        return HttpResponse()
+
+    monkeypatch.setattr(AsyncGoogleLoginView, 'exchange_code', exchange_code)
+    monkeypatch.setattr(AsyncGoogleLoginView, 'login_view', staticmethod(login_view))
+    view = async_to_sync(AsyncGoogleLoginView.as_view())
+    assert view(AsyncRequestFactory().post('/', {'code': 'abc'}, content_type='application/json')).status_code == 200
+
+    response = view(AsyncRequestFactory().post('/', {'code': 'def'}, content_type='application/json'))
+    assert response.status_code == 429 and response['Retry-After']
+    assert exchanged == ['abc']
@@ -0,0 +1,213 @@
+# apps/users/tests/test_auth.py
+"""
+Benchmarks of the auth API: registration, JWT login and refresh, email
+confirmation and password reset confirmation, through the full middleware
+and view stack with the configured password hasher.
+
+Each benchmark reports throughput, p50/p99 latency and queries per request,
+and fails when a request runs more queries than in the baseline. With
+AUTH_BENCHMARK_ENFORCE=1 it also fails when its p50/p99 latency exceeds the
+baseline's by more than the tolerance; wall time is too noisy on shared
+machines to check by default. Latencies are compared after scaling the
+baseline by this machine's speed, measured with a fixed CPU workload.
+
+    AUTH_BENCHMARK_ITERATIONS   requests per benchmark (default 30)
+    AUTH_BENCHMARK_ENFORCE=1    check the latencies against the baseline
+    AUTH_BENCHMARK_TOLERANCE    allowed p50 slowdown (default 0.5, i.e. 50%);
+                                p99 gets twice as much
+    AUTH_BENCHMARK_UPDATE=1     write the results as the new baseline
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+from allauth.account.forms import default_token_generator
+from allauth.account.models import EmailAddress, EmailConfirmationHMAC
+from allauth.account.utils import user_pk_to_url_str
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.users.models import User
+from core.tokens import RefreshToken
+
+BASELINE_PATH = Path(__file__).with_name('auth_benchmark_baseline.json')
+ITERATIONS = int(os.getenv('AUTH_BENCHMARK_ITERATIONS', 30))
+WARMUP = 3
+TOLERANCE = float(os.getenv('AUTH_BENCHMARK_TOLERANCE', 0.5))
+UPDATE_BASELINE = os.getenv('AUTH_BENCHMARK_UPDATE') == '1'
+ENFORCE_LATENCY = os.getenv('AUTH_BENCHMARK_ENFORCE') == '1'
+PASSWORD = 'Benchmark-password-1'
+
+
+def calibrate():
+    """
+    Seconds this machine takes for a fixed mix of interpreter and hashing
+    work, best of five.
+    """
+    timings = []
+    for _ in range(5):
+        started = time.perf_counter()
+        json.loads(json.dumps([{'key': i, 'value': str(i)} for i in range(20_000)]))
+        hashlib.pbkdf2_hmac('sha256', b'password', b'salt', 20_000)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def percentile(sorted_values, share):
+    return sorted_values[min(len(sorted_values) - 1, int(share * len(sorted_values)))]
+
+
+@pytest.fixture(scope='module')
+def benchmark_report(request):
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    report = {'calibration': calibrate(), 'baseline': baseline, 'results': {}}
+    yield report
+
+    reporter = request.config.pluginmanager.get_plugin('terminalreporter')
+    capture = request.config.pluginmanager.get_plugin('capturemanager')
+    if reporter is not None and capture is not None and report['results']:
+        with capture.global_and_fixture_disabled():
+            reporter.write_line('')
+            reporter.write_line(f"{'auth benchmark':<16}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'queries':>10}")
+            for name, result in report['results'].items():
+                reporter.write_line(
+                    f"{name:<16}{result['throughput']:>10.1f}{result['p50'] * 1000:>10.1f}"
+                    f"{result['p99'] * 1000:>10.1f}{result['queries']:>10}"
+                )
+    if UPDATE_BASELINE:
+        BASELINE_PATH.write_text(json.dumps(
+            {'calibration': report['calibration'], **report['results']}, indent=2, sort_keys=True,
+        ) + '\n')
+
+
+@pytest.fixture
+def benchmark(db, settings, client, benchmark_report):
+    """
+    benchmark(name, send, prepare) times send(prepare(i)) for the warmup
+    and measured iterations, and checks the results against the baseline.
+    """
+    cache.clear()
+    # Measure the views, not the rate limits.
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}
+
+    def run(name, send, prepare=lambda i: i):
+        latencies, queries = [], 0
+        for i in range(WARMUP + ITERATIONS):
+            args = prepare(i)
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                send(args)
+                elapsed = time.perf_counter() - started
+            if i >= WARMUP:
+                latencies.append(elapsed)
+                queries = max(queries, len(ctx.captured_queries))
+        latencies.sort()
+        result = {
+            'throughput': len(latencies) / sum(latencies),
+            'p50': percentile(latencies, 0.5),
+            'p99': percentile(latencies, 0.99),
+            'queries': queries,
+        }
+        benchmark_report['results'][name] = result
+        check(name, result, benchmark_report)
+        return result
+
+    return run
+
+
+def check(name, result, report):
+    expected = report['baseline'].get(name)
+    if UPDATE_BASELINE or expected is None:
+        return
+    assert result['queries'] <= expected['queries'], (
+        f"{name}: {result['queries']} queries per request, baseline {expected['queries']}"
+    )
+    if not ENFORCE_LATENCY:
+        return
+    speed = report['calibration'] / report['baseline']['calibration']
+    for metric, tolerance in (('p50', TOLERANCE), ('p99', TOLERANCE * 2)):
+        limit = expected[metric] * speed * (1 + tolerance)
+        assert result[metric] <= limit, (
+            f"{name}: {metric} {result[metric] * 1000:.1f} ms, limit {limit * 1000:.1f} ms "
+            f"(baseline {expected[metric] * 1000:.1f} ms)"
+        )
+
+
+def create_user(email, verified=True):
+    user = User.objects.create_user(email=email, username=email.split('@')[0], password=PASSWORD)
+    EmailAddress.objects.create(user=user, email=email, verified=verified, primary=True)
+    return user
+
+
+def test_register(client, benchmark):
+    def send(i):
+        response = client.post(reverse('rest_register'), {
+            'email': f'register-{i}@example.com',
+            'password1': PASSWORD,
+            'password2': PASSWORD,
+        })
+        assert response.status_code == 201, response.content
+
+    benchmark('register', send)
+
+
+def test_login(client, benchmark):
+    create_user('login@example.com')
+
+    def send(i):
+        response = client.post(reverse('rest_login'), {'email': 'login@example.com', 'password': PASSWORD})
+        assert response.status_code == 200, response.content
+
+    benchmark('login', send)
+
+
+def test_refresh(client, benchmark):
+    user = create_user('refresh@example.com')
+    tokens = {'refresh': str(RefreshToken.for_user(user))}
+
+    def send(i):
+        response = client.post(reverse('token_refresh'), {'refresh': tokens['refresh']})
+        assert response.status_code == 200, response.content
+        # Refresh tokens rotate; the old one is blacklisted.
+        tokens['refresh'] = response.json()['refresh']
+
+    benchmark('refresh', send)
+
+
+def test_confirm_email(client, benchmark):
+    users = [create_user(f'confirm-{i}@example.com', verified=False) for i in range(WARMUP + ITERATIONS)]
+    keys = [EmailConfirmationHMAC(EmailAddress.objects.get(user=user)).key for user in users]
+
+    def send(key):
+        # allauth's own URL has the same name, so it is spelled out.
+        response = client.get(f'/auth/registration/account-confirm-email/{key}/')
+        assert response['Location'].endswith('/email-verified')
+
+    benchmark('confirm_email', send, prepare=lambda i: keys[i])
+
+
+def test_password_reset_confirm(client, benchmark):
+    user = create_user('reset@example.com')
+
+    def prepare(i):
+        # The token is bound to the current password, so it changes after each reset.
+        user.refresh_from_db()
+        uid, token = user_pk_to_url_str(user), default_token_generator.make_token(user)
+        return reverse('password_reset_confirm', args=[uid, token]), {
+            'uid': uid,
+            'token': token,
+            'new_password1': f'{PASSWORD}-{i}',
+            'new_password2': f'{PASSWORD}-{i}',
+        }
+
+    def send(args):
+        url, data = args
+        response = client.post(url, data)
+        assert response.status_code == 200, response.content
+
+    benchmark('reset_confirm', send, prepare=prepare)
@@ -0,0 +1,151 @@
+# apps/users/tests/test_authentication.py
+import pytest
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.users.models import Address, User
+from core.authentication import CachedJWTAuthentication, SNAPSHOT_KEY, SNAPSHOT_VERSION, VERSION_KEY
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(email='api@example.com', username='api', password='password')
+
+
+def authenticate(user):
+    request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return CachedJWTAuthentication().authenticate(request)[0]
+
+
+def cached(user):
+    """
+    The user's snapshot while it is current.
+    """
+    snapshot = cache.get(SNAPSHOT_KEY.format(user.pk), version=SNAPSHOT_VERSION)
+    if snapshot and snapshot['version'] == cache.get(VERSION_KEY.format(user.pk), version=SNAPSHOT_VERSION):
+        return snapshot
+    return None
+
+
+def test_authentication_uses_cached_snapshot(user):
+    authenticate(user)
+    with CaptureQueriesContext(connection) as ctx:
+        snapshot = authenticate(user)
+    assert len(ctx.captured_queries) == 0
+    assert snapshot == user and type(snapshot) is User
+    assert (snapshot.pk, snapshot.email, snapshot.is_verified) == (user.pk, user.email, False)
+
+    # Other fields load on first use.
+    with CaptureQueriesContext(connection) as ctx:
+        assert snapshot.username == 'api'
+    assert len(ctx.captured_queries) == 1
+    assert snapshot.check_password('password')
+
+    # It stands in for the user on relations.
+    address = Address.objects.create(
+        user=snapshot, full_name='Api User', street_address1='1 Main St',
+        city='Paris', state_province='IDF', postal_code='75001', country='FR',
+    )
+    assert address.user_id == user.pk
+
+
+def test_snapshot_dropped_on_save(django_capture_on_commit_callbacks, user):
+    authenticate(user)
+    with django_capture_on_commit_callbacks(execute=True):
+        user.is_active = False
+        user.save()
+    assert cached(user) is None
+    with pytest.raises(AuthenticationFailed):
+        authenticate(user)
+
+
+def test_snapshot_dropped_on_permission_change(user):
+    authenticate(user)
+    hash_before = cached(user)['permissions_hash']
+    group = Group.objects.create(name='staff')
+    group.permissions.add(Permission.objects.get(codename='view_address'))
+
+    user.groups.add(group)
+    assert cached(user) is None
+    authenticate(user)
+    assert cached(user)['permissions_hash'] != hash_before
+
+    authenticate(user)
+    group.custom_user_groups.clear()
+    assert cached(user) is None
+
+
+def test_api_request_with_snapshot(client, user):
+    url = reverse('rest_user_details')
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+    assert client.get(url, **headers).json()['email'] == user.email
+
+    response = client.patch(url, {'first_name': 'Ada'}, content_type='application/json', **headers)
+    assert response.status_code == 200
+    user.refresh_from_db()
+    assert user.first_name == 'Ada'
+    assert cached(user) is None
+
+
+def test_permission_checks_use_cached_permissions(user):
+    group = Group.objects.create(name='editors')
+    group.permissions.add(Permission.objects.get(codename='view_address'))
+    user.groups.add(group)
+    assert User.objects.get(pk=user.pk).has_perm('users.view_address')
+
+    # A fresh request: one cache read, no permission queries.
+    with CaptureQueriesContext(connection) as ctx:
+        fresh = User.objects.get(pk=user.pk)
+        assert fresh.has_perm('users.view_address')
+        assert not fresh.has_perm('users.change_address')
+        assert fresh.has_module_perms('users')
+    assert len(ctx.captured_queries) == 1
+
+    snapshot = authenticate(user)
+    with CaptureQueriesContext(connection) as ctx:
+        assert snapshot.has_perm('users.view_address')
+    assert len(ctx.captured_queries) == 0
+
+    # Group permission edits reach the members.
+    group.permissions.add(Permission.objects.get(codename='change_address'))
+    assert User.objects.get(pk=user.pk).has_perm('users.change_address')
+
+    Permission.objects.get(codename='change_address').group_set.clear()
+    assert not User.objects.get(pk=user.pk).has_perm('users.change_address')
+
+    group.delete()
+    assert not User.objects.get(pk=user.pk).has_perm('users.view_address')
+
+
+def test_snapshot_saves_only_loaded_fields(user):
+    authenticate(user)
+    snapshot = authenticate(user)
+    User.objects.filter(pk=user.pk).update(first_name='Ada')
+    snapshot.is_verified = True
+    snapshot.save()
+
+    user.refresh_from_db()
+    assert user.is_verified and user.first_name == 'Ada'
+
+
+def test_snapshot_older_than_token_is_rebuilt(user):
+    authenticate(user)
+    # An edit without model signals, then a token issued after it.
+    User.objects.filter(pk=user.pk).update(is_verified=True)
+    cache.set(
+        SNAPSHOT_KEY.format(user.pk),
+        {**cached(user), 'built_at': cached(user)['built_at'] - 60},
+        version=SNAPSHOT_VERSION,
+    )
+    assert authenticate(user).is_verified
@@ -0,0 +1,108 @@
+# apps/users/tests/test_cache.py
+import threading
+import time
+
+import pytest
+from django.core.cache import cache, caches
+
+from core.cache import cache_stats, cached, invalidate_namespace, namespace_key
+from core.checks import check_shared_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def test_reads_come_from_the_local_tier():
+    cache.set('greeting', {'text': 'hello'}, 60)
+    caches['shared'].set('greeting', {'text': 'changed elsewhere'}, 60)
+    assert cache.get('greeting') == {'text': 'hello'}
+
+    # A value another process wrote is picked up from the shared tier.
+    cache.clear_local()
+    assert cache.get('greeting') == {'text': 'changed elsewhere'}
+
+    # Deletes and counters go through.
+    cache.delete('greeting')
+    assert caches['shared'].get('greeting') is None and cache.get('greeting') is None
+    cache.set('counter', 1)
+    assert cache.incr('counter') == 2 and cache.get('counter') == 2
+
+    stats = cache_stats()['default']
+    assert stats['local_hits'] >= 1 and stats['shared_hits'] >= 1 and stats['misses'] >= 1
+
+
+def test_local_copies_expire_with_the_shared_entry():
+    # Written by another process, which expires in a second.
+    cache.set('short-lived', 'value', 1)
+    cache.clear_local()
+    assert cache.get('short-lived') == 'value'
+
+    [(expires_at, _)] = cache.local.entries.values()
+    assert expires_at <= time.monotonic() + 1
+
+
+def test_shared_cache_is_required_without_debug(settings):
+    settings.DEBUG = False
+    settings.CACHES = {**settings.CACHES, 'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp/cache',
+    }}
+    assert [error.id for error in check_shared_cache(None)] == ['core.E001']
+
+    settings.CACHES = {**settings.CACHES, 'shared': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379/1',
+    }}
+    assert check_shared_cache(None) == []
+
+    settings.DEBUG = True
+    settings.CACHES = {**settings.CACHES, 'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    assert check_shared_cache(None) == []
+
+
+def test_local_tier_is_bounded():
+    tier = cache.local
+    max_entries = tier.max_entries
+    tier.max_entries = 3
+    try:
+        cache.set_many({f'key-{i}': i for i in range(5)})
+        assert len(tier.entries) == 3
+        # Evicted locally, still in the shared tier.
+        assert cache.get_many(['key-0', 'key-4']) == {'key-0': 0, 'key-4': 4}
+    finally:
+        tier.max_entries = max_entries
+
+
+def test_concurrent_misses_compute_once():
+    calls = []
+
+    def produce():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'value'
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cached('slow', 'key', produce, 60)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['value'] * 8
+    assert len(calls) == 1
+
+
+def test_other_process_computing_is_waited_for():
+    key = namespace_key('report', 'totals')
+    # Another process holds the compute lock and stores the value shortly.
+    caches['shared'].add(f'{key}:compute-lock', 1, 10)
+    threading.Timer(0.05, lambda: caches['shared'].set(key, 42, 60)).start()
+    assert cached('report', 'totals', lambda: pytest.fail('computed twice'), 60) == 42
+
+
+def test_invalidate_namespace():
+    assert cached('profile', 1, lambda: 'old', 60) == 'old'
+    invalidate_namespace('profile')
+    assert cached('profile', 1, lambda: 'new', 60) == 'new'
@@ -0,0 +1,98 @@
+# apps/users/tests/test_email_backend.py
+import smtplib
+
+import pytest
+from django.core.mail import EmailMessage
+
+from core.backends import email as email_backend
+
+
+class FakeSMTP:
+    """
+    smtplib.SMTP stand-in. `failures` lists the exceptions raised by the
+    next sendmail() calls, across every connection.
+    """
+    failures = []
+    instances = []
+
+    def __init__(self, host, port, **kwargs):
+        self.sent = []
+        self.closed = False
+        FakeSMTP.instances.append(self)
+
+    def sendmail(self, from_email, recipients, message):
+        if FakeSMTP.failures:
+            raise FakeSMTP.failures.pop(0)
+        self.sent.append(recipients)
+
+    def noop(self):
+        return (250, b'OK')
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+class FakePooledEmailBackend(email_backend.PooledEmailBackend):
+    connection_class = FakeSMTP
+
+
+@pytest.fixture(autouse=True)
+def fake_relay(settings):
+    settings.EMAIL_USE_TLS = False
+    settings.EMAIL_HOST_USER = ''
+    settings.EMAIL_POOL_SIZE = 2
+    FakeSMTP.failures = []
+    FakeSMTP.instances = []
+    email_backend.reset_pool()
+    yield
+    email_backend.reset_pool()
+
+
+def send(to='to@example.com', fail_silently=False):
+    backend = FakePooledEmailBackend(fail_silently=fail_silently)
+    return backend.send_messages([EmailMessage(subject='Hello', body='Body', to=[to])])
+
+
+def test_connections_are_reused_across_sends():
+    assert send() == 1
+    assert send() == 1
+    stats = email_backend.get_pool_stats()
+    assert stats['connections_opened'] == 1
+    assert stats['connections_reused'] == 1
+    assert stats['messages_sent'] == 2
+    assert stats['idle_connections'] == 1
+
+
+def test_failed_connection_is_not_returned_to_the_pool():
+    FakeSMTP.failures = [smtplib.SMTPDataError(451, b'try again later')]
+    with pytest.raises(smtplib.SMTPDataError):
+        send()
+    stats = email_backend.get_pool_stats()
+    assert stats['idle_connections'] == 0
+    assert stats['connections_discarded'] == 1
+    assert FakeSMTP.instances[0].closed
+
+    # The next send opens a fresh connection instead of the failed one.
+    assert send() == 1
+    assert len(FakeSMTP.instances) == 2
+
+
+@pytest.mark.parametrize('fail_silently', [False, True])
+def test_dropped_connection_is_replaced_and_retried(fail_silently):
+    FakeSMTP.failures = [smtplib.SMTPServerDisconnected('gone')]
+    assert send(fail_silently=fail_silently) == 1
+    first, second = FakeSMTP.instances
+    assert first.closed and first.sent == []
+    assert second.sent == [['to@example.com']]
+    assert email_backend.get_pool_stats()['idle_connections'] == 1
+
+
+def test_fail_silently_reports_failure_without_pooling():
+    FakeSMTP.failures = [smtplib.SMTPServerDisconnected('gone'), smtplib.SMTPServerDisconnected('gone again')]
+    assert send(fail_silently=True) == 0
+    stats = email_backend.get_pool_stats()
+    assert stats['idle_connections'] == 0
+    assert stats['connections_discarded'] == 2
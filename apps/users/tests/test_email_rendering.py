@@ -0,0 +1,81 @@
+# apps/users/tests/test_email_rendering.py
+import pytest
+
+from core.email_rendering import EmailTemplate, get_email_template
+
+
+@pytest.fixture
+def templates(settings, tmp_path):
+    settings.TEMPLATES = [{
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [tmp_path],
+    }]
+    settings.DEBUG = False
+
+    def write(name, source):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source)
+
+    return write
+
+
+def test_templates_compile_once(templates, monkeypatch):
+    templates('welcome_subject.txt', 'Welcome {{ name }}\n')
+    templates('welcome_message.txt', 'Hi {{ name }}')
+    email = EmailTemplate('welcome_subject.txt', 'welcome_message.txt')
+
+    compiled = []
+    compile = email.compile
+    monkeypatch.setattr(email, 'compile', lambda: compiled.append(1) or compile())
+    assert email.render({'name': 'Ada'}) == ('Welcome Ada', 'Hi Ada', None)
+    assert email.render({'name': 'Bob'}) == ('Welcome Bob', 'Hi Bob', None)
+    assert len(compiled) == 1
+
+
+def test_static_parts_render_once(templates):
+    templates('static_subject.txt', 'Thanks for signing up')
+    templates('static_message.txt', 'Hello {{ name }}')
+    subject, text, html = EmailTemplate('static_subject.txt', 'static_message.txt').parts
+    assert subject.static == 'Thanks for signing up'
+    assert text.static is None
+    assert html is None
+
+
+def test_only_dynamic_nodes_render_per_message(templates):
+    templates('mixed_subject.txt', 'Hi')
+    templates('mixed_message.html', (
+        '{% load static %}<p>Hello {{ name }}</p>{% autoescape off %}<p>{{ name }}</p>'
+        '{% if vip %}<b>VIP</b>{% endif %}<p>Bye</p>{% endautoescape %}<p>Team</p>'
+    ))
+    email = EmailTemplate('mixed_subject.txt', 'missing_message.txt', 'mixed_message.html')
+    _, text, html = email.parts
+    assert [part if isinstance(part, str) else type(part[0]).__name__ for part in html.parts] == [
+        '<p>Hello ', 'VariableNode', '</p><p>', 'VariableNode', '</p>', 'IfNode', '<p>Bye</p><p>Team</p>',
+    ]
+    # The derived text body is wrapped in {% autoescape off %}, and split the same way.
+    assert (text.parts[0], text.parts[-1]) == ('Hello ', 'ByeTeam')
+
+    _, text_body, html_body = email.render({'name': '<Ada>', 'vip': True})
+    assert html_body == '<p>Hello &lt;Ada&gt;</p><p><Ada></p><b>VIP</b><p>Bye</p><p>Team</p>'
+    assert text_body == 'Hello <Ada><Ada>VIPByeTeam'
+
+
+def test_text_body_derived_from_html(templates):
+    templates('html_subject.txt', 'Hi')
+    templates('html_message.html', (
+        '<html><head><style>p { color: red; }</style></head>'
+        '<body><h1>Hello {{ name }}</h1>\n\n\n<p>Tom &amp; Jerry</p></body></html>'
+    ))
+    email = EmailTemplate('html_subject.txt', 'missing_message.txt', 'html_message.html')
+    message = email.build_message('to@example.com', {'name': '<Ada>'})
+
+    assert message.subject == 'Hi'
+    # Not escaped in the text body, escaped in the HTML one.
+    assert message.body == 'Hello <Ada>\n\nTom & Jerry'
+    assert '<h1>Hello &lt;Ada&gt;</h1>' in message.alternatives[0][0]
+
+
+def test_get_email_template_is_cached():
+    prefix = 'account/email/email_confirmation_signup'
+    assert get_email_template(prefix) is get_email_template(prefix)
@@ -0,0 +1,72 @@
+# apps/users/tests/test_estimated_count.py
+import pytest
+from django.contrib.admin.views.main import PAGE_VAR
+from django.db import connection
+from django.urls import reverse
+
+from apps.users.models import User
+from core import pagination
+from core.db import estimate_count
+from core.pagination import EstimatedCountPaginator
+
+ESTIMATE = 1_000_000
+
+
+@pytest.fixture
+def admin_client(client, db):
+    admin = User.objects.create_superuser(email='admin@example.com', username='admin', password='password')
+    client.force_login(admin)
+    return client
+
+
+@pytest.fixture
+def users(db):
+    User.objects.bulk_create(User(email=f'user{i}@example.com', username=f'user{i}') for i in range(5))
+
+
+@pytest.fixture
+def planner_estimate(monkeypatch):
+    # The planner's statistics are PostgreSQL's; pretend it saw a big table.
+    monkeypatch.setattr(pagination, 'estimate_count', lambda queryset: ESTIMATE)
+
+
+def test_paginator_estimates_above_threshold(users, planner_estimate):
+    paginator = EstimatedCountPaginator(User.objects.order_by('pk'), 10, threshold=ESTIMATE)
+    assert paginator.count == ESTIMATE
+    assert paginator.estimated
+
+    paginator = EstimatedCountPaginator(User.objects.order_by('pk'), 10, threshold=ESTIMATE + 1)
+    assert paginator.count == 5
+    assert not paginator.estimated
+
+    paginator = EstimatedCountPaginator(User.objects.order_by('pk'), 10, threshold=1, exact=True)
+    assert paginator.count == 5
+    assert not paginator.estimated
+
+
+def test_changelist_uses_estimate(admin_client, users, planner_estimate, settings):
+    settings.ADMIN_ESTIMATED_COUNT_THRESHOLD = 1
+    response = admin_client.get(reverse('admin:users_user_changelist'))
+    assert response.status_code == 200
+    cl = response.context['cl']
+    assert cl.result_count == ESTIMATE
+    assert cl.full_result_count == ESTIMATE
+
+
+def test_exact_count_is_kept_in_links(admin_client, users, planner_estimate, settings):
+    settings.ADMIN_ESTIMATED_COUNT_THRESHOLD = 1
+    response = admin_client.get(reverse('admin:users_user_changelist'), {'exact_count': '1', 'is_staff__exact': '0'})
+    assert response.status_code == 200
+    cl = response.context['cl']
+    assert cl.result_count == 5
+    assert cl.full_result_count == 6
+    assert 'exact_count=1' in cl.get_query_string({PAGE_VAR: 2})
+    assert 'exact_count=1' in cl.get_query_string(remove=['is_staff'])
+
+
+@pytest.mark.skipif(connection.vendor != 'postgresql', reason="planner estimates need PostgreSQL")
+def test_estimate_count_reads_statistics(users):
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE {User._meta.db_table}')
+    assert estimate_count(User.objects.all()) == 6
+    assert estimate_count(User.objects.filter(username='user1')) >= 1
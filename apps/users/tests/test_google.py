@@ -0,0 +1,182 @@
+# apps/users/tests/test_google.py
+import json
+import threading
+import time
+
+import jwt
+import pytest
+import requests
+from allauth.core import context
+from allauth.socialaccount.models import SocialAccount, SocialApp
+from allauth.socialaccount.providers.oauth2.client import OAuth2Client
+from asgiref.sync import async_to_sync
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.test import AsyncRequestFactory
+from django.urls import reverse
+
+from apps.users.adapters import google_jwks
+from apps.users.views import AsyncGoogleLoginView
+from core import jwks as jwks_module
+from core.jwks import JWKSCache
+
+CLIENT_ID = 'client-id.apps.googleusercontent.com'
+
+
+def make_key(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    return private_key, {**jwk, 'kid': kid, 'use': 'sig', 'alg': 'RS256'}
+
+
+def make_id_token(private_key, kid, **claims):
+    now = int(time.time())
+    payload = {
+        'iss': 'https://accounts.google.com',
+        'aud': CLIENT_ID,
+        'sub': '1234567890',
+        'email': 'onetap@example.com',
+        'email_verified': True,
+        'given_name': 'One',
+        'family_name': 'Tap',
+        'iat': now,
+        'exp': now + 600,
+        'jti': f'jti-{now}-{kid}',
+        **claims,
+    }
+    return jwt.encode(payload, private_key, algorithm='RS256', headers={'kid': kid})
+
+
+class FakeResponse:
+    def __init__(self, jwks):
+        self.jwks = jwks
+        self.headers = {'Cache-Control': 'public, max-age=120'}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.jwks
+
+
+@pytest.fixture
+def signing_key(monkeypatch):
+    private_key, jwk = make_key('key-1')
+    google_jwks.set_keys({'keys': [jwk]})
+    google_jwks.refresh_after = time.monotonic() + 60
+    monkeypatch.setattr(jwks_module, 'get_session', lambda: pytest.fail('unexpected network call'))
+    yield private_key
+    google_jwks.keys = {}
+    google_jwks.refresh_after = 0.0
+
+
+@pytest.fixture
+def google_app(db):
+    cache.clear()
+    site, _ = Site.objects.get_or_create(pk=settings.SITE_ID, defaults={'domain': 'testserver', 'name': 'test'})
+    app = SocialApp.objects.create(provider='google', name='Google', client_id=CLIENT_ID, secret='secret')
+    app.sites.add(site)
+    return app
+
+
+def test_one_tap_verifies_id_token_locally(client, google_app, signing_key):
+    url = reverse('google_onetap')
+    response = client.post(url, {'id_token': make_id_token(signing_key, 'key-1')})
+    assert response.status_code == 200, response.content
+    assert response.json()['access']
+    account = SocialAccount.objects.get(provider='google')
+    assert account.uid == '1234567890' and account.user.email == 'onetap@example.com'
+
+    expired = make_id_token(signing_key, 'key-1', exp=int(time.time()) - 3600, jti='expired')
+    assert client.post(url, {'id_token': expired}).status_code == 400
+    wrong_audience = make_id_token(signing_key, 'key-1', aud='someone-else', jti='audience')
+    assert client.post(url, {'id_token': wrong_audience}).status_code == 400
+
+
+def test_async_code_login_issues_tokens(google_app, signing_key, monkeypatch):
+    id_token = make_id_token(signing_key, 'key-1', email='code@example.com', sub='987')
+    exchanged = []
+
+    def get_access_token(self, code):
+        exchanged.append(code)
+        return {'access_token': f'access-{code}', 'id_token': id_token, 'expires_in': 3600}
+
+    monkeypatch.setattr(OAuth2Client, 'get_access_token', get_access_token)
+    request = AsyncRequestFactory().post('/', {'code': 'abc'}, content_type='application/json')
+    # Set by the middleware, which the request factory skips.
+    request.session = SessionStore()
+    request._messages = CookieStorage(request)
+    with context.request_context(request):
+        response = async_to_sync(AsyncGoogleLoginView.as_view())(request)
+    assert response.status_code == 200, response.data
+    assert response.data['access']
+    account = SocialAccount.objects.get(provider='google')
+    assert account.uid == '987' and account.user.email == 'code@example.com'
+    # GoogleLoginView used the exchanged tokens instead of the code.
+    assert exchanged == ['abc']
+
+
+def test_unknown_key_id_fetches_keys_once(monkeypatch):
+    private_key, jwk = make_key('rotated')
+    calls = []
+
+    class FakeSession:
+        def get(self, url, timeout):
+            calls.append(url)
+            return FakeResponse({'keys': [jwk]})
+
+    monkeypatch.setattr(jwks_module, 'get_session', FakeSession)
+    keys = JWKSCache('https://example.com/certs', min_refresh_interval=60)
+    assert keys.get_key('rotated') is not None
+    assert keys.get_key('rotated') is not None
+    # Unknown ids do not refetch within min_refresh_interval.
+    assert keys.get_key('made-up') is None
+    assert len(calls) == 1
+    assert 119 < keys.expires_at - time.monotonic() <= 120
+
+
+def test_failed_fetch_is_retried_after_a_short_backoff(monkeypatch):
+    private_key, jwk = make_key('key-1')
+    responses = [requests.ConnectionError('unreachable'), FakeResponse({'keys': [jwk]})]
+
+    class FakeSession:
+        def get(self, url, timeout):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+    monkeypatch.setattr(jwks_module, 'get_session', FakeSession)
+    keys = JWKSCache('https://example.com/certs', min_refresh_interval=60, retry_backoff=0.05)
+    assert keys.get_key('key-1') is None
+    # Within the backoff, no new fetch.
+    assert keys.get_key('key-1') is None and len(responses) == 1
+
+    time.sleep(0.06)
+    assert keys.get_key('key-1') is not None
+
+
+def test_concurrent_unknown_key_ids_fetch_once(monkeypatch):
+    private_key, jwk = make_key('rotated')
+    calls = []
+
+    class FakeSession:
+        def get(self, url, timeout):
+            calls.append(url)
+            time.sleep(0.05)
+            return FakeResponse({'keys': [jwk]})
+
+    monkeypatch.setattr(jwks_module, 'get_session', FakeSession)
+    keys = JWKSCache('https://example.com/certs', min_refresh_interval=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(keys.get_key('rotated'))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(result is not None for result in results)
@@ -0,0 +1,45 @@
+# apps/users/tests/test_hashers.py
+import pytest
+from allauth.account.models import EmailAddress
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import cache
+from django.urls import reverse
+
+from apps.users.models import User
+from core import hashers
+
+
+@pytest.fixture
+def legacy_user(db):
+    cache.clear()
+    user = User.objects.create_user(email='legacy@example.com', username='legacy')
+    user.password = make_password('legacy-password', hasher='pbkdf2_sha256')
+    user.save()
+    EmailAddress.objects.create(user=user, email=user.email, verified=True, primary=True)
+    return user
+
+
+def test_login_rehashes_legacy_password(client, legacy_user, settings):
+    assert legacy_user.password.startswith('pbkdf2_sha256$')
+    response = client.post(reverse('rest_login'), {'email': legacy_user.email, 'password': 'legacy-password'})
+    assert response.status_code == 200, response.content
+
+    legacy_user.refresh_from_db()
+    assert legacy_user.password.startswith(
+        f'argon2$argon2id$v=19$m={settings.ARGON2_MEMORY_COST},'
+        f't={settings.ARGON2_TIME_COST},p={settings.ARGON2_PARALLELISM}$'
+    )
+    assert legacy_user.check_password('legacy-password')
+
+
+def test_hashing_in_process_pool(settings):
+    settings.PASSWORD_HASHING_WORKERS = 1
+    try:
+        encoded = make_password('pooled-password')
+        assert hashers.get_executor() is not None
+        assert check_password('pooled-password', encoded)
+        assert not check_password('wrong-password', encoded)
+        legacy = make_password('pooled-password', hasher='pbkdf2_sha256')
+        assert check_password('pooled-password', legacy)
+    finally:
+        hashers.shutdown_executor()
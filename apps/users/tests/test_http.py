@@ -0,0 +1,52 @@
+# apps/users/tests/test_http.py
+import requests
+from allauth.socialaccount.adapter import get_adapter
+from django.conf import settings
+from requests.adapters import BaseAdapter
+
+from core.http import build_session, get_session, http_stats
+
+
+class StubAdapter(BaseAdapter):
+    def __init__(self, status=200):
+        super().__init__()
+        self.status = status
+        self.timeouts = []
+
+    def send(self, request, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        response = requests.Response()
+        response.status_code = self.status
+        response.url = request.url
+        response.request = request
+        response._content = b'{}'
+        return response
+
+    def close(self):
+        pass
+
+
+def test_social_adapter_uses_the_shared_session():
+    session = get_adapter().get_requests_session()
+    assert session is get_session() is get_adapter().get_requests_session()
+    adapter = session.get_adapter('https://oauth2.googleapis.com/token')
+    assert adapter._pool_maxsize == settings.HTTP_POOL_MAXSIZE
+    assert adapter.max_retries.total == settings.HTTP_RETRIES
+
+
+def test_calls_record_latency_per_endpoint():
+    session = build_session()
+    stub = StubAdapter()
+    session.mount('https://oauth2.googleapis.com', stub)
+    before = http_stats().get('oauth2.googleapis.com/token', {'count': 0, 'errors': 0})
+
+    session.post('https://oauth2.googleapis.com/token?x=1', data={'code': 'abc'})
+    session.post('https://oauth2.googleapis.com/token', data={'code': 'def'}, timeout=1)
+    stub.status = 503
+    session.get('https://oauth2.googleapis.com/token')
+
+    stats = http_stats()['oauth2.googleapis.com/token']
+    assert stats['count'] == before['count'] + 3
+    assert stats['errors'] == before['errors'] + 1
+    assert sum(stats['buckets'].values()) == stats['count']
+    assert stub.timeouts == [(settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT), 1, stub.timeouts[0]]
@@ -0,0 +1,36 @@
+# apps/users/tests/test_ids.py
+import uuid
+
+from core import ids
+
+
+def test_uuid7_layout():
+    value = ids.uuid7()
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+
+
+def test_uuid7_sorts_in_generation_order():
+    values = [ids.uuid7() for _ in range(10_000)]
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+
+
+def test_uuid7_keeps_order_within_a_millisecond(monkeypatch):
+    monkeypatch.setattr(ids, '_last_ms', 0)
+    monkeypatch.setattr(ids.time, 'time_ns', lambda: 1_700_000_000_000_000_000)
+    # More ids than the 12-bit counter holds, so some borrow the next millisecond.
+    values = [ids.uuid7() for _ in range(5_000)]
+    assert values == sorted(values)
+    assert values[-1].int >> 80 == 1_700_000_000_001
+
+
+def test_default_uuid_version(settings):
+    assert ids.default_uuid().version == 7
+    settings.UUID_PRIMARY_KEY_VERSION = 4
+    assert ids.default_uuid().version == 4
+
+
+def test_default_uuid_without_setting(settings):
+    del settings.UUID_PRIMARY_KEY_VERSION
+    assert ids.default_uuid().version == 7
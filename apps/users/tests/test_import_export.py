@@ -0,0 +1,261 @@
+# apps/users/tests/test_import_export.py
+import csv
+import io
+from datetime import timedelta
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from import_export.formats.base_formats import CSV
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.users.admin import AddressResource, UserResource
+from apps.users.models import Address, User
+from core.data_jobs import claim_next_job, enqueue_import, run_pending_jobs
+from core.models import DataJob
+
+ROWS = 30
+
+
+@pytest.fixture
+def admin_client(client, db):
+    admin = User.objects.create_superuser(email='admin@example.com', username='admin', password='password')
+    client.force_login(admin)
+    return client
+
+
+@pytest.fixture
+def addresses(db):
+    users = User.objects.bulk_create(
+        User(email=f'user{i}@example.com', username=f'user{i}') for i in range(ROWS)
+    )
+    return Address.objects.bulk_create(
+        Address(
+            user=user, full_name=f'User {i}', street_address1='1 Main St',
+            city='Paris', state_province='IDF', postal_code='75001', country='FR',
+        )
+        for i, user in enumerate(users)
+    )
+
+
+def test_stream_export_writes_every_row_in_chunks(addresses, settings, django_assert_max_num_queries):
+    settings.IMPORT_EXPORT_CHUNK_SIZE = 10
+    resource = AddressResource()
+    with django_assert_max_num_queries(ROWS // 10 + 1):
+        chunks = list(resource.stream_export(CSV(), encoding='utf-8-sig'))
+
+    assert len(chunks) > 1
+    content = b''.join(chunks)
+    assert content.count(b'\xef\xbb\xbf') == 1
+    rows = list(csv.reader(io.StringIO(content.decode('utf-8-sig'))))
+    assert rows[0] == resource.get_export_headers()
+    assert len(rows) == ROWS + 1
+
+
+def test_export_to_file_returns_row_count(addresses):
+    fileobj = io.BytesIO()
+    assert UserResource().export_to_file(fileobj, CSV()) == ROWS
+
+
+def test_import_rows_in_chunks(db, monkeypatch):
+    monkeypatch.setattr(UserResource._meta, 'batch_size', 2)
+    rows = [['email', 'username']] + [[f'new{i}@example.com', f'new{i}'] for i in range(5)]
+    rows[4][0] = 'not-an-email'
+
+    result = UserResource().import_rows(rows)
+
+    assert result.total_rows == 5
+    assert result.totals['new'] == 4
+    assert [row.number for row in result.invalid_rows] == [4]
+    assert User.objects.filter(email__startswith='new').count() == 4
+
+
+def test_import_rejects_duplicate_unique_values(db, monkeypatch):
+    monkeypatch.setattr(UserResource._meta, 'batch_size', 10)
+    existing = User.objects.create_user(email='taken@example.com', username='taken', password='password')
+    rows = [
+        ['id', 'email', 'username'],
+        ['', 'a@example.com', 'a'],
+        ['', 'taken@example.com', 'b'],
+        ['', 'c@example.com', 'a'],
+        [str(existing.pk), 'taken@example.com', 'taken-renamed'],
+        ['', 'e@example.com', 'e'],
+    ]
+
+    result = UserResource().import_rows(rows)
+
+    assert [row.number for row in result.invalid_rows] == [2, 3]
+    assert result.totals['new'] == 2
+    assert result.totals['update'] == 1
+    assert not result.has_errors()
+    assert set(User.objects.values_list('username', flat=True)) == {'a', 'e', 'taken-renamed'}
+
+
+def test_failed_bulk_write_is_counted_as_errors(db, monkeypatch):
+    monkeypatch.setattr(UserResource._meta, 'batch_size', 2)
+
+    def bulk_create(*args, **kwargs):
+        raise IntegrityError('constraint failed')
+
+    rows = [['email', 'username']] + [[f'bulk{i}@example.com', f'bulk{i}'] for i in range(3)]
+    resource = UserResource()
+    with monkeypatch.context() as patch:
+        patch.setattr(User.objects, 'bulk_create', bulk_create)
+        result = resource.import_rows(rows)
+
+    assert result.has_errors()
+    assert result.totals['new'] == 0
+    assert result.totals['error'] == 3
+    assert not User.objects.filter(email__startswith='bulk').exists()
+
+
+def test_imported_deactivation_rejects_existing_tokens(client, db, django_capture_on_commit_callbacks):
+    user = User.objects.create_user(email='imported@example.com', username='imported', password='password')
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+    # Caches the user's snapshot.
+    assert client.get(reverse('rest_user_details'), **headers).status_code == 200
+
+    rows = [['id', 'email', 'username', 'is_active', 'tos_accepted'], [str(user.pk), user.email, user.username, '0', '1']]
+    with django_capture_on_commit_callbacks(execute=True):
+        result = UserResource().import_rows(rows)
+    assert result.totals['update'] == 1
+
+    user.refresh_from_db()
+    assert not user.is_active and user.tos_accepted_at is not None
+    assert client.get(reverse('rest_user_details'), **headers).status_code == 401
+
+
+def test_import_file_reads_csv_incrementally(db):
+    data = 'email,username\r\nfile1@example.com,file1\r\nfile2@example.com,file2\r\n'
+    result = UserResource().import_file(io.BytesIO(data.encode('utf-8-sig')), CSV())
+    assert result.totals['new'] == 2
+    assert not result.has_errors()
+
+
+def export_addresses(client, export_items=None, **filters):
+    url = reverse('admin:users_address_export')
+    if filters:
+        url += '?' + '&'.join(f'{key}={value}' for key, value in filters.items())
+    return client.post(url, {
+        'format': '0',
+        'resource': '0',
+        **{f'addressresource_{name}': 'on' for name in AddressResource.Meta.fields},
+        **({'export_items': export_items} if export_items else {}),
+    })
+
+
+def test_admin_export_is_streamed(admin_client, addresses):
+    response = export_addresses(admin_client)
+    assert isinstance(response, StreamingHttpResponse)
+    assert response['Content-Type'] == 'text/csv'
+    assert len(b''.join(response.streaming_content).splitlines()) == ROWS + 1
+
+
+def test_large_admin_export_runs_as_job(admin_client, addresses, settings):
+    settings.DATA_JOB_EXPORT_THRESHOLD = 10
+    response = export_addresses(admin_client, city='Paris')
+    job = DataJob.objects.get()
+    assert response.status_code == 302
+    assert response['Location'] == reverse('admin:core_datajob_change', args=[job.pk])
+    assert job.kind == DataJob.KIND_EXPORT and job.status == DataJob.STATUS_PENDING
+
+    [job] = run_pending_jobs()
+    assert job.status == DataJob.STATUS_DONE, job.error
+    assert job.rows_total == job.rows_processed == ROWS
+    assert len(job.output_file.read().splitlines()) == ROWS + 1
+
+    response = admin_client.get(reverse('admin:core_datajob_change', args=[job.pk]))
+    assert response.status_code == 200
+    assert f'{ROWS:,} / {ROWS:,} rows (100%)' in response.content.decode()
+
+
+def test_export_job_keeps_filters_and_selection(admin_client, addresses, settings):
+    settings.DATA_JOB_EXPORT_THRESHOLD = 10
+    addresses[0].city = 'Lyon'
+    addresses[0].save()
+    export_addresses(admin_client, city='Paris')
+    export_addresses(admin_client, export_items=[str(address.pk) for address in addresses[:15]])
+
+    filtered, selected = DataJob.objects.order_by('created_at')
+    assert filtered.export_filters == {'city': ['Paris']} and filtered.export_pks is None
+    assert len(selected.export_pks) == 15
+
+    run_pending_jobs()
+    filtered.refresh_from_db()
+    selected.refresh_from_db()
+    assert filtered.rows_total == ROWS - 1
+    assert selected.rows_total == 15
+
+
+def test_export_job_fails_without_its_user(admin_client, addresses, settings):
+    settings.DATA_JOB_EXPORT_THRESHOLD = 10
+    export_addresses(admin_client)
+    User.objects.filter(is_superuser=True).delete()
+
+    [job] = run_pending_jobs()
+    assert job.status == DataJob.STATUS_FAILED
+    assert not job.output_file
+
+
+def test_import_job_dry_run_reports_errors(db, monkeypatch):
+    monkeypatch.setattr(UserResource._meta, 'batch_size', 2)
+    data = 'email,username\r\n' + ''.join(f'job{i}@example.com,job{i}\r\n' for i in range(4)) + 'bad,bad\r\n'
+    job = enqueue_import(UserResource, CSV(), SimpleUploadedFile('users.csv', data.encode()))
+
+    [job] = run_pending_jobs()
+    assert job.status == DataJob.STATUS_FAILED
+    assert job.rows_processed == 5
+    assert job.totals['new'] == 4 and job.totals['invalid'] == 1
+    assert job.error.startswith('Row 5:')
+    assert not User.objects.filter(email__startswith='job').exists()
+
+
+def test_admin_import_is_confirmed_after_dry_run(admin_client, settings):
+    settings.DATA_JOB_IMPORT_THRESHOLD_BYTES = 1
+    data = 'email,username\r\n' + ''.join(f'job{i}@example.com,job{i}\r\n' for i in range(3))
+    response = admin_client.post(reverse('admin:users_user_import'), {
+        'resource': '0',
+        'format': '0',
+        'import_file': SimpleUploadedFile('users.csv', data.encode()),
+    })
+    job = DataJob.objects.get()
+    assert response['Location'] == reverse('admin:core_datajob_change', args=[job.pk])
+    assert job.kind == DataJob.KIND_IMPORT and job.dry_run
+
+    [job] = run_pending_jobs()
+    assert job.status == DataJob.STATUS_REVIEW, job.error
+    assert not User.objects.filter(email__startswith='job').exists()
+
+    confirm_url = reverse('admin:core_datajob_confirm_import', args=[job.pk])
+    assert admin_client.get(confirm_url).status_code == 200
+    admin_client.post(confirm_url)
+    job.refresh_from_db()
+    assert job.status == DataJob.STATUS_PENDING and not job.dry_run
+
+    [job] = run_pending_jobs()
+    assert job.status == DataJob.STATUS_DONE, job.error
+    assert User.objects.filter(email__startswith='job').count() == 3
+    # Only jobs awaiting confirmation can be confirmed.
+    assert admin_client.post(confirm_url).status_code == 403
+
+
+def test_stale_running_jobs_are_requeued_then_failed(db, settings):
+    settings.DATA_JOB_MAX_ATTEMPTS = 2
+    data = 'email,username\r\nstale@example.com,stale\r\n'
+    job = enqueue_import(UserResource, CSV(), SimpleUploadedFile('users.csv', data.encode()))
+    stale = timezone.now() - timedelta(seconds=settings.DATA_JOB_STALE_AFTER + 1)
+
+    # A worker claims the job, then dies without a heartbeat.
+    assert claim_next_job() == job
+    DataJob.objects.filter(pk=job.pk).update(heartbeat_at=stale)
+    [job] = run_pending_jobs()
+    assert job.status == DataJob.STATUS_REVIEW
+    assert job.attempts == 2
+
+    DataJob.objects.filter(pk=job.pk).update(status=DataJob.STATUS_RUNNING, heartbeat_at=stale)
+    assert run_pending_jobs() == []
+    job.refresh_from_db()
+    assert job.status == DataJob.STATUS_FAILED
@@ -0,0 +1,139 @@
+# apps/users/tests/test_mail.py
+import threading
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.mail import build_message, deliver_queued_emails, enqueue_email
+from core.models import OutboxEmail
+
+
+class FailingConnection:
+    """
+    Email connection whose sends fail for the listed recipients.
+    """
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.sent = []
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        for message in messages:
+            if self.failing & set(message.to):
+                raise ConnectionError("relay unavailable")
+            self.sent.append(message)
+        return len(messages)
+
+
+def queue(to, **kwargs):
+    return enqueue_email(EmailMessage(subject='Hello', body='Body', to=[to], **kwargs))
+
+
+def test_enqueue_keeps_recipients_and_html(db):
+    message = EmailMultiAlternatives(
+        subject='Hello', body='Text', to=['to@example.com'],
+        cc=['cc@example.com'], bcc=['bcc@example.com'], reply_to=['reply@example.com'],
+        headers={'X-Tag': 'welcome'},
+    )
+    message.attach_alternative('<p>Html</p>', 'text/html')
+    outbox_email = enqueue_email(message)
+
+    rebuilt = build_message(OutboxEmail.objects.get(pk=outbox_email.pk))
+    assert rebuilt.to == ['to@example.com']
+    assert rebuilt.cc == ['cc@example.com']
+    assert rebuilt.bcc == ['bcc@example.com']
+    assert rebuilt.reply_to == ['reply@example.com']
+    assert rebuilt.extra_headers == {'X-Tag': 'welcome'}
+    assert rebuilt.alternatives[0][0] == '<p>Html</p>'
+
+
+def test_enqueue_rejects_attachments(db):
+    message = EmailMessage(subject='Hello', body='Body', to=['to@example.com'])
+    message.attach('report.csv', 'a,b\n', 'text/csv')
+    with pytest.raises(ValueError):
+        enqueue_email(message)
+    assert not OutboxEmail.objects.exists()
+
+
+def test_deliver_sends_due_emails(db):
+    due = queue('due@example.com')
+    later = queue('later@example.com')
+    later.next_attempt_at = timezone.now() + timedelta(hours=1)
+    later.save()
+
+    assert deliver_queued_emails() == (1, 0)
+    assert [message.to for message in mail.outbox] == [['due@example.com']]
+    due.refresh_from_db()
+    later.refresh_from_db()
+    assert due.status == OutboxEmail.STATUS_SENT and due.sent_at is not None
+    assert later.status == OutboxEmail.STATUS_PENDING
+
+
+def test_deliver_retries_with_backoff_then_gives_up(db, settings):
+    settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+    settings.EMAIL_OUTBOX_RETRY_DELAY = 60
+    failing = queue('down@example.com')
+    ok = queue('up@example.com')
+    relay = FailingConnection(failing=['down@example.com'])
+
+    assert deliver_queued_emails(connection=relay) == (1, 1)
+    failing.refresh_from_db()
+    assert failing.status == OutboxEmail.STATUS_PENDING
+    assert failing.attempts == 1
+    assert failing.last_error == 'relay unavailable'
+    assert failing.next_attempt_at > timezone.now() + timedelta(seconds=50)
+    assert [message.to for message in relay.sent] == [['up@example.com']]
+
+    # Not due yet, so the next batch is empty.
+    assert deliver_queued_emails(connection=relay) == (0, 0)
+
+    OutboxEmail.objects.filter(pk=failing.pk).update(next_attempt_at=timezone.now())
+    assert deliver_queued_emails(connection=relay) == (0, 1)
+    failing.refresh_from_db()
+    assert failing.status == OutboxEmail.STATUS_FAILED
+    assert failing.attempts == 2
+    ok.refresh_from_db()
+    assert ok.status == OutboxEmail.STATUS_SENT
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(
+    not connection.features.has_select_for_update_skip_locked,
+    reason="needs a database with SELECT ... FOR UPDATE SKIP LOCKED",
+)
+def test_deliver_skips_rows_claimed_by_another_worker():
+    claimed = queue('claimed@example.com')
+    free = queue('free@example.com')
+    locked, release = threading.Event(), threading.Event()
+
+    def other_worker():
+        with transaction.atomic():
+            OutboxEmail.objects.select_for_update().get(pk=claimed.pk)
+            locked.set()
+            release.wait(10)
+        connection.close()
+
+    worker = threading.Thread(target=other_worker)
+    worker.start()
+    try:
+        assert locked.wait(10)
+        assert deliver_queued_emails() == (1, 0)
+    finally:
+        release.set()
+        worker.join()
+
+    assert [message.to for message in mail.outbox] == [['free@example.com']]
+    claimed.refresh_from_db()
+    free.refresh_from_db()
+    assert claimed.status == OutboxEmail.STATUS_PENDING
+    assert free.status == OutboxEmail.STATUS_SENT
@@ -0,0 +1,85 @@
+# apps/users/tests/test_metrics.py
+import re
+import time
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from core import metrics
+
+
+@pytest.fixture
+def metrics_settings(settings):
+    cache.clear()
+    settings.METRICS_SAMPLE_RATE = 1.0
+    settings.METRICS_TOKEN = 'scrape-token'
+    return settings
+
+
+def scrape(client):
+    response = client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-token')
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    return response.content.decode()
+
+
+def value(text, metric, **labels):
+    label_text = ','.join(f'{name}="{label}"' for name, label in labels.items())
+    match = re.search(rf'^{metric}\{{{re.escape(label_text)}\}} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+@pytest.mark.django_db
+def test_requests_are_counted_per_view(client, metrics_settings):
+    before = scrape(client)
+    client.post(reverse('rest_login'), {'email': 'nobody@example.com', 'password': 'wrong'})
+    client.post(reverse('rest_login'), {'email': 'nobody@example.com', 'password': 'wrong'})
+    after = scrape(client)
+
+    view = {'view': 'rest_login', 'method': 'POST'}
+    requests = {**view, 'status': '4xx', 'process': metrics.PROCESS_ID}
+    view = {**view, 'process': metrics.PROCESS_ID}
+    assert value(after, 'app_requests_total', **requests) - value(before, 'app_requests_total', **requests) == 2
+    assert value(after, 'app_request_duration_seconds_count', **view) - value(before, 'app_request_duration_seconds_count', **view) == 2
+    assert value(after, 'app_sampled_requests_total', **view) - value(before, 'app_sampled_requests_total', **view) == 2
+    # The user lookup, and the throttle's cache lookups.
+    assert value(after, 'app_db_queries_total', **view) > value(before, 'app_db_queries_total', **view)
+    assert value(after, 'app_cache_misses_total', **view) > value(before, 'app_cache_misses_total', **view)
+    assert (
+        f'app_request_duration_seconds_bucket{{view="rest_login",method="POST",le="+Inf",'
+        f'process="{metrics.PROCESS_ID}"}}' in after
+    )
+
+
+@pytest.mark.django_db
+def test_processes_are_exported_separately(client, metrics_settings):
+    cache = metrics.get_metrics_cache()
+    # Another process, which served a request and then stopped flushing.
+    other = {'views': {('rest_login', 'POST'): {**metrics.new_view_metrics(), 'statuses': {'2xx': 5}}}, 'http': {}}
+    cache.set(metrics.PROCESS_KEY.format('other:1'), other)
+    cache.set(metrics.PROCESSES_KEY, {'other:1': time.time()})
+    client.post(reverse('rest_login'), {'email': 'nobody@example.com', 'password': 'wrong'})
+    text = scrape(client)
+    assert value(text, 'app_requests_total', view='rest_login', method='POST', status='2xx', process='other:1') == 5
+    assert value(text, 'app_requests_total', view='rest_login', method='POST', status='4xx', process=metrics.PROCESS_ID) >= 1
+
+    # Its series end instead of lowering a total.
+    cache.delete(metrics.PROCESS_KEY.format('other:1'))
+    text = scrape(client)
+    assert 'process="other:1"' not in text
+    assert value(text, 'app_requests_total', view='rest_login', method='POST', status='4xx', process=metrics.PROCESS_ID) >= 1
+
+
+def test_registry_is_updated_under_a_lock(metrics_settings):
+    cache = metrics.get_metrics_cache()
+    cache.set(metrics.PROCESSES_KEY, {'other:1': time.time()})
+    # Another process is updating the registry: this one waits its turn.
+    cache.add(metrics.PROCESSES_LOCK_KEY, 'other:1')
+    metrics.flush()
+    assert set(cache.get(metrics.PROCESSES_KEY)) == {'other:1'}
+
+    cache.delete(metrics.PROCESSES_LOCK_KEY)
+    metrics.flush()
+    assert set(cache.get(metrics.PROCESSES_KEY)) == {'other:1', metrics.PROCESS_ID}
+    assert cache.get(metrics.PROCESSES_LOCK_KEY) is None
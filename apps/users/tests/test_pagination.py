@@ -0,0 +1,93 @@
+# apps/users/tests/test_pagination.py
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework import generics, serializers
+from rest_framework.filters import OrderingFilter
+from rest_framework.permissions import AllowAny
+from rest_framework.test import APIRequestFactory
+
+from apps.users.models import User
+from core.pagination import KeysetPagination
+
+factory = APIRequestFactory()
+
+
+class UserSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ('username',)
+
+
+class Pagination(KeysetPagination):
+    page_size = 3
+
+
+class UserListView(generics.ListAPIView):
+    queryset = User.objects.all()
+    serializer_class = UserSerializer
+    pagination_class = Pagination
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    throttle_classes = []
+    filter_backends = [OrderingFilter]
+    ordering_fields = ('username', 'date_joined')
+    ordering = ('-date_joined',)
+
+
+@pytest.fixture
+def users(db):
+    now = timezone.now()
+    # Two users share each date_joined, so the primary key breaks the ties.
+    return [
+        User.objects.create(
+            email=f'user{i}@example.com', username=f'user{i}', date_joined=now - timedelta(days=i // 2),
+        )
+        for i in range(8)
+    ]
+
+
+def get(url):
+    response = UserListView.as_view()(factory.get(url))
+    assert response.status_code == 200, response.data
+    return response.data
+
+
+def walk(url, direction):
+    """
+    Usernames of each page from `url` on, and the last page's data.
+    """
+    pages = []
+    while True:
+        data = get(url)
+        pages.append([row['username'] for row in data['results']])
+        if data[direction] is None:
+            return pages, data
+        url = data[direction]
+
+
+def expected_order(users, key):
+    return [user.username for user in sorted(users, key=key)]
+
+
+def test_forward_and_back(users):
+    pages, last = walk('/users/', 'next')
+    order = expected_order(users, lambda user: (-user.date_joined.timestamp(), -user.pk.int))
+    assert [name for page in pages for name in page] == order
+    assert [len(page) for page in pages] == [3, 3, 2]
+
+    # Walking back from the last page returns the same pages.
+    back, first = walk(last['previous'], 'previous')
+    assert back == pages[-2::-1]
+    assert first['next'] is not None
+
+
+def test_ordering_filter_is_honoured(users):
+    pages, _ = walk('/users/?ordering=username', 'next')
+    assert [name for page in pages for name in page] == expected_order(users, lambda user: user.username)
+
+
+def test_forged_cursor_is_rejected(users):
+    response = UserListView.as_view()(factory.get('/users/?cursor=forged'))
+    assert response.status_code == 404
@@ -0,0 +1,61 @@
+# apps/users/tests/test_profiling.py
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.urls import reverse
+
+from apps.users.models import User
+from core.models import ProfilingConfig, RequestProfile
+from core.profiling import make_token
+
+
+@pytest.fixture
+def profiling(db, settings):
+    cache.clear()
+    settings.PROFILE_INTERVAL = 0.001
+    # A slow request: checking an Argon2 hash.
+    User.objects.create_user(email='profiled@example.com', username='profiled', password='right-password')
+    return settings
+
+
+def login(client, **headers):
+    return client.post(
+        reverse('rest_login'),
+        {'email': 'profiled@example.com', 'password': 'wrong-password'},
+        headers=headers,
+    )
+
+
+def test_signed_header_profiles_the_request(client, profiling):
+    response = login(client, **{'X-Profile': make_token()})
+    profile = RequestProfile.objects.get()
+    assert response['X-Profile-Id'] == str(profile.pk)
+    assert (profile.trigger, profile.view_name, profile.status_code) == ('HEADER', 'rest_login', 400)
+
+    folded = profile.file.read().decode().splitlines()
+    assert profile.samples == sum(int(line.rsplit(' ', 1)[1]) for line in folded) > 0
+    assert any('ProfilingMiddleware.profile' in line and 'verify' in line for line in folded)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_requests_are_profiled(async_client, profiling):
+    response = async_to_sync(async_client.post)(
+        reverse('rest_login'),
+        {'email': 'profiled@example.com', 'password': 'wrong-password'},
+        headers={'X-Profile': make_token()},
+    )
+    profile = RequestProfile.objects.get()
+    assert response['X-Profile-Id'] == str(profile.pk)
+    # The sync view ran on the sampled worker thread.
+    folded = profile.file.read().decode().splitlines()
+    assert any('ProfilingMiddleware.profile' in line and 'verify' in line for line in folded)
+
+
+def test_unsigned_requests_follow_the_admin_sample_rate(client, profiling):
+    login(client, **{'X-Profile': 'profile:forged:signature'})
+    assert not RequestProfile.objects.exists()
+
+    ProfilingConfig.objects.create(sample_rate=1.0, path_prefix='/auth/')
+    login(client)
+    client.get('/metrics')
+    assert list(RequestProfile.objects.values_list('trigger', 'path')) == [('SAMPLE', reverse('rest_login'))]
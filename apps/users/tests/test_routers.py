@@ -0,0 +1,88 @@
+# apps/users/tests/test_routers.py
+import pytest
+from django.db import connections, router, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.users.admin import UserResource
+from apps.users.models import User
+from config import routers
+from config.routers import ReplicaStickinessMiddleware, STICKY_COOKIE
+
+# The replica mirrors the test database through its own connection, so the
+# rows it reads must be committed.
+pytestmark = pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+
+
+@pytest.fixture(autouse=True)
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    routers._lags.clear()
+    wrote = routers._wrote.set(False)
+    sticky = routers._sticky.set(False)
+    yield
+    routers._wrote.reset(wrote)
+    routers._sticky.reset(sticky)
+    routers._lags.clear()
+
+
+def test_reads_go_to_replica_until_a_write():
+    assert router.db_for_read(User) == 'replica'
+    with transaction.atomic():
+        assert router.db_for_read(User) == 'default'
+
+    user = User.objects.create_user(email='router@example.com', username='router')
+    assert user._state.db == 'default'
+    assert router.db_for_read(User) == 'default'
+
+
+def test_token_blacklist_reads_from_primary():
+    assert router.db_for_read(User) == 'replica'
+    assert router.db_for_read(OutstandingToken) == 'default'
+    assert router.db_for_read(BlacklistedToken) == 'default'
+
+
+def test_lagging_replica_is_skipped(monkeypatch):
+    monkeypatch.setattr(routers, 'measure_lag', lambda alias: 60.0)
+    assert router.db_for_read(User) == 'default'
+
+    # The lag is re-measured after REPLICA_LAG_CHECK_INTERVAL.
+    monkeypatch.setattr(routers, 'measure_lag', lambda alias: 0.5)
+    assert router.db_for_read(User) == 'default'
+    routers._lags.clear()
+    assert router.db_for_read(User) == 'replica'
+
+
+def test_client_sticks_to_primary_after_writing():
+    reads = []
+
+    def view(request):
+        reads.append(router.db_for_read(User))
+        if request.method == 'POST':
+            User.objects.create_user(email='sticky@example.com', username='sticky')
+        reads.append(router.db_for_read(User))
+        return HttpResponse()
+
+    middleware = ReplicaStickinessMiddleware(view)
+    factory = RequestFactory()
+
+    assert STICKY_COOKIE not in middleware(factory.get('/')).cookies
+    response = middleware(factory.post('/'))
+    assert reads == ['replica', 'replica', 'replica', 'default']
+    assert STICKY_COOKIE in response.cookies
+
+    request = factory.get('/')
+    request.COOKIES[STICKY_COOKIE] = '1'
+    middleware(request)
+    middleware(factory.get('/'))
+    assert reads[4:] == ['default', 'default', 'replica', 'replica']
+
+
+def test_export_reads_from_replica():
+    User.objects.create_user(email='export@example.com', username='export')
+    with CaptureQueriesContext(connections['replica']) as replica:
+        rows = list(UserResource().iter_export_rows())
+    assert len(rows) == 2 and 'export@example.com' in rows[1]
+    assert replica.captured_queries
@@ -0,0 +1,88 @@
+# apps/users/tests/test_search.py
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework import generics, serializers
+from rest_framework.permissions import AllowAny
+from rest_framework.test import APIRequestFactory
+
+from apps.users.models import User
+from core.search import TrigramSearchFilter, trigram_search
+
+factory = APIRequestFactory()
+
+
+class UserSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ('username',)
+
+
+class UserSearchView(generics.ListAPIView):
+    queryset = User.objects.order_by('username')
+    serializer_class = UserSerializer
+    pagination_class = None
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    throttle_classes = []
+    filter_backends = [TrigramSearchFilter]
+    search_fields = ('$username', '=email')
+
+
+@pytest.fixture
+def admin_client(client, db):
+    admin = User.objects.create_superuser(email='admin@example.com', username='admin', password='password')
+    client.force_login(admin)
+    return client
+
+
+@pytest.fixture
+def users(db):
+    for email, username, first_name in (
+        ('ada@example.com', 'ada', 'Ada'),
+        ('adam@example.com', 'adam', 'Adam'),
+        ('grace@example.org', 'grace', 'Grace'),
+        ('madam@example.org', 'madam', 'Madam'),
+    ):
+        User.objects.create(email=email, username=username, first_name=first_name)
+
+
+def search(fields, term):
+    return sorted(trigram_search(User.objects.all(), fields, term).values_list('username', flat=True))
+
+
+def test_substring_and_short_prefix(users):
+    assert search(['first_name'], 'ada') == ['ada', 'adam', 'madam']
+    # Below the trigram length, terms only match as prefixes.
+    assert search(['first_name'], 'ad') == ['ada', 'adam']
+
+
+def test_every_term_must_match(users):
+    assert search(['username', 'email'], 'ada .org') == ['madam']
+    assert search(['username'], '"ada" "grace"') == []
+
+
+def test_prefixed_fields(users):
+    assert search(['^username'], 'ada') == ['ada', 'adam']
+    assert search(['=username'], 'ADA') == ['ada']
+    assert search(['$username'], '^ad.m$') == ['adam']
+
+
+def test_filter_uses_drf_prefixes(users):
+    response = UserSearchView.as_view()(factory.get('/', {'search': '^(ada|madam)$'}))
+    assert [row['username'] for row in response.data] == ['ada', 'madam']
+    response = UserSearchView.as_view()(factory.get('/', {'search': 'GRACE@example.org'}))
+    assert [row['username'] for row in response.data] == ['grace']
+    response = UserSearchView.as_view()(factory.get('/', {'search': ''}))
+    assert len(response.data) == 4
+
+
+@pytest.mark.skipif(connection.vendor != 'postgresql', reason="full-text search needs PostgreSQL")
+def test_full_text_prefix(users):
+    assert search(['@first_name'], 'grace') == ['grace']
+
+
+def test_admin_search(admin_client, users):
+    response = admin_client.get(reverse('admin:users_user_changelist'), {'q': 'ada'})
+    assert response.status_code == 200
+    assert sorted(user.username for user in response.context['cl'].result_list) == ['ada', 'adam', 'madam']
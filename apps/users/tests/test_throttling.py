@@ -0,0 +1,81 @@
+# apps/users/tests/test_throttling.py
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from core.checks import check_throttle_cache
+from core.throttling import SlidingWindowThrottle
+
+
+@pytest.fixture
+def clock(monkeypatch, settings):
+    cache.clear()
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'login': '3/min'},
+    }
+    now = [6000.0]  # the start of a one-minute window
+    monkeypatch.setattr(SlidingWindowThrottle, 'timer', staticmethod(lambda: now[0]))
+    return now
+
+
+def login(client, email, ip='10.0.0.1'):
+    return client.post(reverse('rest_login'), {'email': email, 'password': 'wrong'}, REMOTE_ADDR=ip)
+
+
+@pytest.mark.django_db
+def test_login_is_limited_per_ip_and_per_email(client, clock):
+    for _ in range(3):
+        assert login(client, 'victim@example.com').status_code == 400
+    response = login(client, 'victim@example.com')
+    assert response.status_code == 429
+    assert 0 < int(response['Retry-After']) <= 120
+
+    # Same IP, other account; and same account, other IP.
+    assert login(client, 'other@example.com').status_code == 429
+    assert login(client, 'victim@example.com', ip='10.0.0.2').status_code == 429
+    assert login(client, 'other@example.com', ip='10.0.0.3').status_code == 400
+
+
+@pytest.mark.django_db
+def test_previous_window_weighs_in_as_it_slides_out(client, clock):
+    for _ in range(3):
+        login(client, 'slide@example.com', ip='10.0.1.1')
+    # 20s into the next window the previous 3 still count for 2.
+    clock[0] += 80
+    assert login(client, 'slide2@example.com', ip='10.0.1.1').status_code == 400
+    assert login(client, 'slide3@example.com', ip='10.0.1.1').status_code == 429
+    # The rejected attempt counts as well: still 0.25 + 3 at the end of the window.
+    clock[0] += 35
+    assert login(client, 'slide4@example.com', ip='10.0.1.1').status_code == 429
+    clock[0] += 25
+    assert login(client, 'slide5@example.com', ip='10.0.1.1').status_code == 400
+
+
+@pytest.mark.django_db
+def test_forwarded_for_cannot_be_spoofed(client, clock, settings):
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}
+
+    def login_via_proxy(email, forwarded_for):
+        return client.post(
+            reverse('rest_login'), {'email': email, 'password': 'wrong'},
+            REMOTE_ADDR='10.0.0.254', HTTP_X_FORWARDED_FOR=forwarded_for,
+        )
+
+    # The client makes up the first address; the proxy appends the real one.
+    for i in range(3):
+        assert login_via_proxy(f'spoof{i}@example.com', f'192.0.2.{i}, 10.0.2.1').status_code == 400
+    assert login_via_proxy('spoof9@example.com', '192.0.2.9, 10.0.2.1').status_code == 429
+
+
+def test_throttle_cache_needs_atomic_incr(settings):
+    settings.DEBUG = False
+    settings.CACHES = {**settings.CACHES, 'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp/cache',
+    }}
+    assert [error.id for error in check_throttle_cache(None)] == ['core.E002']
+
+    settings.CACHES = {**settings.CACHES, 'shared': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379/1',
+    }}
+    assert check_throttle_cache(None) == []
@@ -0,0 +1,120 @@
+# apps/users/tests/test_tokens.py
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.users.models import User
+from core.bloom import BloomFilter
+from core.tokens import BlacklistFilter, RefreshToken, blacklist_filter, prune_expired_tokens
+
+
+@pytest.fixture(autouse=True)
+def fresh_filter():
+    cache.clear()
+    blacklist_filter.reset()
+    yield
+    blacklist_filter.reset()
+
+
+@pytest.fixture
+def refresh(db):
+    user = User.objects.create_user(email='jwt@example.com', username='jwt', password='password')
+    return RefreshToken.for_user(user)
+
+
+def blacklist_lookups(queries):
+    # BlacklistedToken.objects.filter(token__jti=...).exists()
+    return [q['sql'] for q in queries if q['sql'].startswith('SELECT 1 AS "a" FROM "token_blacklist_blacklistedtoken"')]
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    for i in range(1000):
+        bloom.add(f'jti-{i}')
+    assert all(f'jti-{i}' in bloom for i in range(1000))
+    false_positives = sum(f'other-{i}' in bloom for i in range(10_000))
+    assert false_positives < 300
+
+    copy = BloomFilter.from_dict(bloom.to_dict())
+    assert 'jti-1' in copy and len(copy) == 1000
+
+
+def test_refresh_skips_blacklist_lookup(client, refresh):
+    url = reverse('token_refresh')
+    # The first check in a process builds the filter from the table.
+    blacklist_filter.might_be_blacklisted('warm-up')
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.post(url, {'refresh': str(refresh)})
+    assert response.status_code == 200
+    assert blacklist_lookups(ctx.captured_queries) == []
+
+    # The rotated token was blacklisted and is now in the filter.
+    response = client.post(url, {'refresh': str(refresh)})
+    assert response.status_code == 401
+
+
+def test_verify_rejects_blacklisted_token(client, refresh):
+    refresh.blacklist()
+    response = client.post(reverse('token_verify'), {'token': str(refresh)})
+    assert response.status_code == 400
+
+
+def test_other_processes_see_blacklisted_tokens(refresh):
+    other = BlacklistFilter()
+    assert not other.might_be_blacklisted(str(refresh['jti']))
+
+    refresh.blacklist()
+    assert BlacklistedToken.objects.count() == 1
+    assert other.might_be_blacklisted(str(refresh['jti']))
+
+    # A process starting now loads the snapshot and replays the log.
+    assert BlacklistFilter().might_be_blacklisted(str(refresh['jti']))
+
+
+def test_prune_expired_tokens_in_batches(refresh):
+    expired = timezone.now() - timedelta(minutes=1)
+    tokens = OutstandingToken.objects.bulk_create(
+        OutstandingToken(jti=f'expired-{i}', token='', expires_at=expired) for i in range(5)
+    )
+    BlacklistedToken.objects.bulk_create(BlacklistedToken(token=token) for token in tokens[:3])
+
+    assert prune_expired_tokens(batch_size=2) == {'outstanding': 5, 'blacklisted': 3, 'batches': 3}
+    assert list(OutstandingToken.objects.values_list('jti', flat=True)) == [refresh['jti']]
+
+    out = StringIO()
+    call_command('prune_tokens', stdout=out)
+    assert out.getvalue().startswith('Deleted 0 outstanding and 0 blacklisted tokens in 0 batches')
+
+
+def test_failed_publish_makes_other_processes_rebuild(refresh, monkeypatch):
+    other = BlacklistFilter()
+    assert not other.might_be_blacklisted(str(refresh['jti']))
+
+    def record(jti):
+        raise ConnectionError("cache unavailable")
+
+    monkeypatch.setattr(blacklist_filter, 'record', record)
+    refresh.blacklist()
+    assert other.might_be_blacklisted(str(refresh['jti']))
+
+
+def test_cache_flush_makes_other_processes_rebuild(refresh):
+    other = BlacklistFilter()
+    blacklist_filter.record('old')
+    assert other.might_be_blacklisted('old')
+
+    # The log starts over and reuses sequence number 1, which `other` has
+    # already seen.
+    cache.clear()
+    refresh.blacklist()
+    blacklist_filter.record('new')
+    assert other.might_be_blacklisted(str(refresh['jti']))
@@ -1,25 +1,42 @@
 # apps/users/views.py
+import json
 
-from django.http import HttpResponseRedirect
+from asgiref.sync import sync_to_async
+from django.core import signing
+from django.http import Http404, HttpResponseRedirect, JsonResponse
 from django.conf import settings
+from django.views.decorators.csrf import csrf_exempt
+from django.views.generic import View
+from allauth.account import app_settings as account_settings
+from allauth.account.models import EmailAddress, EmailConfirmation, EmailConfirmationHMAC
 from allauth.account.views import ConfirmEmailView
-from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
-from allauth.socialaccount.providers.oauth2.client import OAuth2Client
+from allauth.core.exceptions import ImmediateHttpResponse
+from allauth.socialaccount.providers.oauth2.client import OAuth2Client, OAuth2Error
 from dj_rest_auth.registration.views import SocialLoginView
 from django.contrib.auth import get_user_model
 from config.settings.auth import AuthenticationConfig
+from apps.users.adapters import LocalGoogleOAuth2Adapter
 from django.template.loader import render_to_string
 from rest_framework import status
+from rest_framework.exceptions import Throttled
+from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
 User = get_user_model()
 
 class GoogleLoginView(SocialLoginView):
-    adapter_class = GoogleOAuth2Adapter
+    adapter_class = LocalGoogleOAuth2Adapter
+    throttle_scope = 'google'
     callback_url = settings.WEBSITE_FRONTEND_URL  # Update this to match your frontend URL
     client_class = OAuth2Client
 
-    def post(self, request, *args, **kwargs):
+    def post(self, request, *args, exchanged_tokens=None, **kwargs):
+        # Passed by AsyncGoogleLoginView, which exchanged the code already.
+        if exchanged_tokens:
+            mutable_data = {key: value for key, value in request.data.items() if key != 'code'}
+            mutable_data.update(exchanged_tokens)
+            request._full_data = mutable_data
         try:
             response = super().post(request, *args, **kwargs)
             if response.status_code == 200:
@@ -44,7 +61,8 @@ class CustomConfirmEmailView(ConfirmEmailView):
         
 
 class GoogleOneTapView(SocialLoginView):
-    adapter_class = GoogleOAuth2Adapter
+    adapter_class = LocalGoogleOAuth2Adapter
+    throttle_scope = 'google'
     client_class = OAuth2Client
     callback_url = "http://localhost:8000/"  # Not strictly used in One Tap, but required by allauth
 
@@ -61,10 +79,173 @@ class GoogleOneTapView(SocialLoginView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Hack: rename it to 'access_token'
+        # Hack: rename it to 'access_token'; passed as 'id_token' as well so
+        # the adapter verifies it locally instead of calling Google's userinfo.
         mutable_data = request.data.copy()
         mutable_data['access_token'] = id_token
+        mutable_data['id_token'] = id_token
         request._full_data = mutable_data
 
         # Now let the parent handle it
-        return super().post(request, *args, **kwargs)
\ No newline at end of file
+        try:
+            return super().post(request, *args, **kwargs)
+        except OAuth2Error as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+
+class AsyncAPIView(View):
+    """
+    Base for the async auth endpoints: CSRF-exempt like DRF's API views,
+    reading JSON or form-encoded bodies.
+    """
+
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def get_data(self, request):
+        if request.content_type == 'application/json':
+            try:
+                return json.loads(request.body or b'{}')
+            except ValueError:
+                return {}
+        return request.POST
+
+    async def check_throttles(self, request):
+        """
+        APIView.check_throttles() for views that work before handing the
+        request to a DRF view: a 429 response when a throttle rejects it,
+        None otherwise.
+        """
+        # The counters live in THROTTLE_CACHE.
+        durations = await sync_to_async(self.get_throttle_durations)(request, self.get_data(request))
+        if not durations:
+            return None
+        exc = Throttled(max((duration for duration in durations if duration is not None), default=None))
+        response = JsonResponse({'detail': exc.detail}, status=exc.status_code)
+        if exc.wait is not None:
+            response['Retry-After'] = '%d' % exc.wait
+        return response
+
+    def get_throttle_durations(self, request, data):
+        """
+        wait() of each throttle rejecting the request.
+        """
+        drf_request = Request(request)
+        drf_request._full_data = data
+        throttles = [throttle_class() for throttle_class in self.throttle_classes]
+        return [throttle.wait() for throttle in throttles if not throttle.allow_request(drf_request, self)]
+
+
+class AsyncGoogleLoginView(AsyncAPIView):
+    """
+    GoogleLoginView for ASGI workers. The request is throttled first, then
+    the authorization code is exchanged with Google on the executor while
+    the event loop serves other requests; the login itself (accounts, JWT)
+    then runs in GoogleLoginView, which does not throttle it again.
+    """
+
+    throttle_scope = GoogleLoginView.throttle_scope
+    login_view = staticmethod(GoogleLoginView.as_view(throttle_classes=[]))
+
+    async def post(self, request, *args, **kwargs):
+        throttled = await self.check_throttles(request)
+        if throttled is not None:
+            return throttled
+        code = self.get_data(request).get('code')
+        if code:
+            try:
+                kwargs['exchanged_tokens'] = await self.exchange_code(request, code)
+            except OAuth2Error:
+                return JsonResponse({'error': 'Failed to exchange code for access token'}, status=400)
+        return await sync_to_async(self.login_view)(request, *args, **kwargs)
+
+    async def exchange_code(self, request, code):
+        view = GoogleLoginView
+        adapter = view.adapter_class(request)
+        # Looks the SocialApp up in the database.
+        provider = await sync_to_async(adapter.get_provider)()
+        app = provider.app
+        client = view.client_class(
+            request,
+            app.client_id,
+            app.secret,
+            adapter.access_token_method,
+            adapter.access_token_url,
+            view.callback_url,
+            scope_delimiter=adapter.scope_delimiter,
+            headers=adapter.headers,
+            basic_auth=adapter.basic_auth,
+        )
+        # Network only, no database: it need not run on the request's thread.
+        token = await sync_to_async(client.get_access_token, thread_sensitive=False)(code)
+        return {
+            key: token[key]
+            for key in ('access_token', 'id_token')
+            if key in token
+        }
+
+
+class AsyncGoogleOneTapView(AsyncAPIView):
+    """
+    GoogleOneTapView for ASGI workers.
+    """
+
+    login_view = staticmethod(GoogleOneTapView.as_view())
+
+    async def post(self, request, *args, **kwargs):
+        return await sync_to_async(self.login_view)(request, *args, **kwargs)
+
+
+async def aget_email_confirmation(key):
+    """
+    allauth's confirmation key lookup (signed key first, then the stored
+    confirmations) through async ORM queries. None when the key is invalid.
+    """
+    try:
+        pk = signing.loads(
+            key,
+            max_age=60 * 60 * 24 * account_settings.EMAIL_CONFIRMATION_EXPIRE_DAYS,
+            salt=account_settings.SALT,
+        )
+    except signing.BadSignature:
+        pk = None
+    if pk is not None:
+        email_address = await (
+            EmailAddress.objects.select_related('user').filter(pk=pk, verified=False).afirst()
+        )
+        return EmailConfirmationHMAC(email_address) if email_address else None
+    return await (
+        EmailConfirmation.objects.all_valid()
+        .select_related('email_address__user')
+        .filter(key=key.lower())
+        .afirst()
+    )
+
+
+class AsyncConfirmEmailView(View):
+    """
+    CustomConfirmEmailView for ASGI workers.
+    """
+
+    async def get(self, request, key):
+        try:
+            confirmation = await aget_email_confirmation(key)
+            if confirmation is None:
+                raise Http404
+            # None when the address cannot be confirmed (expired key, or
+            # verified by another account meanwhile).
+            email_address = await sync_to_async(confirmation.confirm)(request)
+        except Http404:
+            email_address = None
+        except ImmediateHttpResponse as e:
+            # Raised by the account adapter to answer the request itself.
+            return e.response
+        if email_address is None:
+            return HttpResponseRedirect(f"{settings.WEBSITE_FRONTEND_URL}/email-verification-failed")
+        return HttpResponseRedirect(f"{settings.WEBSITE_FRONTEND_URL}/email-verified")
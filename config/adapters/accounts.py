@@ -3,18 +3,18 @@ from typing import Optional, Dict, Any, Union
 from django.core.mail import EmailMessage, EmailMultiAlternatives
 from django.conf import settings
 from allauth.account.adapter import DefaultAccountAdapter
-from django.template.loader import render_to_string
-from django.core.mail.backends.smtp import EmailBackend
-from smtplib import SMTPException
+
+from core.backends.email import PooledEmailBackend
+from core.email_rendering import get_email_template
+from core.mail import enqueue_email
 
 logger = logging.getLogger(__name__)
 
-class CustomEmailBackend(EmailBackend):
-    """Custom Email Backend with enhanced debugging"""
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        if hasattr(self, 'connection'):
-            self.connection.set_debuglevel(1)
+class CustomEmailBackend(PooledEmailBackend):
+    """
+    Kept for settings that still reference it. SMTP debug output is now
+    opt-in through EMAIL_SMTP_DEBUG instead of forced on every connection.
+    """
 
 class CustomAccountAdapter(DefaultAccountAdapter):
     """
@@ -54,42 +54,26 @@ class CustomAccountAdapter(DefaultAccountAdapter):
         Renders an email using templates with enhanced logging and customization
         """
         try:
-            # Get the subject
-            subject = self.format_email_subject(
-                render_to_string(f'{template_prefix}_subject.txt', context)
-            ).strip()
-
-            # Render both text and HTML versions
-            text_body = render_to_string(f'{template_prefix}_message.txt', context)
-            html_body = render_to_string(f'{template_prefix}_message.html', context)
-
             # Log the email content for debugging
             self.logger.debug(f"Rendering email for {email}")
-            self.logger.debug(f"Subject: {subject}")
             self.logger.debug(f"Template prefix: {template_prefix}")
 
-            # Create the email message
-            msg = EmailMultiAlternatives(
-                subject=subject,
-                body=text_body,
+            # Subject, text and HTML templates are compiled once per process
+            return get_email_template(template_prefix).build_message(
+                email,
+                context,
                 from_email=self.get_from_email(),
-                to=[email],
-                headers=headers or {}
+                headers=headers,
+                subject_format=self.format_email_subject,
             )
 
-            # Attach HTML version
-            if html_body:
-                msg.attach_alternative(html_body, "text/html")
-
-            return msg
-
         except Exception as e:
             self.logger.error(f"Error rendering email: {str(e)}", exc_info=True)
             raise
 
     def send_mail(self, template_prefix: str, email: str, context: Dict[str, Any]) -> None:
         """
-        Send an email with enhanced error handling and logging
+        Queue an email in the outbox; `send_queued_mail` delivers it
         """
         try:
             # Add additional context data if needed
@@ -101,24 +85,15 @@ class CustomAccountAdapter(DefaultAccountAdapter):
             # Render and prepare the email
             msg = self.render_mail(template_prefix, email, context)
 
-            # Log the email attempt
-            self.logger.info(f"Attempting to send email to {email}")
             self.logger.debug(f"Email details: From={msg.from_email}, To={msg.to}")
 
-            # Send the email
-            msg.send()
+            # Queue the email in the current transaction
+            outbox_email = enqueue_email(msg)
 
-            # Log success
-            self.logger.info(f"Successfully sent email to {email}")
-
-        except SMTPException as e:
-            self.logger.error(f"SMTP error sending email to {email}: {str(e)}")
-            self.logger.error(f"SMTP Response: {getattr(e, 'smtp_error', 'No SMTP error details')}")
-            self.logger.error(f"SMTP Code: {getattr(e, 'smtp_code', 'No SMTP code')}")
-            raise
+            self.logger.info(f"Queued email {outbox_email.pk} to {email}")
 
         except Exception as e:
-            self.logger.error(f"Error sending email to {email}: {str(e)}", exc_info=True)
+            self.logger.error(f"Error queueing email to {email}: {str(e)}", exc_info=True)
             raise
 
     def validate_unique_email(self, email: str) -> None:
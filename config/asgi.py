@@ -0,0 +1,20 @@
+"""
+ASGI config for config project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server, e.g. ``uvicorn config.asgi:application``, and
+set ASYNC_AUTH_VIEWS=True to route the auth endpoints to their async views.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.production')
+# Read by the settings, e.g. to default DB_CONN_MAX_AGE to 0.
+os.environ.setdefault('SERVING_ASGI', 'True')
+
+application = get_asgi_application()
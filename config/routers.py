@@ -0,0 +1,160 @@
+# config/routers.py
+import contextvars
+import logging
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+STICKY_COOKIE = 'use_primary'
+
+# Apps always read from the primary: a blacklisted refresh token must be
+# rejected right away, not once the replica caught up.
+PRIMARY_ONLY_APPS = {'token_blacklist'}
+
+# Set once the current request (or thread, outside requests) wrote, or when
+# it arrives within REPLICA_STICKY_SECONDS of a previous write.
+_wrote = contextvars.ContextVar('wrote', default=False)
+_sticky = contextvars.ContextVar('sticky', default=False)
+
+# alias -> (monotonic time of the check, lag in seconds or None if unusable)
+_lags = {}
+_lags_lock = threading.Lock()
+
+
+def measure_lag(alias):
+    """
+    Seconds the replica is behind its primary, or None when it cannot be
+    reached. Only PostgreSQL replicas report a lag; others count as current.
+    """
+    connection = connections[alias]
+    try:
+        if connection.vendor != 'postgresql':
+            connection.ensure_connection()
+            return 0.0
+        with connection.cursor() as cursor:
+            # NULL on a primary, or before the replica replayed anything.
+            cursor.execute(
+                'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+                'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+            )
+            lag = cursor.fetchone()[0]
+        return float(lag or 0)
+    except Exception as e:
+        logger.warning(f"Replica {alias} unavailable: {e}")
+        return None
+
+
+def replica_lag(alias):
+    """
+    measure_lag(), re-measured at most every REPLICA_LAG_CHECK_INTERVAL
+    seconds per process.
+    """
+    now = time.monotonic()
+    with _lags_lock:
+        checked_at, lag = _lags.get(alias, (None, None))
+    if checked_at is None or now - checked_at > settings.REPLICA_LAG_CHECK_INTERVAL:
+        lag = measure_lag(alias)
+        with _lags_lock:
+            _lags[alias] = (now, lag)
+    return lag
+
+
+def read_replica():
+    """
+    A replica within REPLICA_MAX_LAG seconds of the primary, or the primary
+    when there is none. Heavy reads use it directly to stay off the primary
+    even after a write.
+    """
+    replicas = [
+        alias for alias in settings.DATABASE_REPLICAS
+        if (lag := replica_lag(alias)) is not None and lag <= settings.REPLICA_MAX_LAG
+    ]
+    return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+
+def uses_primary():
+    return _wrote.get() or _sticky.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+
+class ReplicaRouter:
+    """
+    Send reads to a replica in DATABASE_REPLICAS and writes to the primary.
+
+    Once a request writes, its remaining reads go to the primary so it sees
+    its own changes, as do reads inside a transaction. With
+    ReplicaStickinessMiddleware, so do the requests of the same client for
+    the next REPLICA_STICKY_SECONDS. Models of PRIMARY_ONLY_APPS are always
+    read from the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            not settings.DATABASE_REPLICAS
+            or model._meta.app_label in PRIMARY_ONLY_APPS
+            or uses_primary()
+        ):
+            return DEFAULT_DB_ALIAS
+        return read_replica()
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Scope the router's read-your-writes state to each request, and keep a
+    client on the primary for REPLICA_STICKY_SECONDS after it wrote, so a
+    redirect after a save does not read from a replica that lags behind.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        wrote = _wrote.set(False)
+        sticky = _sticky.set(STICKY_COOKIE in request.COOKIES)
+        try:
+            return self.process_response(self.get_response(request))
+        finally:
+            _wrote.reset(wrote)
+            _sticky.reset(sticky)
+
+    async def __acall__(self, request):
+        wrote = _wrote.set(False)
+        sticky = _sticky.set(STICKY_COOKIE in request.COOKIES)
+        try:
+            return self.process_response(await self.get_response(request))
+        finally:
+            _wrote.reset(wrote)
+            _sticky.reset(sticky)
+
+    def process_response(self, response):
+        if _wrote.get() and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
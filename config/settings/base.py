@@ -69,6 +69,9 @@ TAGGIT_CASE_INSENSITIVE = True
 # MIDDLEWARE
 # --------------------------------------------------------------------------
 MIDDLEWARE = [
+    'core.metrics.InstrumentationMiddleware',  # Per-view timings for /metrics
+    'core.profiling.ProfilingMiddleware',  # Opt-in request profiles
+    'config.routers.ReplicaStickinessMiddleware',  # Read-your-writes on replicas
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS should be placed above CommonMiddleware
     'django.middleware.common.CommonMiddleware',
@@ -79,6 +82,17 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Share of requests whose queries, cache lookups and outbound HTTP calls
+# are counted; every request's wall time is recorded regardless
+METRICS_SAMPLE_RATE = float(os.getenv('METRICS_SAMPLE_RATE', 0.1))
+# Each process publishes its metrics to METRICS_CACHE this often (seconds);
+# /metrics exports those of all processes, labelled by process
+METRICS_CACHE = 'shared'
+METRICS_FLUSH_INTERVAL = int(os.getenv('METRICS_FLUSH_INTERVAL', 10))
+# Bearer token the Prometheus scraper sends to /metrics; without one the
+# endpoint only answers when DEBUG is on
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
 # --------------------------------------------------------------------------
 # CORS SETTINGS
 # --------------------------------------------------------------------------
@@ -96,6 +110,11 @@ CORS_ALLOWED_ORIGINS = [
 ROOT_URLCONF = 'config.urls'
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
+
+# Route the Google login, One Tap and email confirmation endpoints to their
+# async views; turn on when serving config.asgi
+ASYNC_AUTH_VIEWS = os.getenv('ASYNC_AUTH_VIEWS', 'False') == 'True'
 
 # --------------------------------------------------------------------------
 # TEMPLATES
@@ -119,6 +138,23 @@ TEMPLATES = [
 # --------------------------------------------------------------------------
 # DATABASES
 # --------------------------------------------------------------------------
+# Connection reuse. DB_POOL=True hands out connections from psycopg 3's
+# pool (needs psycopg[pool]), shared by the threads of a process; otherwise
+# each thread keeps its own connection for DB_CONN_MAX_AGE seconds. Either
+# way connections are checked before reuse (CONN_HEALTH_CHECKS).
+# config.asgi sets SERVING_ASGI: there, sync code runs on threads that come
+# and go, so persistent connections would pile up and DB_CONN_MAX_AGE
+# defaults to 0 (use DB_POOL to reuse connections).
+SERVING_ASGI = os.getenv('SERVING_ASGI', 'False') == 'True'
+DB_POOL = os.getenv('DB_POOL', 'False') == 'True'
+DB_POOL_OPTIONS = {
+    'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+    'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),  # seconds to wait for a free connection
+    'max_idle': 300,  # seconds before an idle connection above min_size is closed
+    'max_lifetime': 1800,  # connections are recycled after this many seconds
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -127,19 +163,75 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
         'PORT': os.getenv('DB_PORT', '5432'),
+        # Pooling and persistent connections are mutually exclusive
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv('DB_CONN_MAX_AGE', 0 if SERVING_ASGI else 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'pool': DB_POOL_OPTIONS} if DB_POOL else {},
     }
 }
 
+# Read replicas, e.g. DB_REPLICA_HOSTS=replica-1.internal,replica-2.internal.
+# config.routers.ReplicaRouter sends reads to those within REPLICA_MAX_LAG
+# seconds of the primary (measured every REPLICA_LAG_CHECK_INTERVAL
+# seconds); a request that wrote reads from the primary, and so does its
+# client for REPLICA_STICKY_SECONDS afterwards.
+DATABASE_REPLICAS = []
+for number, host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), 1):
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['config.routers.ReplicaRouter']
+REPLICA_MAX_LAG = float(os.getenv('REPLICA_MAX_LAG', 5))
+REPLICA_LAG_CHECK_INTERVAL = 5
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 10))
+
+# --------------------------------------------------------------------------
+# CACHES
+# --------------------------------------------------------------------------
+# 'default' is a bounded per-process LRU in front of 'shared', the cache
+# every process sees (use core.cache for namespaced keys and get-or-compute).
+# Local copies live at most CACHE_LOCAL_TIMEOUT seconds, so another
+# process's writes and deletes show up within that delay, and never past the
+# shared entry's own expiry. The file default only suits a single host:
+# with DEBUG off, `manage.py check` fails (core.E001) until 'shared' points
+# at Redis or Memcached, e.g.
+# SHARED_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# SHARED_CACHE_LOCATION=redis://127.0.0.1:6379/1
+CACHES = {
+    'default': {
+        'BACKEND': 'core.backends.cache.TieredCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_LOCAL_MAX_ENTRIES', 5000)),
+            'LOCAL_TIMEOUT': int(os.getenv('CACHE_LOCAL_TIMEOUT', 5)),
+            'LOCK_TIMEOUT': 10,  # seconds get_or_set() waits for another process
+        },
+    },
+    'shared': {
+        'BACKEND': os.getenv('SHARED_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('SHARED_CACHE_LOCATION', '/var/tmp/django_cache'),
+        'TIMEOUT': 300,
+    },
+}
+
 # --------------------------------------------------------------------------
 # AUTHENTICATION & AUTHORIZATION
 # --------------------------------------------------------------------------
 AUTH_USER_MODEL = 'users.User'
 
 AUTHENTICATION_BACKENDS = [
-    'django.contrib.auth.backends.ModelBackend',  # Default Django backend
+    'core.backends.auth.CachedModelBackend',  # ModelBackend with cached permissions
     'allauth.account.auth_backends.AuthenticationBackend',  # AllAuth
 ]
 
+# Resolved permission sets, expired by group/permission changes (core.signals)
+PERMISSION_CACHE = 'default'
+PERMISSION_CACHE_TTL = int(os.getenv('PERMISSION_CACHE_TTL', 3600))
+
 # Password Validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -156,6 +248,23 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# New passwords are hashed with Argon2id; older hashes (PBKDF2, or Argon2
+# with other costs) are rehashed on the next successful login
+PASSWORD_HASHERS = [
+    'core.hashers.Argon2PasswordHasher',
+    'core.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+# Argon2id costs: passes, memory in KiB, lanes (OWASP's 19 MiB / 2 passes)
+ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', 2))
+ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', 19456))
+ARGON2_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', 1))
+
+# Processes hashing passwords off the request threads; 0 hashes in-thread
+# (fine for one-thread-per-process workers, which gain nothing from a pool)
+PASSWORD_HASHING_WORKERS = int(os.getenv('PASSWORD_HASHING_WORKERS', 0))
+
 # --------------------------------------------------------------------------
 # INTERNATIONALIZATION
 # --------------------------------------------------------------------------
@@ -179,6 +288,10 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # --------------------------------------------------------------------------
 DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
 
+# UUIDModel primary keys: 7 = time-ordered UUIDv7 (new rows append to the
+# end of the primary key index), 4 = fully random UUIDv4
+UUID_PRIMARY_KEY_VERSION = int(os.getenv('UUID_PRIMARY_KEY_VERSION', 7))
+
 # --------------------------------------------------------------------------
 # THIRD-PARTY STORAGE (AWS S3)
 # --------------------------------------------------------------------------
@@ -191,7 +304,7 @@ AWS_S3_REGION_NAME = os.getenv('AWS_S3_REGION_NAME', 'us-east-1')  # Example reg
 # --------------------------------------------------------------------------
 # EMAIL SETTINGS
 # --------------------------------------------------------------------------
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = 'core.backends.email.PooledEmailBackend'
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'wednesday.mxrouting.net')
 EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
@@ -204,12 +317,25 @@ DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'commerce@devsplug.com')
 EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', 30))
 EMAIL_SUBJECT_PREFIX = os.getenv('EMAIL_SUBJECT_PREFIX', '[Commerce Notification] ')
 
+# Outbox: transactional emails are queued in the database and delivered
+# by `python manage.py send_queued_mail`
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 50))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
+EMAIL_OUTBOX_RETRY_DELAY = int(os.getenv('EMAIL_OUTBOX_RETRY_DELAY', 60))  # seconds, doubled per attempt
+
+# SMTP connection pool used by PooledEmailBackend
+EMAIL_POOL_SIZE = int(os.getenv('EMAIL_POOL_SIZE', 4))
+EMAIL_POOL_MAX_IDLE = int(os.getenv('EMAIL_POOL_MAX_IDLE', 240))  # seconds before an idle connection is dropped
+EMAIL_POOL_HEALTH_CHECK_AFTER = int(os.getenv('EMAIL_POOL_HEALTH_CHECK_AFTER', 30))  # seconds idle before NOOP check
+EMAIL_SMTP_DEBUG = os.getenv('EMAIL_SMTP_DEBUG', 'False') == 'True'
+
 # --------------------------------------------------------------------------
 # DJANGO REST FRAMEWORK
 # --------------------------------------------------------------------------
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication with the user resolved from a cached snapshot
+        'core.authentication.CachedJWTAuthentication',
         # 'rest_framework.authentication.SessionAuthentication',
         # 'rest_framework.authentication.TokenAuthentication',
     ],
@@ -220,8 +346,33 @@ REST_FRAMEWORK = {
         'django_filters.rest_framework.DjangoFilterBackend'
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Keyset pagination: signed cursors, no OFFSET scans on deep pages
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', 50)),
+    # Views with a throttle_scope are limited per client IP and per account
+    # (core.throttling); other views are not throttled
+    'DEFAULT_THROTTLE_CLASSES': [
+        'core.throttling.SlidingWindowThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'login': os.getenv('THROTTLE_LOGIN_RATE', '10/min'),
+        'register': os.getenv('THROTTLE_REGISTER_RATE', '5/min'),
+        'password_reset': os.getenv('THROTTLE_PASSWORD_RESET_RATE', '5/min'),
+        'google': os.getenv('THROTTLE_GOOGLE_RATE', '20/min'),
+        # Remaining dj-rest-auth views (logout, password change, email verification)
+        'dj_rest_auth': os.getenv('THROTTLE_AUTH_RATE', '60/min'),
+    },
+    # Reverse proxies in front of the app. Throttles key on the client
+    # address the outermost of them added to X-Forwarded-For, or on
+    # REMOTE_ADDR when 0, so clients cannot pick their own address. Set it
+    # to 1 behind one proxy.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
 }
 
+# Cache holding the throttle counters; must be shared by all processes and
+# increment atomically (checked as core.E002 with DEBUG off)
+THROTTLE_CACHE = 'default'
+
 # --------------------------------------------------------------------------
 # SIMPLE JWT SETTINGS
 # --------------------------------------------------------------------------
@@ -237,6 +388,24 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Refresh and verify skip the BlacklistedToken lookup for JTIs a per-process
+# Bloom filter rules out. 'shared' enables it only when JWT_BLACKLIST_CACHE
+# is Redis or Memcached (not LocMem or files), 'on' always (single process),
+# 'off' never.
+JWT_BLACKLIST_FILTER = os.getenv('JWT_BLACKLIST_FILTER', 'shared')
+JWT_BLACKLIST_CACHE = 'shared'  # the Bloom filter already is the local tier
+JWT_BLACKLIST_FILTER_CAPACITY = int(os.getenv('JWT_BLACKLIST_FILTER_CAPACITY', 100_000))
+JWT_BLACKLIST_FILTER_ERROR_RATE = 0.001
+JWT_BLACKLIST_FILTER_REBUILD_AFTER = 3600
+
+# API requests authenticate against a user snapshot cached in
+# USER_SNAPSHOT_CACHE for USER_SNAPSHOT_TTL seconds; saves drop it.
+USER_SNAPSHOT_CACHE = 'default'
+USER_SNAPSHOT_TTL = int(os.getenv('USER_SNAPSHOT_TTL', 60))
+
+# Rows deleted per transaction by `manage.py prune_tokens`
+TOKEN_PRUNE_BATCH_SIZE = int(os.getenv('TOKEN_PRUNE_BATCH_SIZE', 5000))
+
 # --------------------------------------------------------------------------
 # DJ-REST-AUTH SETTINGS
 # --------------------------------------------------------------------------
@@ -284,6 +453,43 @@ TEMPLATE_EXTENSION = 'html'
 SITE_ID = 2
 WEBSITE_FRONTEND_URL = 'http://localhost:8000'
 
+# --------------------------------------------------------------------------
+# ADMIN
+# --------------------------------------------------------------------------
+# Changelists above this many rows show PostgreSQL's row estimate instead of
+# running COUNT(*); append ?exact_count=1 to a changelist URL for exact counts
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.getenv('ADMIN_ESTIMATED_COUNT_THRESHOLD', 100_000))
+
+# Raise when a changelist render runs more queries than its admin's
+# changelist_query_budget (turned on in tests)
+ADMIN_QUERY_BUDGET_ENFORCED = False
+
+# django-import-export: rows fetched per query by streaming exports and rows
+# per bulk write / transaction for ChunkedModelResource imports
+IMPORT_EXPORT_CHUNK_SIZE = int(os.getenv('IMPORT_EXPORT_CHUNK_SIZE', 2000))
+IMPORT_EXPORT_BATCH_SIZE = int(os.getenv('IMPORT_EXPORT_BATCH_SIZE', 1000))
+
+# Admin imports/exports above these sizes are queued as DataJobs and run by
+# `manage.py run_data_jobs`; their files go to DATA_JOB_STORAGE (a STORAGES
+# alias or a storage class path)
+DATA_JOB_EXPORT_THRESHOLD = int(os.getenv('DATA_JOB_EXPORT_THRESHOLD', 50_000))
+DATA_JOB_IMPORT_THRESHOLD_BYTES = int(os.getenv('DATA_JOB_IMPORT_THRESHOLD_BYTES', 5 * 1024 * 1024))
+DATA_JOB_STORAGE = os.getenv('DATA_JOB_STORAGE', DEFAULT_FILE_STORAGE)
+# A running job whose worker has not reported progress for this long is
+# requeued, up to DATA_JOB_MAX_ATTEMPTS runs in total
+DATA_JOB_STALE_AFTER = int(os.getenv('DATA_JOB_STALE_AFTER', 15 * 60))  # seconds
+DATA_JOB_MAX_ATTEMPTS = int(os.getenv('DATA_JOB_MAX_ATTEMPTS', 3))
+
+# Request profiling (core.profiling): requests carrying a PROFILE_HEADER
+# signed by `manage.py profiling_token`, or sampled at the rate set in the
+# admin, are profiled every PROFILE_INTERVAL seconds of wall time; profiles
+# go to PROFILE_STORAGE (a STORAGES alias or a storage class path)
+PROFILE_HEADER = 'X-Profile'
+PROFILE_TOKEN_MAX_AGE = int(os.getenv('PROFILE_TOKEN_MAX_AGE', 3600))
+PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', 0.005))
+PROFILE_CONFIG_TTL = int(os.getenv('PROFILE_CONFIG_TTL', 30))
+PROFILE_STORAGE = os.getenv('PROFILE_STORAGE', DEFAULT_FILE_STORAGE)
+
 # --------------------------------------------------------------------------
 # DRF SPECTACULAR SETTINGS (Optional)
 # --------------------------------------------------------------------------
@@ -320,6 +526,24 @@ SOCIALACCOUNT_EMAIL_VERIFICATION = 'none'  # Keep this as none for Google
 SOCIALACCOUNT_AUTO_SIGNUP = True
 SOCIALACCOUNT_EMAIL_REQUIRED = True
 SOCIALACCOUNT_ADAPTER = 'apps.users.adapters.CustomSocialAccountAdapter'
+
+# Google ID tokens (One Tap, code exchange) are verified locally against
+# Google's signing keys, cached for their Cache-Control max-age (or
+# GOOGLE_JWKS_TTL seconds) and fetched again when an unknown key id shows up
+GOOGLE_JWKS_URL = 'https://www.googleapis.com/oauth2/v3/certs'
+GOOGLE_JWKS_TTL = 3600
+GOOGLE_ID_TOKEN_ISSUERS = ['https://accounts.google.com', 'accounts.google.com']
+
+# Outbound calls to OAuth providers share one keep-alive session per process
+# (core.http): up to HTTP_POOL_MAXSIZE idle connections to each of
+# HTTP_POOL_HOSTS hosts, connect/read timeouts in seconds, and retries with
+# exponential backoff (connection errors always, 502/503/504 for GETs only)
+HTTP_POOL_HOSTS = int(os.getenv('HTTP_POOL_HOSTS', 10))
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 20))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 3.05))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 10))
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 2))
+HTTP_RETRY_BACKOFF = float(os.getenv('HTTP_RETRY_BACKOFF', 0.2))
 ACCOUNT_ADAPTER = 'apps.users.adapters.CustomAccountAdapter'
 
 
@@ -74,12 +74,9 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 # --------------------------------------------------------------------------
 # CACHING (Optional)
 # --------------------------------------------------------------------------
-# Optional: Configure caching for development
-# CACHES = {
-#     'default': {
-#         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-#     }
-# }
+# base.py's two-tier cache works as is for a single runserver; set
+# SHARED_CACHE_BACKEND=django.core.cache.backends.locmem.LocMemCache to keep
+# the shared tier in memory too.
 
 # --------------------------------------------------------------------------
 # LOGGING (Optional)
@@ -11,7 +11,7 @@ ALLOWED_HOSTS = ['*']
 # Secure settings, logging, etc.
 
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = 'core.backends.email.PooledEmailBackend'
 
 DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
 
@@ -0,0 +1,48 @@
+# config/settings/test.py
+
+from .base import *
+
+# --------------------------------------------------------------------------
+# DATABASES
+# --------------------------------------------------------------------------
+# SQLite by default so the suite runs anywhere; set TEST_DB_ENGINE=postgresql
+# to run against the DB_* database from base.py instead.
+if os.getenv('TEST_DB_ENGINE', 'sqlite') != 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'test.sqlite3',
+        }
+    }
+
+# A replica alias mirroring the test database, for the router tests. It is
+# left out of DATABASE_REPLICAS so other tests only touch 'default'.
+DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+DATABASE_REPLICAS = []
+
+# --------------------------------------------------------------------------
+# CACHES
+# --------------------------------------------------------------------------
+# Local memory stands in for the shared tier
+CACHES['shared'] = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'test-shared',
+}
+SILENCED_SYSTEM_CHECKS = ['core.E001']
+
+# --------------------------------------------------------------------------
+# EMAIL SETTINGS
+# --------------------------------------------------------------------------
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# --------------------------------------------------------------------------
+# ADMIN
+# --------------------------------------------------------------------------
+ADMIN_QUERY_BUDGET_ENFORCED = True
+
+# Job files and profiles stay in memory
+DATA_JOB_STORAGE = 'django.core.files.storage.InMemoryStorage'
+PROFILE_STORAGE = 'django.core.files.storage.InMemoryStorage'
+
+# The suite runs in one process, so the local-memory cache is shared enough
+JWT_BLACKLIST_FILTER = 'on'
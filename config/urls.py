@@ -3,31 +3,62 @@ from django.contrib import admin
 from django.urls import path, include, re_path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from allauth.socialaccount.providers.google.views import oauth2_login
-from apps.users.views import CustomConfirmEmailView, GoogleLoginView, GoogleOneTapView
+from apps.users.views import (
+    AsyncConfirmEmailView,
+    AsyncGoogleLoginView,
+    AsyncGoogleOneTapView,
+    CustomConfirmEmailView,
+    GoogleLoginView,
+    GoogleOneTapView,
+)
 from django.views.generic import TemplateView
-from apps.users.api.views import CustomPasswordResetConfirmView
+from dj_rest_auth.views import LoginView, PasswordResetView
+from apps.users.api.views import (
+    CachedTokenRefreshView,
+    CachedTokenVerifyView,
+    CustomPasswordResetConfirmView,
+    CustomRegisterView,
+)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     re_path(
         r'^auth/registration/account-confirm-email/(?P<key>[-:\w]+)/$',
-        CustomConfirmEmailView.as_view(),
+        (AsyncConfirmEmailView if settings.ASYNC_AUTH_VIEWS else CustomConfirmEmailView).as_view(),
         name='account_confirm_email',
     ),
+    path('auth/registration/', CustomRegisterView.as_view(), name='rest_register'),
     path('auth/registration/', include('dj_rest_auth.registration.urls')),
     path(r'^accounts/', include('allauth.urls')),
     path('auth/callback/', include('allauth.socialaccount.providers.google.urls')),
-    path('auth/google/onetap/', GoogleOneTapView.as_view(), name='google_onetap'),
-    path('auth/google/', GoogleLoginView.as_view(), name='google_login'),
+    path(
+        'auth/google/onetap/',
+        (AsyncGoogleOneTapView if settings.ASYNC_AUTH_VIEWS else GoogleOneTapView).as_view(),
+        name='google_onetap',
+    ),
+    path(
+        'auth/google/',
+        (AsyncGoogleLoginView if settings.ASYNC_AUTH_VIEWS else GoogleLoginView).as_view(),
+        name='google_login',
+    ),
     re_path(
         r'^password/reset/confirm/(?P<uidb64>[A-Za-z0-9_\-]+)/(?P<token>[-\w]+)/$',
         CustomPasswordResetConfirmView.as_view(),
         name='password_reset_confirm'
     ),
+    re_path(r'^auth/token/verify/?$', CachedTokenVerifyView.as_view(), name='token_verify'),
+    re_path(r'^auth/token/refresh/?$', CachedTokenRefreshView.as_view(), name='token_refresh'),
+    re_path(r'^auth/login/?$', LoginView.as_view(throttle_scope='login'), name='rest_login'),
+    re_path(
+        r'^auth/password/reset/?$',
+        PasswordResetView.as_view(throttle_scope='password_reset'),
+        name='rest_password_reset',
+    ),
     path('auth/', include('dj_rest_auth.urls')),
     path('test/google/',TemplateView.as_view(template_name="backend/auth/test/google.html")),
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    path('', include('core.urls')),
     
 ]
 
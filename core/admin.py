@@ -1,5 +1,153 @@
 from django.contrib import admin
+from django.http import HttpResponseRedirect
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+from django.urls import reverse
+from django.utils.html import format_html
+
+from unfold.admin import ModelAdmin as UnfoldModelAdmin
+from unfold.decorators import action
+
+from .data_jobs import confirm_import
+
+from .admin_mixins import EstimatedCountMixin
+from .models import DataJob, OutboxEmail, ProfilingConfig, RequestProfile
 
 admin.site.site_header = "Commerce Admin "
 admin.site.site_title = "Admin Portal"
 admin.site.index_title = "Welcome to Commerce"
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(EstimatedCountMixin, UnfoldModelAdmin):
+    """
+    Read-only view of the transactional email outbox.
+    """
+    list_display = ('id', 'subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
+    ordering = ('-created_at',)
+    fields = (
+        'subject', 'body', 'html_body', 'from_email', 'to', 'cc', 'bcc', 'reply_to', 'headers',
+        'status', 'attempts', 'next_attempt_at', 'last_error', 'created_at', 'sent_at',
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DataJob)
+class DataJobAdmin(UnfoldModelAdmin):
+    """
+    Status pages of queued admin imports and exports. Jobs are created by
+    DataJobMixin and run by the `run_data_jobs` worker.
+
+    Imports whose dry run passed are written once confirmed with the
+    "Confirm import" action, by the user who queued them or a superuser.
+    """
+    list_display = ('id', 'kind', 'filename', 'status', 'progress', 'throughput', 'created_by', 'created_at')
+    list_filter = ('kind', 'status')
+    list_select_related = ('created_by',)
+    ordering = ('-created_at',)
+    fields = (
+        'kind', 'status', 'dry_run', 'resource', 'filename', 'progress', 'throughput', 'download',
+        'totals', 'error', 'created_by', 'created_at', 'started_at', 'finished_at', 'attempts',
+    )
+    readonly_fields = fields
+    actions_detail = ['confirm_import']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_confirm_import_permission(self, request, object_id=None):
+        if object_id is None:
+            return request.user.is_superuser
+        return DataJob.objects.filter(
+            pk=object_id, kind=DataJob.KIND_IMPORT, status=DataJob.STATUS_REVIEW,
+        ).filter(
+            **({} if request.user.is_superuser else {'created_by': request.user})
+        ).exists()
+
+    @action(description="Confirm import", url_path='confirm-import', permissions=['confirm_import'])
+    def confirm_import(self, request, object_id):
+        job = get_object_or_404(DataJob, pk=object_id)
+        if request.method == 'POST':
+            confirm_import(job)
+            self.message_user(request, "The import was queued; this page shows its progress.")
+            return HttpResponseRedirect(reverse(f'{self.admin_site.name}:core_datajob_change', args=[job.pk]))
+        return TemplateResponse(request, 'admin/core/datajob/confirm_import.html', {
+            **self.admin_site.each_context(request),
+            'title': "Confirm import",
+            'opts': self.opts,
+            'job': job,
+        })
+
+    @admin.display(description="Progress")
+    def progress(self, obj):
+        if obj.rows_total:
+            percent = min(100, 100 * obj.rows_processed // obj.rows_total)
+            return f"{obj.rows_processed:,} / {obj.rows_total:,} rows ({percent}%)"
+        return f"{obj.rows_processed:,} rows"
+
+    @admin.display(description="Throughput")
+    def throughput(self, obj):
+        if obj.throughput is None:
+            return "-"
+        return f"{obj.throughput:,.0f} rows/s"
+
+    @admin.display(description="File")
+    def download(self, obj):
+        if not obj.output_file:
+            return "-"
+        return format_html('<a href="{}">{}</a>', obj.output_file.url, obj.filename)
+
+
+@admin.register(ProfilingConfig)
+class ProfilingConfigAdmin(UnfoldModelAdmin):
+    """
+    The sample rate of ProfilingMiddleware; a single row.
+    """
+    list_display = ('__str__', 'sample_rate', 'path_prefix', 'updated_at')
+
+    def has_add_permission(self, request):
+        return not ProfilingConfig.objects.exists()
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(UnfoldModelAdmin):
+    """
+    Recent request profiles, downloadable as folded stacks for flamegraph
+    tools.
+    """
+    list_display = ('created_at', 'method', 'path', 'view_name', 'status_code', 'duration', 'samples', 'trigger', 'download')
+    list_filter = ('trigger', 'method', 'view_name')
+    search_fields = ('path',)
+    ordering = ('-created_at',)
+    fields = ('method', 'path', 'view_name', 'status_code', 'duration', 'samples', 'trigger', 'download', 'created_at')
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="Duration", ordering='duration_ms')
+    def duration(self, obj):
+        return f"{obj.duration_ms:,.0f} ms"
+
+    @admin.display(description="Profile")
+    def download(self, obj):
+        if not obj.file:
+            return "-"
+        return format_html('<a href="{}">{}</a>', obj.file.url, obj.file.name.rsplit('/', 1)[-1])
@@ -0,0 +1,261 @@
+# core/admin_mixins.py
+import tempfile
+from contextlib import ExitStack
+from itertools import chain
+
+from django.conf import settings
+from django.contrib.admin import helpers
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import PermissionDenied
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import FileResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.translation import gettext_lazy as _
+from import_export.signals import post_export
+
+from core.data_jobs import enqueue_export, enqueue_import
+from core.pagination import EstimatedCountPaginator
+from core.resources import ChunkedModelResource, is_streamable, is_text_streamable
+
+EXACT_COUNT_VAR = 'exact_count'
+
+
+class EstimatedFullCount:
+    """
+    Stands in for ChangeList.root_queryset when only its count() is used.
+    """
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    def count(self):
+        return EstimatedCountPaginator(self.queryset, 1).count
+
+
+class EstimatedCountChangeList(ChangeList):
+    """
+    ChangeList whose "N total" figure is estimated like the result count.
+    """
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        # Not a field lookup, but left in the query string so that page,
+        # sort and filter links stay in exact mode.
+        lookup_params.pop(EXACT_COUNT_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        root_queryset = self.root_queryset
+        if not getattr(request, 'exact_count', False):
+            self.root_queryset = EstimatedFullCount(root_queryset)
+        try:
+            super().get_results(request)
+        finally:
+            self.root_queryset = root_queryset
+
+
+class EstimatedCountMixin:
+    """
+    ModelAdmin mixin for big tables: changelists read the row count from
+    PostgreSQL statistics once it passes ADMIN_ESTIMATED_COUNT_THRESHOLD,
+    both for the filtered result count and the unfiltered total.
+
+    Add ?exact_count=1 to a changelist URL to get exact counts.
+    """
+    paginator = EstimatedCountPaginator
+
+    def changelist_view(self, request, extra_context=None):
+        request.exact_count = request.GET.get(EXACT_COUNT_VAR, '') not in ('0', '')
+        return super().changelist_view(request, extra_context)
+
+    def get_changelist(self, request, **kwargs):
+        return EstimatedCountChangeList
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return self.paginator(
+            queryset,
+            per_page,
+            orphans,
+            allow_empty_first_page,
+            exact=getattr(request, 'exact_count', False),
+        )
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryBudgetMixin:
+    """
+    ModelAdmin mixin that fails a changelist render running more than
+    `changelist_query_budget` queries, on the primary and replicas.
+
+    The budget covers the fixed overhead (session, user, counts, results),
+    not one query per row, so a list_display column that reintroduces an
+    N+1 breaks the test suite. Only enforced with ADMIN_QUERY_BUDGET_ENFORCED.
+    """
+    changelist_query_budget = 10
+
+    def changelist_view(self, request, extra_context=None):
+        if not settings.ADMIN_QUERY_BUDGET_ENFORCED:
+            return super().changelist_view(request, extra_context)
+
+        queries = []
+
+        def record(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with ExitStack() as stack:
+            for alias in [DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS]:
+                stack.enter_context(connections[alias].execute_wrapper(record))
+            response = super().changelist_view(request, extra_context)
+            # Most queries run while the lazy TemplateResponse renders rows.
+            if hasattr(response, 'render'):
+                response.render()
+
+        if len(queries) > self.changelist_query_budget:
+            raise QueryBudgetExceeded(
+                f"{type(self).__name__} changelist ran {len(queries)} queries, "
+                f"budget is {self.changelist_query_budget}:\n" + '\n'.join(queries)
+            )
+        return response
+
+
+class StreamingImportExportMixin:
+    """
+    ImportExportModelAdmin mixin for resources built on
+    core.resources.ChunkedModelResource.
+
+    CSV and TSV exports are streamed while the queryset is iterated, XLSX is
+    built with a write-only workbook in a temporary file; other formats fall
+    back to the in-memory tablib export. Confirmed imports run chunk by
+    chunk. Per-row admin log entries are skipped, as bulk writes have no
+    per-row save.
+    """
+    skip_admin_log = True
+
+    def _do_file_export(self, file_format, request, queryset, export_form=None):
+        resource_class = self.choose_export_resource_class(export_form, request)
+        if not (issubclass(resource_class, ChunkedModelResource) and is_streamable(file_format)):
+            return super()._do_file_export(file_format, request, queryset, export_form=export_form)
+        if not self.has_export_permission(request):
+            raise PermissionDenied
+
+        resource = resource_class(**self.get_export_resource_kwargs(request, export_form=export_form))
+        export_fields = self.get_export_resource_fields_from_form(export_form)
+        content_type = file_format.get_content_type()
+        if is_text_streamable(file_format):
+            response = StreamingHttpResponse(
+                resource.stream_export(file_format, queryset, encoding=self.to_encoding, export_fields=export_fields),
+                content_type=content_type,
+            )
+        else:
+            fileobj = tempfile.TemporaryFile()
+            resource.export_to_file(fileobj, file_format, queryset, export_fields=export_fields)
+            fileobj.seek(0)
+            response = FileResponse(fileobj, content_type=content_type)
+        response['Content-Disposition'] = 'attachment; filename="{}"'.format(
+            self.get_export_filename(request, queryset, file_format),
+        )
+        post_export.send(sender=None, model=self.model)
+        return response
+
+    def process_dataset(self, dataset, form, request, **kwargs):
+        resource_class = self.choose_import_resource_class(form, request)
+        if not issubclass(resource_class, ChunkedModelResource):
+            return super().process_dataset(dataset, form, request, **kwargs)
+
+        resource = resource_class(**self.get_import_resource_kwargs(request, form=form, **kwargs))
+        import_kwargs = self.get_import_data_kwargs(request=request, form=form, **kwargs)
+        return resource.import_rows(
+            chain([dataset.headers], dataset),
+            file_name=form.cleaned_data.get('original_file_name'),
+            user=request.user,
+            **import_kwargs,
+        )
+
+
+class DataJobMixin:
+    """
+    ImportExportModelAdmin mixin that moves large imports and exports out of
+    the request: they are queued as core.models.DataJob rows for the
+    `run_data_jobs` worker, and the admin is redirected to the job's status
+    page, which shows row progress and throughput and links the finished
+    file.
+
+    Exports of DATA_JOB_EXPORT_THRESHOLD rows or more (estimated on large
+    tables) and uploads of DATA_JOB_IMPORT_THRESHOLD_BYTES or more are
+    queued. Only ChunkedModelResource resources and streamable formats
+    qualify; goes before StreamingImportExportMixin in the bases.
+    """
+
+    def get_data_job_url(self, job):
+        return reverse(f'{self.admin_site.name}:core_datajob_change', args=[job.pk])
+
+    def get_export_selection(self, request, export_form=None, queryset=None):
+        """
+        What a queued export covers, as (filters, pks): the changelist query
+        parameters and the primary keys of the selected rows, or None when
+        the filters select everything exported.
+        """
+        filters = {name: request.GET.getlist(name) for name in request.GET}
+        if export_form is not None and 'export_items' in export_form.changed_data:
+            pks = export_form.cleaned_data['export_items']
+        elif export_form is None and request.method == 'POST' and request.POST.get(helpers.ACTION_CHECKBOX_NAME):
+            # Admin action run without the export form; "select all" sends
+            # no checkboxes and is covered by the filters alone.
+            pks = list(queryset.values_list('pk', flat=True))
+        else:
+            pks = None
+        return filters, pks if pks is None else [str(pk) for pk in pks]
+
+    def _do_file_export(self, file_format, request, queryset, export_form=None):
+        resource_class = self.choose_export_resource_class(export_form, request)
+        threshold = settings.DATA_JOB_EXPORT_THRESHOLD
+        if (
+            issubclass(resource_class, ChunkedModelResource)
+            and is_streamable(file_format)
+            and EstimatedCountPaginator(queryset, 1, threshold=threshold).count >= threshold
+        ):
+            if not self.has_export_permission(request):
+                raise PermissionDenied
+            filters, pks = self.get_export_selection(request, export_form, queryset)
+            job = enqueue_export(
+                resource_class,
+                file_format,
+                filters,
+                filename=self.get_export_filename(request, queryset, file_format),
+                pks=pks,
+                export_fields=self.get_export_resource_fields_from_form(export_form),
+                encoding=self.to_encoding,
+                user=request.user,
+            )
+            self.message_user(request, _("The export was queued; this page shows its progress."))
+            return HttpResponseRedirect(self.get_data_job_url(job))
+        return super()._do_file_export(file_format, request, queryset, export_form=export_form)
+
+    def import_action(self, request, **kwargs):
+        if request.method == 'POST' and self.has_import_permission(request):
+            form = self.create_import_form(request)
+            if form.is_valid():
+                import_file = form.cleaned_data['import_file']
+                resource_class = self.choose_import_resource_class(form, request)
+                input_format = self.get_import_formats()[int(form.cleaned_data['format'])]()
+                if (
+                    import_file.size >= settings.DATA_JOB_IMPORT_THRESHOLD_BYTES
+                    and issubclass(resource_class, ChunkedModelResource)
+                    and is_streamable(input_format)
+                ):
+                    job = enqueue_import(
+                        resource_class,
+                        input_format,
+                        import_file,
+                        encoding=self.from_encoding,
+                        user=request.user,
+                    )
+                    self.message_user(request, _(
+                        "The import was queued as a dry run; once it passes, confirm it on this page."
+                    ))
+                    return HttpResponseRedirect(self.get_data_job_url(job))
+        return super().import_action(request, **kwargs)
@@ -0,0 +1,16 @@
+# core/apps.py
+
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    name = 'core'
+    verbose_name = 'Core'
+
+    def ready(self):
+        """
+        Connect the cache invalidation receivers and register the system
+        checks.
+        """
+        import core.checks  # noqa: F401
+        import core.signals  # noqa: F401
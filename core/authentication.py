@@ -0,0 +1,133 @@
+# core/authentication.py
+import hashlib
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = 'user-snapshot:{}'
+VERSION_KEY = 'user-snapshot-version:{}'
+# Bumped whenever the snapshot layout changes, so entries written by older
+# code are ignored instead of misread.
+SNAPSHOT_VERSION = 2
+SNAPSHOT_FIELDS = ('id', 'email', 'is_active', 'is_verified', 'is_staff', 'is_superuser')
+
+
+def get_snapshot_cache():
+    return caches[settings.USER_SNAPSHOT_CACHE]
+
+
+def permissions_hash(user):
+    """
+    Short digest of the user's effective permissions, to tell permission
+    changes apart without loading them.
+    """
+    perms = '\n'.join(sorted(user.get_all_permissions()))
+    return hashlib.blake2b(perms.encode(), digest_size=8).hexdigest()
+
+
+def build_snapshot(user, version):
+    snapshot = {field: getattr(user, field) for field in SNAPSHOT_FIELDS}
+    snapshot['permissions_hash'] = permissions_hash(user)
+    # Lets CHECK_REVOKE_TOKEN compare against the token without the row.
+    snapshot['password_hash'] = get_md5_hash_password(user.password)
+    snapshot['version'] = version
+    snapshot['built_at'] = int(time.time())
+    return snapshot
+
+
+def snapshot_user(snapshot):
+    """
+    User instance loaded with the snapshot fields only. The other fields are
+    deferred: each loads from the database on first access, and save()
+    writes back only the loaded fields.
+    """
+    User = get_user_model()
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in snapshot]
+    return User.from_db(
+        router.db_for_read(User),
+        field_names,
+        [snapshot[name] for name in field_names],
+    )
+
+
+def invalidate_user_snapshot(user_id):
+    """
+    Give the user a new snapshot version now and again once the surrounding
+    transaction commits, so a snapshot cached in between from the old row
+    no longer matches.
+    """
+    key = VERSION_KEY.format(user_id)
+
+    def bump():
+        try:
+            get_snapshot_cache().set(key, uuid.uuid4().hex, timeout=None, version=SNAPSHOT_VERSION)
+        except Exception as e:
+            logger.error(f"Could not invalidate user snapshot {user_id}: {e}")
+
+    bump()
+    transaction.on_commit(bump)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication resolving the user from a short-lived cached snapshot
+    instead of loading the row on every request.
+
+    Snapshots are cached for USER_SNAPSHOT_TTL seconds and stamped with the
+    user's snapshot version, which changes whenever the user is saved or
+    deleted, or their groups or permissions change. A snapshot built before
+    the token was issued is not used either, so a new token always sees the
+    current row, including edits made without model signals.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        cache = get_snapshot_cache()
+        key = SNAPSHOT_KEY.format(user_id)
+        version_key = VERSION_KEY.format(user_id)
+        try:
+            found = cache.get_many([key, version_key], version=SNAPSHOT_VERSION)
+            version = found.get(version_key)
+            if version is None:
+                # New or evicted: no cached snapshot can carry this version.
+                cache.add(version_key, uuid.uuid4().hex, timeout=None, version=SNAPSHOT_VERSION)
+                version = cache.get(version_key, version=SNAPSHOT_VERSION)
+        except Exception as e:
+            logger.warning(f"User snapshot cache unavailable, using the database: {e}")
+            return super().get_user(validated_token)
+
+        snapshot = found.get(key)
+        if (
+            snapshot is None
+            or snapshot['version'] != version
+            or snapshot['built_at'] < validated_token.get('iat', 0)
+        ):
+            # Runs the active and revocation checks against the row.
+            user = super().get_user(validated_token)
+            snapshot = build_snapshot(user, version)
+            cache.set(key, snapshot, settings.USER_SNAPSHOT_TTL, version=SNAPSHOT_VERSION)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not snapshot['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != snapshot['password_hash']
+        ):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return snapshot_user(snapshot)
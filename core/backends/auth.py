@@ -0,0 +1,104 @@
+# core/backends/auth.py
+import logging
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+PERMISSIONS_KEY = 'user-perms:{}'
+VERSION_KEY = 'user-perms-version:{}'
+
+
+def get_permission_cache():
+    return caches[settings.PERMISSION_CACHE]
+
+
+def bump_permission_versions(user_ids):
+    """
+    Give the users a new permission version, so their cached permission
+    sets no longer match. Repeated once the surrounding transaction
+    commits, in case a request cached the old rows in between.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+
+    def bump():
+        try:
+            get_permission_cache().set_many(
+                {VERSION_KEY.format(user_id): uuid.uuid4().hex for user_id in user_ids},
+                timeout=None,
+            )
+        except Exception as e:
+            logger.error(f"Could not bump the permission version of {len(user_ids)} users: {e}")
+
+    bump()
+    transaction.on_commit(bump)
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend keeping each user's resolved permissions in PERMISSION_CACHE.
+
+    Entries are stamped with the user's permission version, which changes
+    whenever their groups, their direct permissions or the permissions of
+    one of their groups change (see core.signals). A permission check costs
+    one cache read per request instead of the permission-join queries.
+    """
+
+    def _get_permissions(self, user_obj, obj, from_name):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+
+        perm_cache_name = f'_{from_name}_perm_cache'
+        if not hasattr(user_obj, perm_cache_name):
+            setattr(user_obj, perm_cache_name, self.get_cached_permissions(user_obj)[from_name])
+        return getattr(user_obj, perm_cache_name)
+
+    def get_cached_permissions(self, user_obj):
+        """
+        {'user': perms, 'group': perms} for an active user, from the cache
+        when the entry is current.
+        """
+        if hasattr(user_obj, '_cached_permissions'):
+            return user_obj._cached_permissions
+
+        cache = get_permission_cache()
+        key = PERMISSIONS_KEY.format(user_obj.pk)
+        version_key = VERSION_KEY.format(user_obj.pk)
+        try:
+            found = cache.get_many([key, version_key])
+            version = found.get(version_key)
+            if version is None:
+                # New or evicted: no cached entry can carry this version.
+                cache.add(version_key, uuid.uuid4().hex, timeout=None)
+                version = cache.get(version_key)
+        except Exception as e:
+            logger.warning(f"Permission cache unavailable, using the database: {e}")
+            found, version = {}, None
+
+        entry = found.get(key)
+        if (
+            entry is None
+            or version is None
+            or entry['version'] != version
+            or entry['is_superuser'] != user_obj.is_superuser
+        ):
+            entry = {
+                'version': version,
+                'is_superuser': user_obj.is_superuser,
+                'user': super()._get_permissions(user_obj, None, 'user'),
+                'group': super()._get_permissions(user_obj, None, 'group'),
+            }
+            if version is not None:
+                try:
+                    cache.set(key, entry, settings.PERMISSION_CACHE_TTL)
+                except Exception as e:
+                    logger.warning(f"Could not cache permissions of user {user_obj.pk}: {e}")
+
+        user_obj._cached_permissions = entry
+        return entry
@@ -0,0 +1,319 @@
+# core/backends/cache.py
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from core import metrics
+
+# Local tiers shared by every thread's backend instance, keyed by the
+# shared alias and key prefix, like LocMemCache's stores.
+_tiers = {}
+_tiers_lock = threading.Lock()
+
+# Shared entries written with a timeout carry their wall-clock expiry
+# under this suffix, so local copies never outlive them.
+EXPIRY_SUFFIX = ':expires-at'
+
+STAT_NAMES = (
+    'local_hits', 'shared_hits', 'misses', 'sets', 'deletes',
+    'evictions', 'computes', 'lock_waits',
+)
+
+
+class LocalTier:
+    """
+    Bounded in-process LRU of pickled values with per-entry expiry, and the
+    hit/miss counters of the cache in front of it.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = dict.fromkeys(STAT_NAMES, 0)
+        # Striped locks that coalesce the threads computing the same key.
+        self.compute_locks = [threading.Lock() for _ in range(64)]
+
+    def get(self, key, default):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            expires_at, pickled = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return default
+            self.entries.move_to_end(key)
+        return pickle.loads(pickled)
+
+    def set(self, key, value, ttl):
+        if ttl <= 0:
+            self.delete(key)
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, pickled)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def record(self, name, count=1):
+        with self.lock:
+            self.stats[name] += count
+        if name in ('local_hits', 'shared_hits'):
+            metrics.add_to_request('cache_hits', count)
+        elif name == 'misses':
+            metrics.add_to_request('cache_misses', count)
+
+
+class TieredCache(BaseCache):
+    """
+    Two-tier cache: a bounded per-process LRU in front of the cache named
+    by LOCATION, which every process shares.
+
+    Reads try the local tier first; writes go through to the shared cache.
+    Local copies live at most LOCAL_TIMEOUT seconds, which bounds how long a
+    write or delete made by another process can go unseen, and never past
+    the shared entry's expiry, which is stored next to it. get_or_set()
+    computes a missing value once: threads of a process wait on a lock, and
+    other processes on a lock key in the shared cache, for at most
+    LOCK_TIMEOUT seconds.
+
+    OPTIONS: MAX_ENTRIES (local tier size), LOCAL_TIMEOUT, LOCK_TIMEOUT.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = location
+        self.local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        self.lock_timeout = options.get('LOCK_TIMEOUT', 10)
+        tier_name = (location, self.key_prefix)
+        with _tiers_lock:
+            if tier_name not in _tiers:
+                _tiers[tier_name] = LocalTier(options.get('MAX_ENTRIES', 1000))
+            self.local = _tiers[tier_name]
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def local_ttl(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.shared.default_timeout
+        if timeout is None:
+            return self.local_timeout
+        return min(timeout, self.local_timeout)
+
+    def expires_at(self, timeout):
+        """
+        Wall-clock expiry of a shared entry written with `timeout`, or None.
+        """
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.shared.default_timeout
+        if timeout is None:
+            return None
+        return time.time() + timeout
+
+    def with_expiry(self, data, timeout):
+        """
+        `data` plus the expiry entries of its keys, for shared.set_many().
+        """
+        expires_at = self.expires_at(timeout)
+        if expires_at is None:
+            return dict(data)
+        return {**data, **{f'{key}{EXPIRY_SUFFIX}': expires_at for key in data}}
+
+    def get_shared(self, keys, version):
+        """
+        Read `keys` from the shared cache with their expiry entries, and
+        copy the values found to the local tier. Returns {key: value}.
+        """
+        found = self.shared.get_many([*keys, *(f'{key}{EXPIRY_SUFFIX}' for key in keys)], version=version)
+        values = {}
+        for key in keys:
+            if key not in found:
+                continue
+            values[key] = found[key]
+            ttl = self.local_timeout
+            expires_at = found.get(f'{key}{EXPIRY_SUFFIX}')
+            if expires_at is not None:
+                ttl = min(ttl, expires_at - time.time())
+            self.local.set(self.make_and_validate_key(key, version=version), found[key], ttl)
+        return values
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        value = self.local.get(local_key, self._missing_key)
+        if value is not self._missing_key:
+            self.local.record('local_hits')
+            return value
+        found = self.get_shared([key], version)
+        if key not in found:
+            self.local.record('misses')
+            return default
+        self.local.record('shared_hits')
+        return found[key]
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        self.shared.set_many(self.with_expiry({key: value}, timeout), timeout, version=version)
+        self.local.set(local_key, value, self.local_ttl(timeout))
+        self.local.record('sets')
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            expires_at = self.expires_at(timeout)
+            if expires_at is not None:
+                self.shared.set(f'{key}{EXPIRY_SUFFIX}', expires_at, timeout, version=version)
+            self.local.set(local_key, value, self.local_ttl(timeout))
+            self.local.record('sets')
+        else:
+            self.local.delete(local_key)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self.local.delete(self.make_and_validate_key(key, version=version))
+        touched = self.shared.touch(key, timeout, version=version)
+        if touched:
+            expires_at = self.expires_at(timeout)
+            if expires_at is None:
+                self.shared.delete(f'{key}{EXPIRY_SUFFIX}', version=version)
+            else:
+                self.shared.set(f'{key}{EXPIRY_SUFFIX}', expires_at, timeout, version=version)
+        return touched
+
+    def delete(self, key, version=None):
+        self.local.delete(self.make_and_validate_key(key, version=version))
+        self.local.record('deletes')
+        return self.shared.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        if self.local.get(local_key, self._missing_key) is not self._missing_key:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        # Counters are always read from the shared cache.
+        self.local.delete(self.make_and_validate_key(key, version=version))
+        return self.shared.incr(key, delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def get_many(self, keys, version=None):
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.local.get(self.make_and_validate_key(key, version=version), self._missing_key)
+            if value is self._missing_key:
+                missing.append(key)
+            else:
+                found[key] = value
+        self.local.record('local_hits', len(found))
+        if missing:
+            shared = self.get_shared(missing, version)
+            self.local.record('shared_hits', len(shared))
+            self.local.record('misses', len(missing) - len(shared))
+            found.update(shared)
+        return found
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(self.with_expiry(data, timeout), timeout, version=version)
+        ttl = self.local_ttl(timeout)
+        for key, value in data.items():
+            if key not in failed:
+                self.local.set(self.make_and_validate_key(key, version=version), value, ttl)
+        self.local.record('sets', len(data) - len(failed))
+        return failed
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        for key in keys:
+            self.local.delete(self.make_and_validate_key(key, version=version))
+        self.local.record('deletes', len(keys))
+        self.shared.delete_many(keys, version=version)
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        value = self.get(key, self._missing_key, version=version)
+        if value is not self._missing_key:
+            return value
+        if not callable(default):
+            self.add(key, default, timeout, version=version)
+            return self.get(key, default, version=version)
+
+        local_key = self.make_and_validate_key(key, version=version)
+        with self.local.compute_locks[hash(local_key) % len(self.local.compute_locks)]:
+            # Another thread may have computed it meanwhile.
+            value = self.get(key, self._missing_key, version=version)
+            if value is not self._missing_key:
+                return value
+
+            lock_key = f'{key}:compute-lock'
+            locked = self.shared.add(lock_key, 1, self.lock_timeout, version=version)
+            if not locked:
+                value = self.wait_for(key, version)
+                if value is not self._missing_key:
+                    return value
+                # The other process is too slow or gone; compute it here.
+            try:
+                value = default()
+                self.local.record('computes')
+                self.set(key, value, timeout, version=version)
+            finally:
+                if locked:
+                    self.shared.delete(lock_key, version=version)
+            return value
+
+    def wait_for(self, key, version):
+        """
+        Wait for another process to compute `key`, up to LOCK_TIMEOUT.
+        """
+        self.local.record('lock_waits')
+        deadline = time.monotonic() + self.lock_timeout
+        delay = 0.01
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
+            found = self.get_shared([key], version)
+            if key in found:
+                self.local.record('shared_hits')
+                return found[key]
+        return self._missing_key
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+    def clear_local(self):
+        self.local.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+    def stats(self):
+        """
+        This process's counters, with the local tier size and hit rate.
+        """
+        with self.local.lock:
+            stats = dict(self.local.stats)
+            stats['local_entries'] = len(self.local.entries)
+        lookups = stats['local_hits'] + stats['shared_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['local_hits'] + stats['shared_hits']) / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,200 @@
+# core/backends/email.py
+import logging
+import queue
+import smtplib
+import ssl
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail.backends.smtp import EmailBackend
+
+logger = logging.getLogger(__name__)
+
+# Idle, authenticated connections shared by every backend instance in the
+# process, keyed by relay and credentials.
+_pools = {}
+_pools_lock = threading.Lock()
+
+_stats = {
+    'connections_opened': 0,
+    'connections_reused': 0,
+    'connections_discarded': 0,
+    'messages_sent': 0,
+    'handshake_seconds': 0.0,
+}
+_stats_lock = threading.Lock()
+
+
+def _record(**increments):
+    with _stats_lock:
+        for name, value in increments.items():
+            _stats[name] += value
+
+
+def get_pool_stats():
+    """
+    Snapshot of the pool counters, plus the derived per-connection averages.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    opened = stats['connections_opened']
+    stats['messages_per_connection'] = stats['messages_sent'] / opened if opened else 0.0
+    stats['avg_handshake_seconds'] = stats['handshake_seconds'] / opened if opened else 0.0
+    stats['idle_connections'] = sum(pool.qsize() for pool in _pools.values())
+    return stats
+
+
+def reset_pool():
+    """
+    Close every idle pooled connection and reset the counters.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        while True:
+            try:
+                connection, _ = pool.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                connection.close()
+            except Exception:
+                pass
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = type(_stats[name])()
+
+
+class PooledEmailBackend(EmailBackend):
+    """
+    SMTP backend that keeps a small per-process pool of authenticated
+    connections and reuses them across send_messages() calls, so a message
+    costs one DATA exchange instead of a TCP + TLS + AUTH handshake.
+
+    Connections that sat idle longer than EMAIL_POOL_HEALTH_CHECK_AFTER
+    are checked with NOOP before reuse; a connection dropped by the relay
+    mid-batch is replaced and the message retried once. A connection that
+    failed a send is closed rather than returned to the pool.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool_size = settings.EMAIL_POOL_SIZE
+        self.max_idle = settings.EMAIL_POOL_MAX_IDLE
+        self.health_check_after = settings.EMAIL_POOL_HEALTH_CHECK_AFTER
+
+    @property
+    def pool(self):
+        key = (self.host, self.port, self.username, self.use_tls, self.use_ssl)
+        with _pools_lock:
+            if key not in _pools:
+                _pools[key] = queue.LifoQueue(maxsize=self.pool_size)
+            return _pools[key]
+
+    def open(self):
+        """
+        Check out a pooled connection or open a new one. Returns True when
+        this call acquired a connection, so send_messages() releases it.
+        """
+        if self.connection:
+            return False
+
+        connection = self._checkout()
+        if connection is not None:
+            self.connection = connection
+            _record(connections_reused=1)
+            return True
+
+        return self._connect()
+
+    def close(self):
+        """
+        Return the connection to the pool instead of sending QUIT, unless
+        the pool is already full.
+        """
+        if self.connection is None:
+            return
+        try:
+            self.pool.put_nowait((self.connection, time.monotonic()))
+        except queue.Full:
+            super().close()
+        else:
+            self.connection = None
+
+    def _checkout(self):
+        while True:
+            try:
+                connection, released_at = self.pool.get_nowait()
+            except queue.Empty:
+                return None
+            idle = time.monotonic() - released_at
+            if idle > self.max_idle or (idle > self.health_check_after and not self._is_alive(connection)):
+                self._discard(connection)
+                continue
+            return connection
+
+    def _is_alive(self, connection):
+        try:
+            return connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _discard(self, connection):
+        _record(connections_discarded=1)
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, ssl.SSLError, OSError):
+            connection.close()
+
+    def _send(self, email_message):
+        # Errors are handled here whatever fail_silently says, so that a
+        # dropped connection is still retried and a failed one never pooled.
+        fail_silently, self.fail_silently = self.fail_silently, False
+        try:
+            return self._send_with_retry(email_message)
+        except (smtplib.SMTPException, OSError):
+            # The connection may be dead or mid-transaction: drop it, the
+            # next message of the batch gets a fresh one.
+            self._drop_connection()
+            if not fail_silently:
+                raise
+            return False
+        finally:
+            self.fail_silently = fail_silently
+
+    def _send_with_retry(self, email_message):
+        if self.connection is None:
+            self._connect()
+        try:
+            sent = super()._send(email_message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+            # The relay dropped an idle or overloaded connection: reconnect
+            # once and retry, anything else is a real delivery error.
+            logger.warning(f"SMTP connection lost, reconnecting: {e}")
+            self._drop_connection()
+            self._connect()
+            sent = super()._send(email_message)
+        if sent:
+            _record(messages_sent=1)
+        return sent
+
+    def _connect(self):
+        started = time.perf_counter()
+        opened = super().open()
+        if opened:
+            _record(connections_opened=1, handshake_seconds=time.perf_counter() - started)
+            if settings.EMAIL_SMTP_DEBUG:
+                self.connection.set_debuglevel(1)
+        return opened
+
+    def _drop_connection(self):
+        connection, self.connection = self.connection, None
+        if connection is None:
+            return
+        _record(connections_discarded=1)
+        try:
+            connection.close()
+        except OSError:
+            pass
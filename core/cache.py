@@ -0,0 +1,51 @@
+# core/cache.py
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+from core.backends.cache import TieredCache
+
+NAMESPACE_KEY = 'namespace:{}'
+
+
+def get_cache():
+    return caches['default']
+
+
+def namespace_version(namespace):
+    """
+    Current version of a key namespace. Keys built with namespace_key()
+    change with it, so invalidate_namespace() expires all of them at once.
+    """
+    return get_cache().get_or_set(NAMESPACE_KEY.format(namespace), lambda: uuid.uuid4().hex[:8], None)
+
+
+def namespace_key(namespace, key):
+    return f'{namespace}:{namespace_version(namespace)}:{key}'
+
+
+def invalidate_namespace(namespace):
+    get_cache().set(NAMESPACE_KEY.format(namespace), uuid.uuid4().hex[:8], None)
+
+
+def cached(namespace, key, producer, timeout=DEFAULT_TIMEOUT):
+    """
+    Value of `key` in `namespace`, calling producer() on a miss. Concurrent
+    misses wait for a single computation instead of all running it.
+
+        profile = cached('user-profile', user.pk, lambda: build_profile(user), 300)
+    """
+    return get_cache().get_or_set(namespace_key(namespace, key), producer, timeout)
+
+
+def cache_stats():
+    """
+    Hit/miss counters of this process, for each two-tier cache.
+    """
+    return {
+        alias: caches[alias].stats()
+        for alias, config in settings.CACHES.items()
+        if config['BACKEND'] == f'{TieredCache.__module__}.{TieredCache.__name__}'
+    }
@@ -0,0 +1,81 @@
+# core/checks.py
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+from django.utils.module_loading import import_string
+
+from core.backends.cache import TieredCache
+
+# Backends whose entries only the processes of one host see.
+PER_HOST_CACHE_BACKENDS = (
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.filebased.FileBasedCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+# Backends whose incr() is atomic; the others read and write the value back.
+ATOMIC_INCR_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django.core.cache.backends.redis.RedisCache',
+)
+
+
+def cache_backend_class(alias):
+    """
+    Backend class of the cache `alias`, looking through TieredCache to the
+    shared cache that stores its values. None when it cannot be imported.
+    """
+    config = settings.CACHES.get(alias, {})
+    try:
+        backend_class = import_string(config.get('BACKEND', ''))
+    except ImportError:
+        return None
+    if issubclass(backend_class, TieredCache):
+        return cache_backend_class(config['LOCATION'])
+    return backend_class
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    With DEBUG off, the 'shared' cache must be one every host sees (Redis
+    or Memcached): the local tiers, the JWT blacklist filter, the throttles
+    and the metrics rely on it.
+    """
+    if settings.DEBUG:
+        return []
+    backend = settings.CACHES.get('shared', {}).get('BACKEND', '')
+    per_host = tuple(import_string(path) for path in PER_HOST_CACHE_BACKENDS)
+    backend_class = cache_backend_class('shared')
+    if backend_class is None or not issubclass(backend_class, per_host):
+        # Unimportable backends are reported by Django's own cache checks.
+        return []
+    return [Error(
+        f"CACHES['shared'] uses {backend}, which other hosts do not see.",
+        hint=(
+            "Set SHARED_CACHE_BACKEND and SHARED_CACHE_LOCATION to a Redis or "
+            "Memcached server, e.g. django.core.cache.backends.redis.RedisCache."
+        ),
+        id='core.E001',
+    )]
+
+
+@register(Tags.caches)
+def check_throttle_cache(app_configs, **kwargs):
+    """
+    With DEBUG off, THROTTLE_CACHE must store its counters in a backend with
+    an atomic incr(), or concurrent requests lose counts.
+    """
+    if settings.DEBUG:
+        return []
+    backend_class = cache_backend_class(settings.THROTTLE_CACHE)
+    atomic = tuple(import_string(path) for path in ATOMIC_INCR_CACHE_BACKENDS)
+    if backend_class is None or issubclass(backend_class, atomic):
+        return []
+    return [Error(
+        f"THROTTLE_CACHE ({settings.THROTTLE_CACHE!r}) stores its counters in "
+        f"{backend_class.__module__}.{backend_class.__qualname__}, whose incr() is not atomic.",
+        hint="Point THROTTLE_CACHE, or the shared cache behind it, at Redis or Memcached.",
+        id='core.E002',
+    )]
@@ -0,0 +1,249 @@
+# core/data_jobs.py
+import logging
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.core.files import File
+from django.db import transaction
+from django.http import HttpRequest, QueryDict
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.models import DataJob
+
+logger = logging.getLogger(__name__)
+
+# Failed rows listed in DataJob.error; the totals hold the full counts.
+MAX_REPORTED_ERRORS = 20
+
+
+def class_path(cls):
+    return f'{cls.__module__}.{cls.__qualname__}'
+
+
+def enqueue_export(resource_class, file_format, filters, filename, pks=None, export_fields=None, encoding=None,
+                   user=None):
+    """
+    Queue an export of the admin changelist selected by `filters`, its query
+    parameters ({name: [values]}), narrowed to the primary keys `pks` when
+    given. The worker rebuilds the queryset through the model's admin, as
+    `user`.
+    """
+    return DataJob.objects.create(
+        kind=DataJob.KIND_EXPORT,
+        resource=class_path(resource_class),
+        file_format=class_path(type(file_format)),
+        encoding=encoding or '',
+        export_filters=filters,
+        export_pks=pks,
+        export_fields=export_fields,
+        filename=filename,
+        created_by=user,
+    )
+
+
+def enqueue_import(resource_class, file_format, uploaded_file, encoding=None, user=None, dry_run=True):
+    """
+    Queue an import of `uploaded_file`, which is copied to DATA_JOB_STORAGE.
+    By default it is a dry run, to be confirmed with confirm_import().
+    """
+    job = DataJob(
+        kind=DataJob.KIND_IMPORT,
+        resource=class_path(resource_class),
+        file_format=class_path(type(file_format)),
+        encoding=encoding or '',
+        dry_run=dry_run,
+        filename=uploaded_file.name,
+        created_by=user,
+    )
+    job.input_file.save(uploaded_file.name, uploaded_file, save=False)
+    job.save()
+    return job
+
+
+def confirm_import(job):
+    """
+    Queue the real run of an import whose dry run passed. Returns whether
+    the job was awaiting confirmation.
+    """
+    return bool(
+        DataJob.objects.filter(pk=job.pk, kind=DataJob.KIND_IMPORT, status=DataJob.STATUS_REVIEW)
+        .update(
+            status=DataJob.STATUS_PENDING, dry_run=False, attempts=0, rows_processed=0,
+            started_at=None, finished_at=None, heartbeat_at=None,
+        )
+    )
+
+
+def reclaim_stale_jobs():
+    """
+    Requeue running jobs whose worker stopped reporting progress for
+    DATA_JOB_STALE_AFTER seconds, most likely because it crashed. Jobs that
+    already ran DATA_JOB_MAX_ATTEMPTS times fail instead.
+
+    A requeued import runs again from the start of its file. Returns the
+    number of requeued jobs.
+    """
+    now = timezone.now()
+    stale = DataJob.objects.filter(
+        status=DataJob.STATUS_RUNNING,
+        heartbeat_at__lt=now - timedelta(seconds=settings.DATA_JOB_STALE_AFTER),
+    )
+    failed = stale.filter(attempts__gte=settings.DATA_JOB_MAX_ATTEMPTS).update(
+        status=DataJob.STATUS_FAILED,
+        error=f"The worker stopped responding {settings.DATA_JOB_MAX_ATTEMPTS} times.",
+        finished_at=now,
+    )
+    requeued = stale.update(status=DataJob.STATUS_PENDING)
+    if failed or requeued:
+        logger.warning(f"Reclaimed stale data jobs: {requeued} requeued, {failed} failed")
+    return requeued
+
+
+def claim_next_job():
+    """
+    Mark the oldest pending job as running and return it, or None.
+
+    Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so several
+    workers can share the queue.
+    """
+    with transaction.atomic():
+        job = (
+            DataJob.objects.select_for_update(skip_locked=True)
+            .filter(status=DataJob.STATUS_PENDING)
+            .order_by('created_at', 'pk')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = DataJob.STATUS_RUNNING
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.attempts += 1
+        job.save(update_fields=['status', 'started_at', 'heartbeat_at', 'attempts'])
+    return job
+
+
+def format_import_errors(result):
+    lines = []
+    for error in result.base_errors:
+        lines.append(str(error.error))
+    for invalid_row in result.invalid_rows:
+        lines.append(f"Row {invalid_row.number}: {invalid_row.error_dict}")
+    for error_row in result.error_rows:
+        lines.extend(f"Row {error_row.number}: {error.error}" for error in error_row.errors)
+    if len(lines) > MAX_REPORTED_ERRORS:
+        lines = lines[:MAX_REPORTED_ERRORS] + [f"... and {len(lines) - MAX_REPORTED_ERRORS} more"]
+    return '\n'.join(lines)
+
+
+def get_export_queryset(job, resource):
+    """
+    Rebuild the queryset of an export from its changelist query parameters,
+    with the admin's filters and the permissions of the user who queued it.
+    """
+    if job.created_by is None:
+        raise PermissionDenied("The user who queued this export no longer exists.")
+    request = HttpRequest()
+    request.method = 'GET'
+    request.GET = QueryDict(mutable=True)
+    for name, values in job.export_filters.items():
+        request.GET.setlist(name, values)
+    request.user = job.created_by
+
+    model_admin = admin.site.get_model_admin(resource._meta.model)
+    if not model_admin.has_export_permission(request):
+        raise PermissionDenied(f"{job.created_by} may no longer export {resource._meta.model._meta.verbose_name_plural}.")
+    queryset = model_admin.get_export_queryset(request)
+    if job.export_pks is not None:
+        queryset = queryset.filter(pk__in=job.export_pks)
+    return queryset
+
+
+def _run_export(job, resource, file_format, progress):
+    queryset = get_export_queryset(job, resource)
+    job.rows_total = queryset.count()
+    job.save(update_fields=['rows_total'])
+
+    with tempfile.TemporaryFile() as fileobj:
+        rows = resource.export_to_file(
+            fileobj,
+            file_format,
+            queryset,
+            encoding=job.encoding or None,
+            export_fields=job.export_fields,
+            progress=progress,
+        )
+        fileobj.seek(0)
+        job.output_file.save(job.filename, File(fileobj), save=False)
+    return rows, DataJob.STATUS_DONE
+
+
+def _run_import(job, resource, file_format, progress):
+    with job.input_file.open('rb') as fileobj:
+        result = resource.import_file(
+            fileobj,
+            file_format,
+            encoding=job.encoding or 'utf-8-sig',
+            dry_run=job.dry_run,
+            progress=progress,
+            user=job.created_by,
+        )
+    job.totals = dict(result.totals)
+    job.error = format_import_errors(result)
+    if result.has_errors() or result.has_validation_errors():
+        # A dry run with errors cannot be confirmed; a real run wrote the
+        # chunks before the failing ones, as listed in the totals.
+        return result.total_rows, DataJob.STATUS_FAILED
+    return result.total_rows, DataJob.STATUS_REVIEW if job.dry_run else DataJob.STATUS_DONE
+
+
+def run_job(job):
+    """
+    Run a claimed job to completion, recording progress on the row after
+    every chunk so the admin status page can follow it.
+    """
+    def progress(rows):
+        job.rows_processed = rows
+        job.heartbeat_at = timezone.now()
+        DataJob.objects.filter(pk=job.pk).update(rows_processed=rows, heartbeat_at=job.heartbeat_at)
+
+    try:
+        resource = import_string(job.resource)()
+        file_format = import_string(job.file_format)()
+        if job.kind == DataJob.KIND_EXPORT:
+            rows, job.status = _run_export(job, resource, file_format, progress)
+        else:
+            rows, job.status = _run_import(job, resource, file_format, progress)
+    except Exception as e:
+        logger.exception(f"Data job {job.pk} failed")
+        job.status = DataJob.STATUS_FAILED
+        job.error = str(e)
+    else:
+        job.rows_processed = rows
+    job.finished_at = timezone.now()
+    job.save()
+
+    logger.info(
+        f"Data job {job.pk} {job.status.lower()}: {job.rows_processed} rows "
+        f"in {job.elapsed:.1f}s"
+    )
+    return job
+
+
+def run_pending_jobs(limit=None):
+    """
+    Claim and run pending jobs one after another until the queue is empty
+    or `limit` jobs ran, after requeueing stale ones. Returns the jobs that
+    ran.
+    """
+    reclaim_stale_jobs()
+    jobs = []
+    while limit is None or len(jobs) < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        jobs.append(run_job(job))
+    return jobs
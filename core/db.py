@@ -0,0 +1,76 @@
+# core/db.py
+import json
+import threading
+from collections import Counter
+
+from django.db import connections
+
+# connection_created signals received by this process, per alias: new
+# connections, or checkouts from the pool for pooled aliases.
+_connections_created = Counter()
+_connections_lock = threading.Lock()
+
+
+def estimate_count(queryset):
+    """
+    Planner estimate of the number of rows in `queryset`, or None when no
+    estimate is available (not PostgreSQL, or the table was never analyzed).
+
+    An unfiltered queryset reads pg_class.reltuples, which is what
+    autovacuum/ANALYZE last measured; anything else asks EXPLAIN for the
+    top plan node's row estimate. Neither touches the table itself.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    query = queryset.query
+    with connection.cursor() as cursor:
+        if not query.where and not query.distinct and not query.combinator and not query.is_sliced:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            estimate = row[0] if row else -1
+        else:
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+    # reltuples is -1 until the first ANALYZE.
+    return estimate if estimate >= 0 else None
+
+
+def record_connection_created(alias):
+    with _connections_lock:
+        _connections_created[alias] += 1
+
+
+def connection_stats():
+    """
+    Per database alias:
+
+    - connections_created: connection_created signals, i.e. connections
+      handed to Django. For a pooled alias that is every checkout.
+    - connections_opened: connections made to the server. For a pooled
+      alias that is the pool's connections_num; otherwise it equals
+      connections_created.
+    - for a pooled alias, psycopg's pool counters too (pool_size,
+      pool_available, requests_waiting, requests_wait_ms, ...).
+    """
+    with _connections_lock:
+        created = dict(_connections_created)
+    stats = {}
+    for alias in connections:
+        stats[alias] = {'connections_created': created.get(alias, 0)}
+        pool = getattr(connections[alias], 'pool', None)
+        if pool is not None:
+            pool_stats = pool.get_stats()
+            stats[alias].update(pool_stats)
+            stats[alias]['connections_opened'] = pool_stats.get('connections_num', 0)
+        else:
+            stats[alias]['connections_opened'] = stats[alias]['connections_created']
+    return stats
@@ -0,0 +1,192 @@
+# core/email_rendering.py
+import re
+from functools import lru_cache
+from html import unescape
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.template import Context, TemplateDoesNotExist, engines
+from django.template.base import TextNode
+from django.template.defaulttags import AutoEscapeControlNode, LoadNode
+from django.template.loader import get_template
+from django.utils.html import strip_tags
+
+# Nodes that render the same output whatever the context is.
+STATIC_NODES = (TextNode, AutoEscapeControlNode, LoadNode)
+
+HEAD_RE = re.compile(r'<(head|style|script)\b.*?</\1>', re.IGNORECASE | re.DOTALL)
+BLANK_LINES_RE = re.compile(r'\n\s*\n+')
+
+
+def html_to_text_source(source):
+    """
+    Turn an HTML template source into a plain-text template source.
+
+    Tags are stripped from the template itself rather than from each
+    rendered message; template tags and variables are left in place.
+    """
+    text = unescape(strip_tags(HEAD_RE.sub('', source)))
+    lines = [line.strip() for line in text.splitlines()]
+    text = BLANK_LINES_RE.sub('\n\n', '\n'.join(lines)).strip()
+    return '{% autoescape off %}' + text + '{% endautoescape %}'
+
+
+class CompiledPart:
+    """
+    One compiled template of an email. Runs of nodes that render the same
+    output whatever the context is are rendered once; only the variables and
+    tags between them are rendered for each message.
+
+    Templates using {% extends %} or {% block %} keep their single top-level
+    node and are rendered in full.
+    """
+
+    def __init__(self, template):
+        self.template = template
+        # Pre-rendered strings, and (node, autoescape) for the other nodes.
+        self.parts = []
+        self.add_nodes(template.nodelist, None)
+        self.static = None
+        if all(isinstance(part, str) for part in self.parts):
+            self.static = ''.join(self.parts)
+
+    def add_nodes(self, nodelist, autoescape):
+        for node in nodelist:
+            if isinstance(node, AutoEscapeControlNode):
+                # Rendered in place, with its setting applied to each node.
+                self.add_nodes(node.nodelist, node.setting)
+            elif all(isinstance(child, STATIC_NODES) for child in node.get_nodes_by_type(object)):
+                text = str(node.render(Context()))
+                if self.parts and isinstance(self.parts[-1], str):
+                    self.parts[-1] += text
+                else:
+                    self.parts.append(text)
+            else:
+                self.parts.append((node, autoescape))
+
+    def render(self, context):
+        if self.static is not None:
+            return self.static
+        # What Template.render() sets up for its nodes.
+        with context.render_context.push_state(self.template):
+            if context.template is None:
+                with context.bind_template(self.template):
+                    context.template_name = self.template.name
+                    return self.render_parts(context)
+            return self.render_parts(context)
+
+    def render_parts(self, context):
+        output = []
+        for part in self.parts:
+            if isinstance(part, str):
+                output.append(part)
+                continue
+            node, autoescape = part
+            if autoescape is None:
+                output.append(str(node.render_annotated(context)))
+                continue
+            previous, context.autoescape = context.autoescape, autoescape
+            try:
+                output.append(str(node.render_annotated(context)))
+            finally:
+                context.autoescape = previous
+        return ''.join(output)
+
+
+class EmailTemplate:
+    """
+    Subject, plain-text and HTML templates of one email, loaded and compiled
+    once per process (on every call when DEBUG is on, so edits show up).
+
+    When only the HTML body exists, the plain-text body is derived from the
+    HTML template source at compile time.
+    """
+
+    def __init__(self, subject_template, text_template=None, html_template=None):
+        self.subject_template = subject_template
+        self.text_template = text_template
+        self.html_template = html_template
+        self._parts = None
+
+    def _load(self, template_name):
+        if not template_name:
+            return None
+        try:
+            return get_template(template_name).template
+        except TemplateDoesNotExist:
+            return None
+
+    def compile(self):
+        subject = get_template(self.subject_template).template
+        text = self._load(self.text_template)
+        html = self._load(self.html_template)
+        if text is None and html is None:
+            raise TemplateDoesNotExist(self.text_template or self.html_template)
+        if text is None:
+            text = engines['django'].from_string(html_to_text_source(html.source)).template
+        return (
+            CompiledPart(subject),
+            CompiledPart(text),
+            CompiledPart(html) if html is not None else None,
+        )
+
+    @property
+    def parts(self):
+        if settings.DEBUG:
+            return self.compile()
+        if self._parts is None:
+            self._parts = self.compile()
+        return self._parts
+
+    def render(self, context):
+        """
+        Render (subject, text_body, html_body); html_body may be None.
+
+        A plain Context is used, so request context processors are skipped.
+        """
+        subject, text, html = self.parts
+        context = Context(context)
+        rendered_subject = ' '.join(subject.render(context).splitlines()).strip()
+        return (
+            rendered_subject,
+            text.render(context).strip(),
+            html.render(context).strip() if html is not None else None,
+        )
+
+    def build_message(self, to, context, from_email=None, headers=None, subject_format=None):
+        """
+        Render the templates into an EmailMultiAlternatives.
+        """
+        subject, text_body, html_body = self.render(context)
+        if subject_format is not None:
+            subject = subject_format(subject)
+        msg = EmailMultiAlternatives(
+            subject=subject,
+            body=text_body,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            to=[to] if isinstance(to, str) else list(to),
+            headers=headers or {},
+        )
+        if html_body:
+            msg.attach_alternative(html_body, 'text/html')
+        return msg
+
+
+@lru_cache(maxsize=None)
+def get_email_template(template_prefix):
+    """
+    EmailTemplate for an allauth-style prefix such as
+    "account/email/email_confirmation_signup".
+    """
+    html_ext = getattr(settings, 'TEMPLATE_EXTENSION', 'html')
+    return EmailTemplate(
+        f'{template_prefix}_subject.txt',
+        f'{template_prefix}_message.txt',
+        f'{template_prefix}_message.{html_ext}',
+    )
+
+
+WELCOME_EMAIL = EmailTemplate(
+    'account/email/welcome_subject.txt',
+    html_template='account/email/welcome.html',
+)
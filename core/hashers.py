@@ -0,0 +1,117 @@
+# core/hashers.py
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    The process pool hashing passwords, or None when PASSWORD_HASHING_WORKERS
+    is 0 and hashing runs on the calling thread.
+    """
+    global _executor
+    if not settings.PASSWORD_HASHING_WORKERS:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # Spawned, not forked: the web process has threads and open
+                # connections that a fork would copy.
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.PASSWORD_HASHING_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+@receiver(setting_changed)
+def reset_executor(*, setting, **kwargs):
+    if setting == 'PASSWORD_HASHING_WORKERS':
+        shutdown_executor()
+
+
+def run_hasher(hasher_path, params, method, args):
+    """
+    Call `method` of a Django hasher configured with `params`. Runs in the
+    pool's worker processes, which never load the project settings.
+    """
+    hasher = import_string(hasher_path)()
+    vars(hasher).update(params)
+    return getattr(hasher, method)(*args)
+
+
+class OffloadedHasherMixin:
+    """
+    Run encode() and verify() in a pool of PASSWORD_HASHING_WORKERS
+    processes, so concurrent logins hash on separate cores and at most that
+    many hashes compete for CPU with the rest of the process.
+
+    `base_hasher` is the Django hasher doing the work; `tuned_params` names
+    its attributes that the settings override.
+    """
+
+    base_hasher = None
+    tuned_params = ()
+
+    def offload(self, method, *args):
+        executor = get_executor()
+        if executor is not None:
+            params = {name: getattr(self, name) for name in self.tuned_params}
+            try:
+                return executor.submit(run_hasher, self.base_hasher, params, method, args).result()
+            except BrokenProcessPool as e:
+                logger.error(f"Password hashing pool broken, hashing in process: {e}")
+                shutdown_executor()
+        return getattr(super(), method)(*args)
+
+    def encode(self, password, salt, *args):
+        return self.offload('encode', password, salt, *args)
+
+    def verify(self, password, encoded):
+        return self.offload('verify', password, encoded)
+
+
+class Argon2PasswordHasher(OffloadedHasherMixin, hashers.Argon2PasswordHasher):
+    """
+    Argon2id with the ARGON2_* cost settings. Hashes made with other costs
+    are upgraded on the next successful login.
+    """
+
+    base_hasher = 'django.contrib.auth.hashers.Argon2PasswordHasher'
+    tuned_params = ('time_cost', 'memory_cost', 'parallelism')
+
+    def __init__(self):
+        self.time_cost = settings.ARGON2_TIME_COST
+        self.memory_cost = settings.ARGON2_MEMORY_COST
+        self.parallelism = settings.ARGON2_PARALLELISM
+
+
+class PBKDF2PasswordHasher(OffloadedHasherMixin, hashers.PBKDF2PasswordHasher):
+    """
+    Django's default hasher, kept to verify (and then upgrade) existing
+    PBKDF2 hashes.
+    """
+
+    base_hasher = 'django.contrib.auth.hashers.PBKDF2PasswordHasher'
+    tuned_params = ('iterations',)
@@ -0,0 +1,140 @@
+# core/http.py
+import bisect
+import http.cookiejar
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core import metrics
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket
+# counts everything slower.
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_session = None
+_session_lock = threading.Lock()
+
+# 'host/path' -> LatencyHistogram
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+class LatencyHistogram:
+    """
+    Latency histogram of the calls to one endpoint.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds, error=False):
+        with self.lock:
+            self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            self.total += seconds
+            self.errors += error
+
+    def snapshot(self):
+        with self.lock:
+            counts = list(self.counts)
+            total, errors = self.total, self.errors
+        return {
+            'count': sum(counts),
+            'sum': total,
+            'errors': errors,
+            'buckets': dict(zip([*LATENCY_BUCKETS, float('inf')], counts)),
+        }
+
+
+def endpoint_name(url):
+    parts = urlsplit(url)
+    return f'{parts.netloc}{parts.path}'
+
+
+def record_latency(url, seconds, error=False):
+    endpoint = endpoint_name(url)
+    with _histograms_lock:
+        histogram = _histograms.get(endpoint)
+        if histogram is None:
+            histogram = _histograms[endpoint] = LatencyHistogram()
+    histogram.observe(seconds, error)
+    metrics.add_to_request('http_calls')
+    metrics.add_to_request('http_seconds', seconds)
+
+
+def http_stats():
+    """
+    Latency histograms of this process's outbound calls, per endpoint.
+    """
+    with _histograms_lock:
+        histograms = dict(_histograms)
+    return {endpoint: histogram.snapshot() for endpoint, histogram in histograms.items()}
+
+
+class PooledSession(requests.Session):
+    """
+    requests.Session with a default timeout that records the latency of
+    every call. Cookies are never stored: the session is shared by all the
+    users of the process.
+    """
+
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+        self.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+
+    def request(self, method, url, *args, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        started = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.RequestException:
+            record_latency(url, time.perf_counter() - started, error=True)
+            raise
+        record_latency(url, time.perf_counter() - started, error=response.status_code >= 500)
+        return response
+
+
+def build_session():
+    # Connection failures are retried for every method. Read errors and 5xx
+    # answers only for idempotent ones: a token exchange must not be replayed.
+    retry = Retry(
+        total=settings.HTTP_RETRIES,
+        backoff_factor=settings.HTTP_RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings.HTTP_POOL_HOSTS,
+        pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session = PooledSession(timeout=(settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session():
+    """
+    The process-wide HTTP session for calls to OAuth providers.
+
+    Its connections are kept alive and reused across requests, so repeated
+    calls to the same host skip the TCP and TLS handshakes. At most
+    HTTP_POOL_MAXSIZE connections are kept per host; extra concurrent calls
+    open a connection that is closed afterwards.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
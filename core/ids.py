@@ -0,0 +1,55 @@
+# core/ids.py
+import secrets
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7():
+    """
+    Time-ordered UUID (RFC 9562 version 7).
+
+    The first 48 bits are the Unix time in milliseconds, so ids generated
+    later sort later and new rows land at the right edge of the primary key
+    B-tree. The 12-bit rand_a field is used as a counter that keeps ids
+    generated within the same millisecond in order.
+    """
+    global _last_ms, _counter
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms = ms
+            # Random start, leaving room for the counter to increase.
+            _counter = secrets.randbits(11)
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                # Counter exhausted: borrow the next millisecond.
+                _last_ms += 1
+                _counter = 0
+        ms, counter = _last_ms, _counter
+
+    value = (
+        (ms & 0xFFFFFFFFFFFF) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | secrets.randbits(62)
+    )
+    return uuid.UUID(int=value)
+
+
+def default_uuid():
+    """
+    Default for UUIDModel.id, picked by the UUID_PRIMARY_KEY_VERSION setting:
+    7 for time-ordered ids, 4 for the previous fully random ones.
+    """
+    if getattr(settings, 'UUID_PRIMARY_KEY_VERSION', 7) == 7:
+        return uuid7()
+    return uuid.uuid4()
@@ -0,0 +1,125 @@
+# core/jwks.py
+import logging
+import re
+import threading
+import time
+
+import jwt
+import requests
+
+from core.http import get_session
+
+logger = logging.getLogger(__name__)
+
+MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+class JWKSCache:
+    """
+    Signing keys published at a JWKS URL, kept in memory.
+
+    Keys are reused for the max-age the provider sends (`ttl` seconds
+    otherwise). Past that, the known keys keep being served while a
+    background thread fetches the set again. A key id that is not in the
+    set means the provider rotated its keys: the set is fetched right away,
+    at most once every `min_refresh_interval` seconds so tokens with made-up
+    key ids cannot hammer the provider. A failed fetch is retried sooner,
+    after `retry_backoff` seconds doubled on each further failure.
+    """
+
+    def __init__(self, url, ttl=3600, min_refresh_interval=60, retry_backoff=1, timeout=5):
+        self.url = url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+        self.keys = {}
+        self.expires_at = 0.0
+        # No fetch before this monotonic time, unless the keys expired.
+        self.refresh_after = 0.0
+        self.failures = 0
+        self.lock = threading.Lock()
+        self.refreshing = False
+
+    def get_key(self, kid):
+        """
+        Public key for `kid`, or None when the provider does not publish it.
+        """
+        key = self.keys.get(kid)
+        if key is not None:
+            now = time.monotonic()
+            if now >= self.expires_at and now >= self.refresh_after:
+                self.refresh_in_background()
+            return key
+        if time.monotonic() >= self.refresh_after:
+            self.refresh(kid)
+        return self.keys.get(kid)
+
+    def refresh(self, kid=None):
+        """
+        Fetch the key set. With `kid`, only when it is still unknown and no
+        other thread fetched the set meanwhile.
+        """
+        with self.lock:
+            if kid is not None and (kid in self.keys or time.monotonic() < self.refresh_after):
+                return
+            try:
+                response = get_session().get(self.url, timeout=self.timeout)
+                response.raise_for_status()
+                self.set_keys(response.json(), self.max_age(response))
+            except (requests.RequestException, ValueError) as e:
+                self.failures += 1
+                backoff = min(self.retry_backoff * 2 ** (self.failures - 1), self.min_refresh_interval)
+                self.refresh_after = time.monotonic() + backoff
+                logger.error(f"Could not fetch the signing keys at {self.url}, retrying in {backoff}s: {e}")
+            else:
+                self.failures = 0
+                self.refresh_after = time.monotonic() + self.min_refresh_interval
+
+    def refresh_in_background(self):
+        with self.lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self.refreshing = False
+
+        threading.Thread(target=run, name='jwks-refresh', daemon=True).start()
+
+    def set_keys(self, jwks, max_age=None):
+        keys = {}
+        for data in jwks.get('keys', []):
+            try:
+                keys[data['kid']] = jwt.PyJWK(data).key
+            except (KeyError, jwt.PyJWKError) as e:
+                logger.warning(f"Skipping unusable key in {self.url}: {e}")
+        self.keys = keys
+        self.expires_at = time.monotonic() + (max_age if max_age is not None else self.ttl)
+
+    def max_age(self, response):
+        match = MAX_AGE_RE.search(response.headers.get('Cache-Control', ''))
+        return int(match.group(1)) if match else None
+
+
+def decode_id_token(token, jwks, audience, issuer, leeway=30):
+    """
+    Verify an OpenID Connect ID token against the keys in `jwks` and return
+    its claims. Raises jwt.PyJWTError when it is invalid.
+    """
+    kid = jwt.get_unverified_header(token).get('kid')
+    key = jwks.get_key(kid)
+    if key is None:
+        raise jwt.InvalidTokenError(f"Unknown signing key {kid!r}")
+    return jwt.decode(
+        token,
+        key=key,
+        algorithms=['RS256'],
+        audience=audience,
+        issuer=issuer,
+        leeway=leeway,
+        options={'require': ['exp', 'iat', 'iss', 'aud', 'sub']},
+    )
@@ -0,0 +1,128 @@
+# core/mail.py
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from core.models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(message):
+    """
+    Store an EmailMessage in the outbox instead of sending it.
+
+    The row is written on the current database connection, so when called
+    inside a transaction it is committed (or rolled back) together with the
+    data that triggered the email.
+
+    Attachments are not stored; messages carrying any raise ValueError
+    rather than going out without them.
+    """
+    if message.attachments:
+        raise ValueError("Outbox emails cannot carry attachments.")
+    body = message.body
+    html_body = ''
+    for content, mimetype in getattr(message, 'alternatives', []):
+        if mimetype == 'text/html':
+            html_body = content
+    if message.content_subtype == 'html' and not html_body:
+        html_body = body
+        body = strip_tags(body)
+
+    return OutboxEmail.objects.create(
+        subject=message.subject,
+        body=body,
+        html_body=html_body,
+        from_email=message.from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(message.to),
+        cc=list(message.cc),
+        bcc=list(message.bcc),
+        reply_to=list(message.reply_to),
+        headers=dict(message.extra_headers),
+    )
+
+
+def build_message(outbox_email, connection=None):
+    """
+    Rebuild the EmailMultiAlternatives stored in an outbox row.
+    """
+    msg = EmailMultiAlternatives(
+        subject=outbox_email.subject,
+        body=outbox_email.body,
+        from_email=outbox_email.from_email,
+        to=outbox_email.to,
+        cc=outbox_email.cc,
+        bcc=outbox_email.bcc,
+        reply_to=outbox_email.reply_to,
+        headers=outbox_email.headers,
+        connection=connection,
+    )
+    if outbox_email.html_body:
+        msg.attach_alternative(outbox_email.html_body, 'text/html')
+    return msg
+
+
+def get_retry_delay(attempts):
+    """
+    Exponential backoff: EMAIL_OUTBOX_RETRY_DELAY, then twice that, and so on.
+    """
+    return timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def deliver_queued_emails(batch_size=None, connection=None):
+    """
+    Send one batch of due outbox emails over a single connection.
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so several
+    workers can drain the outbox concurrently. Returns (sent, failed) counts
+    for the batch; failed includes messages rescheduled for a retry.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    max_attempts = settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    sent = failed = 0
+
+    with transaction.atomic():
+        batch = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.STATUS_PENDING, next_attempt_at__lte=timezone.now())
+            .order_by('next_attempt_at', 'pk')[:batch_size]
+        )
+        if not batch:
+            return sent, failed
+
+        connection = connection or get_connection(fail_silently=False)
+        try:
+            connection.open()
+            for outbox_email in batch:
+                outbox_email.attempts += 1
+                try:
+                    connection.send_messages([build_message(outbox_email, connection)])
+                except Exception as e:
+                    failed += 1
+                    outbox_email.last_error = str(e)
+                    if outbox_email.attempts >= max_attempts:
+                        outbox_email.status = OutboxEmail.STATUS_FAILED
+                        logger.error(f"Giving up on outbox email {outbox_email.pk} to {outbox_email.to}: {e}")
+                    else:
+                        outbox_email.next_attempt_at = timezone.now() + get_retry_delay(outbox_email.attempts)
+                        logger.warning(f"Outbox email {outbox_email.pk} failed, retrying at {outbox_email.next_attempt_at}: {e}")
+                else:
+                    sent += 1
+                    outbox_email.status = OutboxEmail.STATUS_SENT
+                    outbox_email.sent_at = timezone.now()
+                    outbox_email.last_error = ''
+        finally:
+            connection.close()
+
+        OutboxEmail.objects.bulk_update(
+            batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+        )
+
+    logger.info(f"Outbox batch delivered: {sent} sent, {failed} failed")
+    return sent, failed
@@ -0,0 +1,82 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.template import TemplateDoesNotExist
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils.html import strip_tags
+
+from core.email_rendering import WELCOME_EMAIL, get_email_template
+
+CONFIRMATION_PREFIX = 'account/email/email_confirmation_signup'
+
+
+def render_confirmation_legacy(request, context):
+    """
+    What the account adapter did before: three render_to_string calls
+    through a RequestContext for every email.
+    """
+    subject = render_to_string(f'{CONFIRMATION_PREFIX}_subject.txt', context, request)
+    text_body = render_to_string(f'{CONFIRMATION_PREFIX}_message.txt', context, request)
+    try:
+        html_body = render_to_string(f'{CONFIRMATION_PREFIX}_message.html', context, request)
+    except TemplateDoesNotExist:
+        html_body = None
+    return ' '.join(subject.splitlines()).strip(), text_body, html_body
+
+
+def render_welcome_legacy(request, context):
+    """
+    What send_welcome_email did before: render the HTML, then strip_tags it.
+    """
+    html_body = render_to_string('account/email/welcome.html', context)
+    return 'Welcome to Our Platform!', strip_tags(html_body), html_body
+
+
+class Command(BaseCommand):
+    help = 'Compare email renders per second between render_to_string and core.email_rendering.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        request = RequestFactory().get('/')
+        user = get_user_model()(email='bench@example.com', username='bench', first_name='Bench')
+        context = {
+            'user': user,
+            'email': user.email,
+            'activate_url': 'http://localhost:3000/auth/registration/account-confirm-email/key/',
+            'site_name': 'Commerce',
+            'current_year': 2025,
+            'request': request,
+        }
+        confirmation = get_email_template(CONFIRMATION_PREFIX)
+
+        cases = [
+            ('confirmation', lambda: render_confirmation_legacy(request, context), lambda: confirmation.render(context)),
+            ('welcome', lambda: render_welcome_legacy(request, context), lambda: WELCOME_EMAIL.render(context)),
+        ]
+        # Production settings: with DEBUG on, templates are recompiled per render.
+        with override_settings(DEBUG=False):
+            for name, legacy, compiled in cases:
+                self.run_case(name, legacy, compiled, iterations)
+
+    def run_case(self, name, legacy, compiled, iterations):
+        # Warm up both paths so template loading is not measured.
+        legacy()
+        compiled()
+        legacy_rate = self.measure(legacy, iterations)
+        compiled_rate = self.measure(compiled, iterations)
+        self.stdout.write(
+            f"{name:<14} render_to_string: {legacy_rate:>9.0f}/s   "
+            f"compiled: {compiled_rate:>9.0f}/s   speedup: {compiled_rate / legacy_rate:.2f}x"
+        )
+
+    def measure(self, render, iterations):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            render()
+        return iterations / (time.perf_counter() - started)
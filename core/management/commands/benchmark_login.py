@@ -0,0 +1,104 @@
+import time
+import uuid
+from contextlib import contextmanager
+
+from allauth.account.models import EmailAddress
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core.db import connection_stats
+
+MODES = {
+    'new connection per request': {'CONN_MAX_AGE': 0},
+    'persistent connections': {'CONN_MAX_AGE': 600},
+    'connection pool': {'CONN_MAX_AGE': 0, 'pool': True},
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare login endpoint throughput with and without database connection reuse.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300)
+        parser.add_argument(
+            '--real-hasher',
+            action='store_true',
+            help='Check passwords with PASSWORD_HASHERS instead of MD5, whose speed '
+                 'keeps the hashing cost from hiding the connection setup.',
+        )
+
+    def handle(self, *args, **options):
+        hashers = settings.PASSWORD_HASHERS
+        if not options['real_hasher']:
+            hashers = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+        with override_settings(PASSWORD_HASHERS=hashers, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            email = f'benchmark-{uuid.uuid4().hex[:8]}@example.com'
+            user = get_user_model().objects.create_user(
+                email=email, username=email.split('@')[0], password='benchmark-password',
+            )
+            EmailAddress.objects.create(user=user, email=email, verified=True, primary=True)
+            try:
+                for mode, overrides in MODES.items():
+                    if overrides.get('pool') and connections['default'].vendor != 'postgresql':
+                        self.stdout.write(f"{mode:>28}: skipped, needs PostgreSQL with psycopg[pool]")
+                        continue
+                    with self.database_settings(**overrides):
+                        rate, opened, stats = self.run_logins(email, options['requests'])
+                    self.stdout.write(
+                        f"{mode:>28}: {rate:>8.0f} logins/s   {opened:.2f} connections opened/login"
+                        + (f"   pool wait {stats.get('requests_wait_ms', 0)} ms" if overrides.get('pool') else '')
+                    )
+            finally:
+                user.delete()
+
+    @contextmanager
+    def database_settings(self, pool=False, **overrides):
+        """
+        Reconnect the default alias with modified settings for the block.
+        """
+        original = connections.settings['default']
+        settings_dict = {**original, **overrides, 'OPTIONS': dict(original['OPTIONS'])}
+        if pool:
+            settings_dict['OPTIONS']['pool'] = settings.DB_POOL_OPTIONS
+        else:
+            settings_dict['OPTIONS'].pop('pool', None)
+
+        connections['default'].close()
+        connections.settings['default'] = settings_dict
+        del connections['default']
+        try:
+            yield
+        finally:
+            connection = connections['default']
+            connection.close()
+            if pool:
+                connection.close_pool()
+            connections.settings['default'] = original
+            del connections['default']
+
+    def run_logins(self, email, count):
+        client = Client()
+        url = reverse('rest_login')
+        data = {'email': email, 'password': 'benchmark-password'}
+        response = client.post(url, data)
+        if response.status_code != 200:
+            raise CommandError(f"Login failed with {response.status_code}: {response.content[:200]}")
+
+        # Connections made to the server: with the pool, connection_created
+        # fires on every checkout, so its own counter is used instead.
+        opened_before = connection_stats()['default']['connections_opened']
+        started = time.perf_counter()
+        for _ in range(count):
+            client.post(url, data)
+            # The test client keeps connections open; the request handler
+            # would close (or return to the pool) the obsolete ones here.
+            close_old_connections()
+        elapsed = time.perf_counter() - started
+        stats = connection_stats()['default']
+        return count / elapsed, (stats['connections_opened'] - opened_before) / count, stats
@@ -0,0 +1,61 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from core.hashers import shutdown_executor
+
+PASSWORD = 'benchmark-password'
+
+SETUPS = {
+    'PBKDF2 (Django default)': {
+        'PASSWORD_HASHERS': ['django.contrib.auth.hashers.PBKDF2PasswordHasher'],
+        'PASSWORD_HASHING_WORKERS': 0,
+    },
+    'Argon2id, request threads': {
+        'PASSWORD_HASHERS': ['core.hashers.Argon2PasswordHasher'],
+        'PASSWORD_HASHING_WORKERS': 0,
+    },
+    'Argon2id, process pool': {
+        'PASSWORD_HASHERS': ['core.hashers.Argon2PasswordHasher'],
+        'PASSWORD_HASHING_WORKERS': os.cpu_count() or 1,
+    },
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare password checks per second (the CPU cost of a login) across hashing setups.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checks', type=int, default=200)
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=(os.cpu_count() or 1) * 2,
+            help='Concurrent request threads checking passwords.',
+        )
+
+    def handle(self, *args, **options):
+        cores = os.cpu_count() or 1
+        self.stdout.write(f"{cores} cores, {options['threads']} threads")
+        for setup, overrides in SETUPS.items():
+            with override_settings(**overrides):
+                try:
+                    rate = self.run_checks(options['checks'], options['threads'])
+                finally:
+                    shutdown_executor()
+            self.stdout.write(f"{setup:>28}: {rate:>8.1f} logins/s   {rate / cores:>8.1f} logins/s per core")
+
+    def run_checks(self, count, threads):
+        encoded = make_password(PASSWORD)
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            # Warm up: start the hashing processes outside the timing.
+            list(pool.map(lambda _: check_password(PASSWORD, encoded), range(threads)))
+            started = time.perf_counter()
+            results = list(pool.map(lambda _: check_password(PASSWORD, encoded), range(count)))
+            elapsed = time.perf_counter() - started
+        assert all(results)
+        return count / elapsed
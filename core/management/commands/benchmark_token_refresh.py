@@ -0,0 +1,80 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from core.tokens import RefreshToken, blacklist_filter
+
+
+class Command(BaseCommand):
+    help = 'Compare token refresh throughput with and without the JWT blacklist Bloom filter.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument(
+            '--blacklisted',
+            type=int,
+            default=100_000,
+            help='Blacklisted tokens in the table during the run.',
+        )
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.create_user(
+            email=f'benchmark-{uuid.uuid4().hex[:8]}@example.com',
+            username=f'benchmark-{uuid.uuid4().hex[:8]}',
+        )
+        try:
+            self.fill_blacklist(user, options['blacklisted'])
+            for mode in ('off', 'on'):
+                with override_settings(JWT_BLACKLIST_FILTER=mode, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                    blacklist_filter.reset()
+                    rate, queries = self.run_refreshes(user, options['requests'])
+                self.stdout.write(
+                    f"filter {mode:>3}: {rate:>8.0f} refreshes/s   {queries:.1f} queries/refresh"
+                )
+        finally:
+            OutstandingToken.objects.filter(user=user).delete()
+            user.delete()
+            blacklist_filter.reset()
+
+    def fill_blacklist(self, user, count, batch_size=5000):
+        expires_at = timezone.now() + timedelta(days=1)
+        for offset in range(0, count, batch_size):
+            outstanding = OutstandingToken.objects.bulk_create(
+                OutstandingToken(user=user, jti=uuid.uuid4().hex, token='', expires_at=expires_at)
+                for _ in range(min(batch_size, count - offset))
+            )
+            if not outstanding or outstanding[0].pk is None:
+                outstanding = OutstandingToken.objects.filter(user=user, blacklistedtoken__isnull=True)
+            BlacklistedToken.objects.bulk_create(BlacklistedToken(token=token) for token in outstanding)
+
+    def run_refreshes(self, user, count):
+        client = Client()
+        url = reverse('token_refresh')
+        refresh = str(RefreshToken.for_user(user))
+        # Warm up: URL resolving, the filter build, connection setup.
+        refresh = client.post(url, {'refresh': refresh}).json()['refresh']
+
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_query):
+            started = time.perf_counter()
+            for _ in range(count):
+                response = client.post(url, {'refresh': refresh})
+                refresh = response.json()['refresh']
+            elapsed = time.perf_counter() - started
+        return count / elapsed, queries / count
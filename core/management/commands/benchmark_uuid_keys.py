@@ -0,0 +1,67 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+
+from core.ids import uuid7
+
+GENERATORS = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare insert throughput and primary key index size for uuid4 and uuid7 ids.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200_000)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        batch_size = options['batch_size']
+        id_field = models.UUIDField()
+        id_type = id_field.db_type(connection)
+
+        for name, generate in GENERATORS.items():
+            table = f'benchmark_{name}_keys'
+            quoted = connection.ops.quote_name(table)
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE IF EXISTS {quoted}')
+                cursor.execute(f'CREATE TABLE {quoted} (id {id_type} PRIMARY KEY, payload varchar(32) NOT NULL)')
+            try:
+                elapsed = self.insert_rows(quoted, generate, id_field, rows, batch_size)
+                index_size = self.index_size(table)
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'DROP TABLE IF EXISTS {quoted}')
+
+            size = f'{index_size / 1024 / 1024:.1f} MiB' if index_size is not None else 'n/a'
+            self.stdout.write(f"{name}: {rows / elapsed:>10.0f} inserts/s   primary key index: {size}")
+
+    def insert_rows(self, quoted, generate, id_field, rows, batch_size):
+        sql = f'INSERT INTO {quoted} (id, payload) VALUES (%s, %s)'
+        started = time.perf_counter()
+        for offset in range(0, rows, batch_size):
+            batch = [
+                (id_field.get_db_prep_value(generate(), connection), 'x' * 32)
+                for _ in range(min(batch_size, rows - offset))
+            ]
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, batch)
+        return time.perf_counter() - started
+
+    def index_size(self, table):
+        """
+        Size in bytes of the table's primary key index (PostgreSQL only).
+        """
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_relation_size(indexrelid) FROM pg_index WHERE indrelid = %s::regclass AND indisprimary",
+                [table],
+            )
+            return cursor.fetchone()[0]
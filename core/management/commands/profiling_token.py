@@ -0,0 +1,11 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.profiling import make_token
+
+
+class Command(BaseCommand):
+    help = 'Print a header that gets requests profiled for PROFILE_TOKEN_MAX_AGE seconds.'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{settings.PROFILE_HEADER}: {make_token()}")
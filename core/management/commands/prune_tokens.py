@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from core.tokens import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired outstanding and blacklisted JWTs in small batches. '
+        'Meant to be scheduled, e.g. hourly from cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.TOKEN_PRUNE_BATCH_SIZE,
+            help='Rows deleted per transaction.',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0,
+            help='Seconds to sleep between batches.',
+        )
+        parser.add_argument(
+            '--vacuum',
+            action='store_true',
+            help='Run VACUUM (ANALYZE) on both tables afterwards (PostgreSQL only).',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        totals = prune_expired_tokens(batch_size=options['batch_size'], pause=options['pause'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Deleted {totals['outstanding']} outstanding and {totals['blacklisted']} blacklisted "
+            f"tokens in {totals['batches']} batches, {elapsed:.2f}s."
+        )
+
+        if options['vacuum'] and connection.vendor == 'postgresql':
+            started = time.perf_counter()
+            with connection.cursor() as cursor:
+                for model in (BlacklistedToken, OutstandingToken):
+                    cursor.execute(f'VACUUM (ANALYZE) {connection.ops.quote_name(model._meta.db_table)}')
+            self.stdout.write(f"Vacuumed in {time.perf_counter() - started:.2f}s.")
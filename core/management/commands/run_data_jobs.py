@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.data_jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run queued admin import/export jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Maximum number of jobs run per pass.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Keep running and poll the queue every N seconds. Drains once and exits when 0.',
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+
+        while True:
+            jobs = run_pending_jobs(limit=options['limit'])
+            for job in jobs:
+                throughput = job.throughput or 0
+                self.stdout.write(
+                    f"{job}: {job.rows_processed} rows, {throughput:.0f} rows/s"
+                    + (f"\n{job.error}" if job.error else '')
+                )
+            if not jobs and not interval:
+                self.stdout.write("No pending jobs.")
+            if not interval:
+                return
+            time.sleep(interval)
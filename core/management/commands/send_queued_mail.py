@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.mail import deliver_queued_emails
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbox emails in batches, retrying failures with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Maximum number of emails sent per batch.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Keep running and poll the outbox every N seconds. Drains once and exits when 0.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        interval = options['interval']
+
+        while True:
+            total_sent = total_failed = 0
+            while True:
+                try:
+                    sent, failed = deliver_queued_emails(batch_size=batch_size)
+                except Exception as e:
+                    # Usually the relay is unreachable; claimed rows were rolled back.
+                    self.stderr.write(f"Outbox delivery failed: {e}")
+                    break
+                total_sent += sent
+                total_failed += failed
+                if sent + failed < batch_size:
+                    break
+
+            if total_sent or total_failed or not interval:
+                self.stdout.write(f"Sent {total_sent} emails, {total_failed} failed.")
+            if not interval:
+                return
+            time.sleep(interval)
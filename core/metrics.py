@@ -0,0 +1,310 @@
+# core/metrics.py
+import bisect
+import contextvars
+import os
+import random
+import socket
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+# Imported as a module: core.http records into this one.
+from core import http as outbound
+
+# Upper bounds (seconds) of the request duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Totals recorded for sampled requests only
+SAMPLED_STATS = (
+    'db_queries', 'db_seconds', 'cache_hits', 'cache_misses', 'http_calls', 'http_seconds',
+)
+
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+PROCESSES_KEY = 'metrics:processes'
+PROCESSES_LOCK_KEY = 'metrics:processes:lock'
+PROCESS_KEY = 'metrics:process:{}'
+
+# Counters of the sampled request being served, None otherwise.
+_request_stats = contextvars.ContextVar('request_stats', default=None)
+
+# (view, method) -> metrics of this process since it started
+_views = {}
+_views_lock = threading.Lock()
+_next_flush = 0.0
+
+PROCESS_ID = f'{socket.gethostname()}:{os.getpid()}'
+
+
+def add_to_request(name, value=1):
+    """
+    Add to a counter of the current request, when it is being sampled.
+    """
+    stats = _request_stats.get()
+    if stats is not None:
+        stats[name] += value
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper timing the queries of sampled requests.
+    """
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats['db_queries'] += 1
+        stats['db_seconds'] += time.perf_counter() - started
+
+
+def new_view_metrics():
+    return {
+        'statuses': {},
+        'buckets': [0] * (len(DURATION_BUCKETS) + 1),
+        'seconds': 0.0,
+        'sampled': 0,
+        **dict.fromkeys(SAMPLED_STATS, 0),
+    }
+
+
+def record_request(view, method, status, seconds, stats):
+    with _views_lock:
+        metrics = _views.get((view, method))
+        if metrics is None:
+            metrics = _views[(view, method)] = new_view_metrics()
+        status_class = f'{status // 100}xx'
+        metrics['statuses'][status_class] = metrics['statuses'].get(status_class, 0) + 1
+        metrics['buckets'][bisect.bisect_left(DURATION_BUCKETS, seconds)] += 1
+        metrics['seconds'] += seconds
+        if stats is not None:
+            metrics['sampled'] += 1
+            for name in SAMPLED_STATS:
+                metrics[name] += stats[name]
+
+
+def process_snapshot():
+    with _views_lock:
+        views = {
+            key: {**metrics, 'statuses': dict(metrics['statuses']), 'buckets': list(metrics['buckets'])}
+            for key, metrics in _views.items()
+        }
+    return {'views': views, 'http': outbound.http_stats()}
+
+
+def get_metrics_cache():
+    return caches[settings.METRICS_CACHE]
+
+
+def flush_due():
+    """
+    Whether METRICS_FLUSH_INTERVAL passed since the last flush. Only one
+    caller gets True per interval.
+    """
+    global _next_flush
+    now = time.monotonic()
+    with _views_lock:
+        if now < _next_flush:
+            return False
+        _next_flush = now + settings.METRICS_FLUSH_INTERVAL
+        return True
+
+
+def flush():
+    """
+    Publish this process's metrics to METRICS_CACHE, where the metrics
+    endpoint of any process reads those of all of them.
+    """
+    global _next_flush
+    _next_flush = time.monotonic() + settings.METRICS_FLUSH_INTERVAL
+    cache = get_metrics_cache()
+    # Processes that stop flushing drop out after a few intervals.
+    timeout = settings.METRICS_FLUSH_INTERVAL * 6
+    cache.set(PROCESS_KEY.format(PROCESS_ID), process_snapshot(), timeout)
+    now = time.time()
+    if now - cache.get(PROCESSES_KEY, {}).get(PROCESS_ID, 0) <= settings.METRICS_FLUSH_INTERVAL:
+        return
+    # The registry is read, modified and written back, so processes take
+    # turns; one that finds it locked tries again on its next flush.
+    if not cache.add(PROCESSES_LOCK_KEY, PROCESS_ID, timeout=5):
+        return
+    try:
+        processes = cache.get(PROCESSES_KEY, {})
+        processes = {pid: seen for pid, seen in processes.items() if now - seen < timeout}
+        processes[PROCESS_ID] = now
+        cache.set(PROCESSES_KEY, processes, None)
+    finally:
+        cache.delete(PROCESSES_LOCK_KEY)
+
+
+def collect():
+    """
+    {process id: metrics} of every process that flushed recently.
+    """
+    flush()
+    cache = get_metrics_cache()
+    processes = cache.get(PROCESSES_KEY, {})
+    snapshots = cache.get_many([PROCESS_KEY.format(pid) for pid in processes])
+    return {
+        pid: snapshots[PROCESS_KEY.format(pid)]
+        for pid in sorted(processes)
+        if PROCESS_KEY.format(pid) in snapshots
+    }
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def labels(**values):
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in values.items()) + '}'
+
+
+def format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+def render_metrics():
+    """
+    All processes' metrics in the Prometheus text exposition format.
+
+    Every series carries a `process` label: each process counts from its
+    own start, so a process that stops ends its series instead of making
+    a total go down. Add them up with sum(rate(...)) in queries.
+    """
+    processes = collect()
+    lines = [
+        '# HELP app_requests_total Requests served, by view, method and status class.',
+        '# TYPE app_requests_total counter',
+    ]
+    for process, snapshot in processes.items():
+        for (view, method), metrics in sorted(snapshot['views'].items()):
+            for status_class, count in sorted(metrics['statuses'].items()):
+                lines.append(
+                    f'app_requests_total{labels(view=view, method=method, status=status_class, process=process)} {count}'
+                )
+
+    lines += [
+        '# HELP app_request_duration_seconds Wall time of requests, by view and method.',
+        '# TYPE app_request_duration_seconds histogram',
+    ]
+    for process, snapshot in processes.items():
+        for (view, method), metrics in sorted(snapshot['views'].items()):
+            cumulative = 0
+            for bound, count in zip([*DURATION_BUCKETS, float('inf')], metrics['buckets']):
+                cumulative += count
+                lines.append(
+                    f'app_request_duration_seconds_bucket'
+                    f'{labels(view=view, method=method, le=format_bound(bound), process=process)} {cumulative}'
+                )
+            view_labels = labels(view=view, method=method, process=process)
+            lines.append(f'app_request_duration_seconds_sum{view_labels} {metrics["seconds"]}')
+            lines.append(f'app_request_duration_seconds_count{view_labels} {cumulative}')
+
+    counters = (
+        ('sampled', 'app_sampled_requests_total', 'Requests sampled for the per-request totals below.'),
+        ('db_queries', 'app_db_queries_total', 'Database queries run by sampled requests.'),
+        ('db_seconds', 'app_db_query_seconds_total', 'Time spent in database queries by sampled requests.'),
+        ('cache_hits', 'app_cache_hits_total', 'Cache hits of sampled requests.'),
+        ('cache_misses', 'app_cache_misses_total', 'Cache misses of sampled requests.'),
+        ('http_calls', 'app_outbound_http_calls_total', 'Outbound HTTP calls made by sampled requests.'),
+        ('http_seconds', 'app_outbound_http_seconds_total', 'Time spent in outbound HTTP calls by sampled requests.'),
+    )
+    for name, metric, help_text in counters:
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} counter']
+        for process, snapshot in processes.items():
+            for (view, method), metrics in sorted(snapshot['views'].items()):
+                lines.append(f'{metric}{labels(view=view, method=method, process=process)} {metrics[name]}')
+
+    lines += [
+        '# HELP app_outbound_http_duration_seconds Latency of outbound HTTP calls, by endpoint.',
+        '# TYPE app_outbound_http_duration_seconds histogram',
+    ]
+    for process, snapshot in processes.items():
+        for endpoint, histogram in sorted(snapshot['http'].items()):
+            cumulative = 0
+            for bound in [*outbound.LATENCY_BUCKETS, float('inf')]:
+                cumulative += histogram['buckets'].get(bound, 0)
+                lines.append(
+                    f'app_outbound_http_duration_seconds_bucket'
+                    f'{labels(endpoint=endpoint, le=format_bound(bound), process=process)} {cumulative}'
+                )
+            endpoint_labels = labels(endpoint=endpoint, process=process)
+            lines.append(f'app_outbound_http_duration_seconds_sum{endpoint_labels} {histogram["sum"]}')
+            lines.append(f'app_outbound_http_duration_seconds_count{endpoint_labels} {histogram["count"]}')
+    lines += [
+        '# HELP app_outbound_http_errors_total Outbound HTTP calls that failed or got a 5xx.',
+        '# TYPE app_outbound_http_errors_total counter',
+    ]
+    for process, snapshot in processes.items():
+        for endpoint, histogram in sorted(snapshot['http'].items()):
+            lines.append(
+                f'app_outbound_http_errors_total{labels(endpoint=endpoint, process=process)} {histogram["errors"]}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+class InstrumentationMiddleware:
+    """
+    Record the wall time of every request per view, and for a
+    METRICS_SAMPLE_RATE share of them their database queries and query
+    time, cache hits and misses, and outbound HTTP calls and time.
+
+    Unsampled requests cost two clock reads and a counter update; sampled
+    ones also time each query. Each process publishes its totals to
+    METRICS_CACHE every METRICS_FLUSH_INTERVAL seconds, on a worker thread
+    when serving async requests.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            stats = _request_stats.get()
+            _request_stats.reset(token)
+        self.finish(request, response, started, stats)
+        if flush_due():
+            flush()
+        return response
+
+    async def __acall__(self, request):
+        token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stats = _request_stats.get()
+            _request_stats.reset(token)
+        self.finish(request, response, started, stats)
+        if flush_due():
+            # Cache I/O, kept off the event loop.
+            await sync_to_async(flush, thread_sensitive=False)()
+        return response
+
+    def start(self):
+        sampled = random.random() < settings.METRICS_SAMPLE_RATE
+        token = _request_stats.set(dict.fromkeys(SAMPLED_STATS, 0) if sampled else None)
+        return token, time.perf_counter()
+
+    def finish(self, request, response, started, stats):
+        seconds = time.perf_counter() - started
+        match = request.resolver_match
+        # View names, not paths, keep the number of label values bounded.
+        view = match.view_name if match else 'unmatched'
+        method = request.method if request.method in METHODS else 'other'
+        record_request(view, method, response.status_code, seconds, stats)
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.4 on 2026-10-18 20:26
+
+import core.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('IMPORT', 'Import'), ('EXPORT', 'Export')], max_length=6)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=7)),
+                ('resource', models.CharField(help_text='Dotted path of the resource class.', max_length=255)),
+                ('file_format', models.CharField(help_text='Dotted path of the import-export format class.', max_length=255)),
+                ('encoding', models.CharField(blank=True, max_length=32)),
+                ('query', models.BinaryField(blank=True, null=True)),
+                ('export_fields', models.JSONField(blank=True, null=True)),
+                ('input_file', models.FileField(blank=True, storage=core.models.data_job_storage, upload_to='data_jobs/input/')),
+                ('output_file', models.FileField(blank=True, storage=core.models.data_job_storage, upload_to='data_jobs/output/')),
+                ('filename', models.CharField(blank=True, max_length=255)),
+                ('rows_total', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('rows_processed', models.PositiveBigIntegerField(default=0)),
+                ('totals', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Data Job',
+                'verbose_name_plural': 'Data Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='core_datajo_status_e7a469_idx')],
+            },
+        ),
+    ]
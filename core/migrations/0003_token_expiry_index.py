@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# Tokens are written in roughly expires_at order, so a BRIN index answers
+# prune_tokens' "expires_at <= now" range at a fraction of a B-tree's size.
+INDEX_NAME = 'token_blacklist_outstandingtoken_expires_brin'
+
+
+def create_expiry_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} '
+        f'ON token_blacklist_outstandingtoken USING brin (expires_at)'
+    )
+
+
+def drop_expiry_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and avoids
+    # blocking token refreshes while the index builds.
+    atomic = False
+
+    dependencies = [
+        ('core', '0002_data_job'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_expiry_index, drop_expiry_index),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.4 on 2026-10-18 21:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_outbox_recipients'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='datajob',
+            name='query',
+        ),
+        migrations.AddField(
+            model_name='datajob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='datajob',
+            name='dry_run',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='datajob',
+            name='export_filters',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='datajob',
+            name='export_pks',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='datajob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='datajob',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('REVIEW', 'Awaiting confirmation'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=7),
+        ),
+    ]
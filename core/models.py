@@ -1,16 +1,239 @@
 # core/models.py (or wherever you keep common models)
-import uuid
+from django.conf import settings
+from django.core.files.storage import storages
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.ids import default_uuid
+
+
+def get_storage(backend):
+    """
+    Storage named by a STORAGES alias or a storage class path.
+    """
+    if '.' not in backend:
+        return storages[backend]
+    return import_string(backend)()
+
+
+def data_job_storage():
+    """
+    Storage for DataJob files (DATA_JOB_STORAGE).
+    """
+    return get_storage(settings.DATA_JOB_STORAGE)
+
+
+def profile_storage():
+    """
+    Storage for RequestProfile files (PROFILE_STORAGE).
+    """
+    return get_storage(settings.PROFILE_STORAGE)
 
 class UUIDModel(models.Model):
     """
     Abstract base model that sets 'id' as a UUID primary key.
+
+    Ids are time-ordered UUIDv7 when UUID_PRIMARY_KEY_VERSION is 7, random
+    UUIDv4 otherwise. Both fit the same column, so switching only affects
+    rows created afterwards.
     """
     id = models.UUIDField(
         primary_key=True,
-        default=uuid.uuid4,
+        default=default_uuid,
         editable=False
     )
 
     class Meta:
         abstract = True
+
+
+class OutboxEmail(models.Model):
+    """
+    Transactional email written in the same transaction as the request that
+    produced it, and delivered later by the `send_queued_mail` command.
+    """
+    STATUS_PENDING = 'PENDING'
+    STATUS_SENT = 'SENT'
+    STATUS_FAILED = 'FAILED'
+    STATUSES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    subject = models.TextField()
+    body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    reply_to = models.JSONField(default=list, blank=True)
+    headers = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=7, choices=STATUSES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+    class Meta:
+        verbose_name = "Outbox Email"
+        verbose_name_plural = "Outbox Emails"
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+
+class DataJob(models.Model):
+    """
+    Admin import or export run by the `run_data_jobs` worker instead of
+    inside the request. Input and output files live on the DATA_JOB_STORAGE
+    backend.
+
+    Imports run twice: first as a dry run, which ends in STATUS_REVIEW when
+    every row is valid, then for real once confirmed in the admin.
+    """
+    KIND_IMPORT = 'IMPORT'
+    KIND_EXPORT = 'EXPORT'
+    KINDS = [
+        (KIND_IMPORT, 'Import'),
+        (KIND_EXPORT, 'Export'),
+    ]
+
+    STATUS_PENDING = 'PENDING'
+    STATUS_RUNNING = 'RUNNING'
+    STATUS_REVIEW = 'REVIEW'
+    STATUS_DONE = 'DONE'
+    STATUS_FAILED = 'FAILED'
+    STATUSES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_REVIEW, 'Awaiting confirmation'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=6, choices=KINDS)
+    status = models.CharField(max_length=7, choices=STATUSES, default=STATUS_PENDING)
+    resource = models.CharField(max_length=255, help_text="Dotted path of the resource class.")
+    file_format = models.CharField(max_length=255, help_text="Dotted path of the import-export format class.")
+    encoding = models.CharField(max_length=32, blank=True)
+
+    # Imports: validate only, without writing.
+    dry_run = models.BooleanField(default=False)
+
+    # Exports: the changelist query parameters (filters, search, ordering),
+    # the selected primary keys if any, and the selected fields.
+    export_filters = models.JSONField(default=dict, blank=True)
+    export_pks = models.JSONField(null=True, blank=True)
+    export_fields = models.JSONField(null=True, blank=True)
+
+    input_file = models.FileField(upload_to='data_jobs/input/', storage=data_job_storage, blank=True)
+    output_file = models.FileField(upload_to='data_jobs/output/', storage=data_job_storage, blank=True)
+    filename = models.CharField(max_length=255, blank=True)
+
+    rows_total = models.PositiveBigIntegerField(null=True, blank=True)
+    rows_processed = models.PositiveBigIntegerField(default=0)
+    totals = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name='+'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Updated by the worker after every chunk; see reclaim_stale_jobs().
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.filename or self.resource} ({self.status})"
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return None
+        return ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+
+    @property
+    def throughput(self):
+        """
+        Rows per second since the job started.
+        """
+        elapsed = self.elapsed
+        if not elapsed:
+            return None
+        return self.rows_processed / elapsed
+
+    class Meta:
+        verbose_name = "Data Job"
+        verbose_name_plural = "Data Jobs"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+
+class ProfilingConfig(models.Model):
+    """
+    Admin-editable profiling switch, a single row. See core.profiling.
+    """
+    sample_rate = models.FloatField(
+        default=0.0,
+        validators=[MinValueValidator(0.0), MaxValueValidator(1.0)],
+        help_text="Share of requests to profile, from 0 (none) to 1 (all).",
+    )
+    path_prefix = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Only sample requests whose path starts with this, e.g. /auth/.",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Profiling: {self.sample_rate:.2%} of {self.path_prefix or 'all'} requests"
+
+    class Meta:
+        verbose_name = "Profiling Settings"
+        verbose_name_plural = "Profiling Settings"
+
+
+class RequestProfile(models.Model):
+    """
+    Stack samples of one profiled request, stored on PROFILE_STORAGE in the
+    folded format read by flamegraph.pl, speedscope and similar tools.
+    """
+    TRIGGER_HEADER = 'HEADER'
+    TRIGGER_SAMPLE = 'SAMPLE'
+    TRIGGERS = [
+        (TRIGGER_HEADER, 'Signed header'),
+        (TRIGGER_SAMPLE, 'Sample rate'),
+    ]
+
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=2048)
+    view_name = models.CharField(max_length=255, blank=True)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    samples = models.PositiveIntegerField()
+    trigger = models.CharField(max_length=6, choices=TRIGGERS)
+    file = models.FileField(upload_to='profiles/', storage=profile_storage)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+    class Meta:
+        verbose_name = "Request Profile"
+        verbose_name_plural = "Request Profiles"
+        ordering = ['-created_at']
@@ -0,0 +1,218 @@
+# core/pagination.py
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from core.db import estimate_count
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a composite ordering.
+
+    Each page is fetched with a WHERE clause on the last row of the previous
+    page instead of an OFFSET, so page 10 000 costs the same as page 1. The
+    ordering is taken from the queryset (so OrderingFilter applies), the
+    view's `ordering` attribute or the model Meta, and the primary key is
+    appended as a tie-breaker, e.g. ('-date_joined', 'id') for users.
+    Ordering fields must be non-nullable columns of the model itself.
+
+    Cursors are signed, so clients cannot forge positions or read them.
+    """
+    cursor_query_param = 'cursor'
+    cursor_query_description = _('The pagination cursor value.')
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    page_size_query_description = _('Number of results to return per page.')
+    max_page_size = 200
+    ordering = ('-pk',)
+    invalid_cursor_message = _('Invalid cursor')
+    cursor_salt = 'core.pagination.KeysetPagination'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.fields = self.get_ordering(queryset, view)
+
+        position, reverse = self.decode_cursor(request)
+        ordering = [f'-{name}' if desc != reverse else name for name, desc in self.fields]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(position, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        page = results[:self.page_size]
+        if reverse:
+            page.reverse()
+
+        # Going forward, a further page exists when we fetched an extra row,
+        # and a previous page exists when we arrived through a cursor. The
+        # other way round when walking backwards.
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = position is not None if not reverse else has_more
+        self.page = page
+        return page
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+            except (KeyError, ValueError):
+                pass
+            else:
+                if size > 0:
+                    return min(size, self.max_page_size) if self.max_page_size else size
+        return self.page_size
+
+    def get_ordering(self, queryset, view):
+        """
+        Return [(field_name, descending), ...] ending with the primary key.
+        """
+        ordering = (
+            queryset.query.order_by
+            or getattr(view, 'ordering', None)
+            or queryset.model._meta.ordering
+            or self.ordering
+        )
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        # Expressions such as F('x').desc() cannot be turned into a cursor.
+        ordering = [item for item in ordering if isinstance(item, str)] or self.ordering
+
+        pk_name = queryset.model._meta.pk.name
+        fields = []
+        for item in ordering:
+            name = item.lstrip('-')
+            fields.append((pk_name if name == 'pk' else name, item.startswith('-')))
+        if pk_name not in [name for name, _ in fields]:
+            fields.append((pk_name, fields[-1][1] if fields else False))
+        return fields
+
+    def seek_filter(self, position, reverse):
+        """
+        Rows strictly after `position` in the current direction:
+        (a > x) OR (a = x AND b > y) OR ...
+        """
+        clauses = []
+        for index, (name, desc) in enumerate(self.fields):
+            lookup = 'lt' if desc != reverse else 'gt'
+            equal = {prev: position[prev] for prev, _ in self.fields[:index]}
+            clauses.append(Q(**equal, **{f'{name}__{lookup}': position[name]}))
+        return reduce(or_, clauses)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            data = signing.loads(encoded, salt=self.cursor_salt)
+            values, reverse = data['v'], bool(data['r'])
+            names = [name for name, _ in self.fields]
+            if len(values) != len(names):
+                raise ValueError
+            position = {
+                name: self.model._meta.get_field(name).to_python(value)
+                for name, value in zip(names, values)
+            }
+        except (signing.BadSignature, KeyError, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, instance, reverse):
+        values = [
+            self.model._meta.get_field(name).value_to_string(instance)
+            for name, _ in self.fields
+        ]
+        encoded = signing.dumps({'v': values, 'r': int(reverse)}, salt=self.cursor_salt, compress=True)
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': str(self.cursor_query_description),
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': str(self.page_size_query_description),
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Django Paginator for admin changelists on large tables.
+
+    Above `threshold` rows the total comes from core.db.estimate_count
+    instead of SELECT COUNT(*). `estimated` tells whether it did; pass
+    exact=True to always count.
+    """
+
+    def __init__(self, *args, threshold=None, exact=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threshold = settings.ADMIN_ESTIMATED_COUNT_THRESHOLD if threshold is None else threshold
+        self.exact = exact
+        self.estimated = False
+
+    @cached_property
+    def count(self):
+        if not self.exact and hasattr(self.object_list, 'query'):
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate >= self.threshold:
+                self.estimated = True
+                return estimate
+        return super().count
@@ -0,0 +1,215 @@
+# core/profiling.py
+import logging
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+
+from core.models import ProfilingConfig, RequestProfile
+
+logger = logging.getLogger(__name__)
+
+TOKEN_SALT = 'core.profiling'
+CONFIG_KEY = 'profiling-config'
+
+# (monotonic expiry, sample rate, path prefix) of this process's copy of
+# the ProfilingConfig row.
+_config = (0.0, 0.0, '')
+
+
+def make_token():
+    """
+    Value of PROFILE_HEADER that gets requests profiled for the next
+    PROFILE_TOKEN_MAX_AGE seconds.
+    """
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign('profile')
+
+
+def is_valid_token(value):
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(value, max_age=settings.PROFILE_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def sampling_config():
+    """
+    (sample rate, path prefix) from the admin's ProfilingConfig, re-read
+    from the cache at most every PROFILE_CONFIG_TTL seconds.
+    """
+    global _config
+    expires_at, rate, prefix = _config
+    if time.monotonic() < expires_at:
+        return rate, prefix
+    config = cache.get(CONFIG_KEY)
+    if config is None:
+        config = ProfilingConfig.objects.order_by('pk').values_list('sample_rate', 'path_prefix').first()
+        config = config or (0.0, '')
+        cache.set(CONFIG_KEY, config, None)
+    rate, prefix = config
+    _config = (time.monotonic() + settings.PROFILE_CONFIG_TTL, rate, prefix)
+    return rate, prefix
+
+
+async def asampling_config():
+    """
+    sampling_config(), reading the cache off the event loop when this
+    process's copy expired.
+    """
+    expires_at, rate, prefix = _config
+    if time.monotonic() < expires_at:
+        return rate, prefix
+    return await sync_to_async(sampling_config)()
+
+
+def invalidate_sampling_config():
+    global _config
+    cache.delete(CONFIG_KEY)
+    _config = (0.0, 0.0, '')
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler: a background thread records the stack of one
+    thread every `interval` seconds, counting identical stacks.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self.fold(frame)] += 1
+
+    def fold(self, frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f'{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})')
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+    def folded(self):
+        """
+        One `root;...;leaf count` line per distinct stack.
+        """
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests carrying a valid PROFILE_HEADER (see make_token()), and
+    a share of the others set in the admin's ProfilingConfig, and store the
+    profiles as RequestProfiles.
+
+    Requests that are not profiled cost a header lookup and a clock read.
+    Only the thread serving the request is sampled. Under ASGI, a profiled
+    request continues on a worker thread, where the sync middleware and
+    views below run and are sampled; requests that are not profiled stay
+    on the event loop.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        trigger = self.get_trigger(request, sampling_config())
+        if trigger is None:
+            return self.get_response(request)
+
+        response, profiler, duration_ms = self.profile(request, self.get_response)
+        profile = self.save_profile(request, response, profiler, duration_ms, trigger)
+        return self.add_profile_id(response, profile, trigger)
+
+    async def __acall__(self, request):
+        trigger = self.get_trigger(request, await asampling_config())
+        if trigger is None:
+            return await self.get_response(request)
+
+        response, profiler, duration_ms = await sync_to_async(self.profile)(
+            request, async_to_sync(self.get_response),
+        )
+        # A database write and a storage upload.
+        profile = await sync_to_async(self.save_profile)(request, response, profiler, duration_ms, trigger)
+        return self.add_profile_id(response, profile, trigger)
+
+    def profile(self, request, get_response):
+        """
+        (response, profiler, duration in ms) of get_response(request),
+        sampling the current thread.
+        """
+        profiler = SamplingProfiler(threading.get_ident(), settings.PROFILE_INTERVAL)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            response = get_response(request)
+        finally:
+            profiler.stop()
+        return response, profiler, (time.perf_counter() - started) * 1000
+
+    def get_trigger(self, request, config):
+        token = request.headers.get(settings.PROFILE_HEADER)
+        if token and is_valid_token(token):
+            return RequestProfile.TRIGGER_HEADER
+        rate, prefix = config
+        if rate and request.path.startswith(prefix) and random.random() < rate:
+            return RequestProfile.TRIGGER_SAMPLE
+        return None
+
+    def add_profile_id(self, response, profile, trigger):
+        if profile is not None and trigger == RequestProfile.TRIGGER_HEADER:
+            response['X-Profile-Id'] = str(profile.pk)
+        return response
+
+    def save_profile(self, request, response, profiler, duration_ms, trigger):
+        match = request.resolver_match
+        try:
+            profile = RequestProfile(
+                method=request.method[:10],
+                path=request.path[:2048],
+                view_name=match.view_name if match else '',
+                status_code=response.status_code,
+                duration_ms=duration_ms,
+                samples=profiler.samples,
+                trigger=trigger,
+            )
+            profile.file.save(f'{uuid.uuid4().hex}.folded', ContentFile(profiler.folded().encode()), save=False)
+            profile.save()
+            return profile
+        except Exception as e:
+            # Profiling must never fail the request.
+            logger.error(f"Could not store the profile of {request.method} {request.path}: {e}")
+            return None
@@ -0,0 +1,327 @@
+# core/resources.py
+import codecs
+import csv
+import io
+import uuid
+from itertools import islice
+
+import tablib
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from import_export import resources, widgets
+from import_export.formats import base_formats
+from import_export.instance_loaders import CachedInstanceLoader
+from import_export.results import RowResult
+
+from config.routers import read_replica
+
+try:
+    from openpyxl import Workbook, load_workbook
+except ImportError:  # XLSX support is optional (tablib[xlsx])
+    Workbook = load_workbook = None
+
+DELIMITERS = {
+    base_formats.CSV: ',',
+    base_formats.TSV: '\t',
+}
+
+
+class Echo:
+    """
+    Pseudo file for csv.writer: write() hands the formatted line back.
+    """
+
+    def write(self, value):
+        return value
+
+
+def is_text_streamable(file_format):
+    return type(file_format) in DELIMITERS
+
+
+def is_streamable(file_format):
+    """
+    Whether ChunkedModelResource can write `file_format` row by row.
+    """
+    if is_text_streamable(file_format):
+        return True
+    return isinstance(file_format, base_formats.XLSX) and Workbook is not None
+
+
+class UUIDWidget(widgets.Widget):
+    """
+    Reads UUIDs as uuid.UUID rather than text, so imported UUID primary keys
+    match the rows loaded by the instance loader.
+    """
+
+    def clean(self, value, row=None, **kwargs):
+        if value in (None, ''):
+            return None
+        return uuid.UUID(str(value))
+
+
+class ChunkedModelResource(resources.ModelResource):
+    """
+    ModelResource that never holds a whole table in memory.
+
+    Exports iterate the queryset with .iterator(chunk_size=...) and write
+    each row as soon as it is rendered, instead of building a tablib
+    Dataset. Imports run in chunks of Meta.batch_size rows; each chunk is
+    validated, then written with bulk_create / bulk_update in its own
+    transaction, so a bad chunk only rolls back itself. Single-field
+    uniqueness is checked once per chunk and field rather than once per
+    row: a row taking a value already used in the database or earlier in
+    the chunk is invalid. Other constraints are left to the database; a
+    chunk whose bulk write fails is counted as errors in the totals.
+
+    Bulk writes skip save() and model signals.
+    """
+    WIDGETS_MAP = {**resources.ModelResource.WIDGETS_MAP, 'UUIDField': UUIDWidget}
+
+    class Meta:
+        use_bulk = True
+        batch_size = settings.IMPORT_EXPORT_BATCH_SIZE
+        skip_diff = True
+        clean_model_instances = True
+        instance_loader_class = CachedInstanceLoader
+
+    def import_field(self, field, instance, row, is_m2m=False, **kwargs):
+        # A blank primary key keeps the one generated for a new row.
+        if field.attribute == self._meta.model._meta.pk.name and row.get(field.column_name) in (None, ''):
+            return
+        super().import_field(field, instance, row, is_m2m, **kwargs)
+
+    def get_unique_fields(self):
+        """
+        [(resource field, model field)] for the imported model fields with
+        unique=True, other than the primary key.
+        """
+        model_fields = {
+            field.name: field for field in self._meta.model._meta.concrete_fields
+            if field.unique and not field.primary_key
+        }
+        return [
+            (field, model_fields[field.attribute])
+            for field in self.get_import_fields()
+            if field.attribute in model_fields
+        ]
+
+    def before_import(self, dataset, **kwargs):
+        super().before_import(dataset, **kwargs)
+        # Unique value -> pk of the row holding it, for each unique field:
+        # rows of the database found with one query, then the chunk's own.
+        self.unique_values = {}
+        for field, model_field in self.get_unique_fields():
+            if field.column_name not in dataset.headers:
+                continue
+            values = set()
+            for row in dataset.dict:
+                try:
+                    value = field.clean(row)
+                except Exception:
+                    # Reported by the row's own import.
+                    continue
+                if value not in model_field.empty_values:
+                    values.add(value)
+            taken = {}
+            if values:
+                taken = dict(
+                    self._meta.model._default_manager
+                    .filter(**{f'{model_field.name}__in': values})
+                    .values_list(model_field.attname, 'pk')
+                )
+            self.unique_values[model_field] = taken
+
+    def validate_instance(self, instance, import_validation_errors=None, validate_unique=False):
+        errors = dict(import_validation_errors or {})
+        if self._meta.clean_model_instances:
+            try:
+                instance.full_clean(
+                    exclude=errors.keys(),
+                    validate_unique=validate_unique,
+                    validate_constraints=validate_unique,
+                )
+            except ValidationError as e:
+                errors = e.update_error_dict(errors)
+
+        unique_values = getattr(self, 'unique_values', {})
+        claimed = []
+        for model_field, taken in unique_values.items():
+            value = getattr(instance, model_field.attname)
+            if model_field.name in errors or value in model_field.empty_values:
+                continue
+            owner = taken.get(value)
+            if owner is not None and owner != instance.pk:
+                errors[model_field.name] = [
+                    instance.unique_error_message(type(instance), (model_field.name,)),
+                ]
+            else:
+                claimed.append((taken, value))
+        if errors:
+            raise ValidationError(errors)
+        for taken, value in claimed:
+            taken[value] = instance.pk
+
+    # Export
+
+    def iter_export_rows(self, queryset=None, export_fields=None, **kwargs):
+        """
+        Yield the header row, then one rendered row per object.
+
+        before_export() and after_export() are not called, as there is no
+        Dataset to hand them.
+        """
+        if queryset is None:
+            queryset = self.get_queryset()
+        queryset = self.filter_export(queryset, **kwargs)
+        if queryset._db is None:
+            # Exports read whole tables: keep them off the primary.
+            queryset = queryset.using(read_replica())
+        yield self.get_export_headers(selected_fields=export_fields)
+        for obj in self.iter_queryset(queryset):
+            yield self.export_resource(obj, selected_fields=export_fields, **kwargs)
+
+    def stream_export(self, file_format, queryset=None, encoding=None, **kwargs):
+        """
+        Yield a CSV or TSV export as encoded byte chunks of
+        get_chunk_size() rows, for a StreamingHttpResponse.
+        """
+        rows = self.iter_export_rows(queryset, **kwargs)
+        return self.encode_rows(rows, file_format, encoding)
+
+    def encode_rows(self, rows, file_format, encoding=None):
+        writer = csv.writer(Echo(), delimiter=DELIMITERS[type(file_format)])
+        # An incremental encoder writes a utf-8-sig BOM once, not per chunk.
+        encoder = codecs.getincrementalencoder(encoding or 'utf-8')()
+        chunk_size = self.get_chunk_size()
+        lines = []
+        for row in rows:
+            lines.append(writer.writerow(row))
+            if len(lines) >= chunk_size:
+                yield encoder.encode(''.join(lines))
+                lines = []
+        yield encoder.encode(''.join(lines), final=True)
+
+    def export_to_file(self, fileobj, file_format, queryset=None, encoding=None, progress=None, **kwargs):
+        """
+        Write an export to the binary file object `fileobj` and return the
+        number of data rows written. `progress(rows)` is called after every
+        get_chunk_size() rows.
+        """
+        if not is_streamable(file_format):
+            raise ValueError(f"{file_format.get_title()} cannot be exported in chunks")
+
+        written = 0
+        chunk_size = self.get_chunk_size()
+
+        def counted(rows):
+            nonlocal written
+            for row in rows:
+                yield row
+                written += 1
+                if progress is not None and written > 1 and (written - 1) % chunk_size == 0:
+                    progress(written - 1)
+
+        rows = counted(self.iter_export_rows(queryset, **kwargs))
+        if is_text_streamable(file_format):
+            for chunk in self.encode_rows(rows, file_format, encoding):
+                fileobj.write(chunk)
+        else:
+            # A write-only workbook flushes rows to a temporary file as they
+            # are appended.
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet()
+            for row in rows:
+                sheet.append(row)
+            workbook.save(fileobj)
+        # The header row is not a data row.
+        return max(written - 1, 0)
+
+    # Import
+
+    def iter_file_rows(self, fileobj, file_format, encoding='utf-8-sig'):
+        """
+        Yield the rows of an import file, header first. CSV, TSV and XLSX
+        files are read incrementally; other formats go through tablib.
+        """
+        if is_text_streamable(file_format):
+            text = io.TextIOWrapper(fileobj, encoding=encoding, newline='')
+            try:
+                yield from csv.reader(text, delimiter=DELIMITERS[type(file_format)])
+            finally:
+                text.detach()
+        elif is_streamable(file_format):
+            workbook = load_workbook(fileobj, read_only=True, data_only=True)
+            try:
+                for row in workbook.active.iter_rows(values_only=True):
+                    yield list(row)
+            finally:
+                workbook.close()
+        else:
+            dataset = file_format.create_dataset(fileobj.read())
+            yield dataset.headers
+            yield from dataset
+
+    def import_rows(self, rows, dry_run=False, raise_errors=False, progress=None, **kwargs):
+        """
+        Import an iterable of rows, header first, one chunk of
+        Meta.batch_size rows per import_data() call and transaction.
+        `progress(rows)` is called after every chunk.
+
+        Returns a single Result with the combined totals. Only rows that
+        failed are kept in it, with their numbers counted from the start of
+        the file.
+        """
+        result = self.get_result_class()()
+        result.diff_headers = self.get_diff_headers()
+        rows = iter(rows)
+        headers = next(rows, None)
+        if not headers:
+            return result
+
+        offset = 0
+        while chunk := list(islice(rows, self._meta.batch_size)):
+            dataset = tablib.Dataset(*chunk, headers=headers)
+            chunk_result = self.import_data(
+                dataset,
+                dry_run=dry_run,
+                raise_errors=raise_errors,
+                use_transactions=True,
+                **kwargs,
+            )
+            self.merge_result(result, chunk_result, offset)
+            offset += len(chunk)
+            if progress is not None:
+                progress(offset)
+        return result
+
+    def import_file(self, fileobj, file_format, encoding='utf-8-sig', **kwargs):
+        """
+        import_rows() over iter_file_rows().
+        """
+        rows = self.iter_file_rows(fileobj, file_format, encoding=encoding)
+        return self.import_rows(rows, **kwargs)
+
+    def merge_result(self, result, chunk_result, offset):
+        result.total_rows += chunk_result.total_rows
+        totals = dict(chunk_result.totals)
+        if chunk_result.has_errors():
+            # The chunk's transaction was rolled back: none of its rows
+            # were written.
+            for import_type in (RowResult.IMPORT_TYPE_NEW, RowResult.IMPORT_TYPE_UPDATE, RowResult.IMPORT_TYPE_DELETE):
+                totals[RowResult.IMPORT_TYPE_ERROR] += totals.pop(import_type)
+        for import_type, count in totals.items():
+            result.totals[import_type] += count
+        result.base_errors.extend(chunk_result.base_errors)
+        for row_result in chunk_result.rows:
+            if row_result.errors:
+                for error in row_result.errors:
+                    if error.number is not None:
+                        error.number += offset
+                result.rows.append(row_result)
+        for invalid_row in chunk_result.invalid_rows:
+            invalid_row.number += offset
+            result.invalid_rows.append(invalid_row)
+        for error_row in chunk_result.error_rows:
+            error_row.number += offset
+            result.error_rows.append(error_row)
@@ -0,0 +1,98 @@
+# core/search.py
+from functools import reduce
+from operator import and_, or_
+
+from django.contrib.admin.utils import lookup_spawns_duplicates
+from django.db.models import Q
+from django.utils.text import smart_split, unescape_string_literal
+from rest_framework.filters import SearchFilter
+
+# pg_trgm cannot extract a trigram from shorter terms, so a substring search
+# on them scans the whole index; they are matched as prefixes instead.
+MIN_SUBSTRING_TERM_LENGTH = 3
+
+# search_fields prefixes of ModelAdmin and DRF's SearchFilter
+LOOKUP_PREFIXES = {
+    '^': 'istartswith',
+    '=': 'iexact',
+    '@': 'search',
+    '$': 'iregex',
+}
+
+
+def get_search_terms(search_term):
+    """
+    Split a search string the way the Django admin does, keeping quoted
+    phrases together.
+    """
+    terms = []
+    for bit in smart_split(search_term):
+        if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+            bit = unescape_string_literal(bit)
+        if bit:
+            terms.append(bit)
+    return terms
+
+
+def trigram_search(queryset, search_fields, search_term):
+    """
+    Filter `queryset` so that every term matches at least one of
+    `search_fields`.
+
+    Terms of three characters or more use `icontains`, which PostgreSQL
+    runs as UPPER(col::text) LIKE UPPER('%term%') and answers from the
+    gin_trgm_ops expression indexes created for those columns. Shorter terms
+    use `istartswith`. Prefixed fields use the lookup of their prefix, as in
+    ModelAdmin.search_fields and DRF's SearchFilter: '^' prefix, '='
+    exact, '@' full-text search and '$' regex.
+    """
+    terms = get_search_terms(search_term)
+    if not terms or not search_fields:
+        return queryset
+
+    term_filters = []
+    for term in terms:
+        clauses = []
+        for field in search_fields:
+            if field[:1] in LOOKUP_PREFIXES:
+                lookup = f'{field[1:]}__{LOOKUP_PREFIXES[field[:1]]}'
+            elif len(term) < MIN_SUBSTRING_TERM_LENGTH:
+                lookup = f'{field}__istartswith'
+            else:
+                lookup = f'{field}__icontains'
+            clauses.append(Q(**{lookup: term}))
+        term_filters.append(reduce(or_, clauses))
+    return queryset.filter(reduce(and_, term_filters))
+
+
+class TrigramSearchMixin:
+    """
+    ModelAdmin mixin that replaces the changelist search with
+    trigram_search over `search_fields`.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        search_fields = self.get_search_fields(request)
+        queryset = trigram_search(queryset, search_fields, search_term)
+        may_have_duplicates = bool(search_term.strip()) and any(
+            lookup_spawns_duplicates(self.opts, field.lstrip(''.join(LOOKUP_PREFIXES)))
+            for field in search_fields
+        )
+        return queryset, may_have_duplicates
+
+
+class TrigramSearchFilter(SearchFilter):
+    """
+    DRF counterpart of TrigramSearchMixin, driven by the view's
+    `search_fields` and the `search` query parameter.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_term = request.query_params.get(self.search_param, '')
+        if not search_fields or not get_search_terms(search_term):
+            return queryset
+        queryset = trigram_search(queryset, search_fields, search_term)
+        if self.must_call_distinct(queryset, search_fields):
+            queryset = queryset.distinct()
+        return queryset
@@ -0,0 +1,136 @@
+# core/signals.py
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from core.authentication import invalidate_user_snapshot
+from core.backends.auth import bump_permission_versions
+from core.db import record_connection_created
+from core.metrics import record_query
+from core.models import ProfilingConfig
+from core.profiling import invalidate_sampling_config
+from core.tokens import blacklist_filter
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def publish_blacklisted_token(sender, instance, created, **kwargs):
+    """
+    Add newly blacklisted tokens to the JWT blacklist filter of every
+    process.
+
+    If the token cannot be published, a new filter epoch makes every
+    process rebuild from the database. If the cache cannot be reached at
+    all, the other processes' checks fail too and use the database.
+    """
+    if not created or not blacklist_filter.enabled:
+        return
+    try:
+        blacklist_filter.record(instance.token.jti)
+    except Exception as e:
+        logger.error(f"Could not publish blacklisted token {instance.token_id}, invalidating the filters: {e}")
+        try:
+            blacklist_filter.invalidate()
+        except Exception as e:
+            logger.critical(f"Could not invalidate the JWT blacklist filters: {e}")
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def drop_user_snapshot(sender, instance, **kwargs):
+    """
+    Drop the cached API authentication snapshot of a saved or deleted user.
+    """
+    invalidate_user_snapshot(instance.pk)
+
+
+def changed_pks(field, instance, action, reverse, pk_set):
+    """
+    Primary keys on the side of the many-to-many `field`'s model whose
+    relation an m2m_changed signal reports changed, from either side.
+    """
+    if not reverse:
+        return [instance.pk] if action in ('post_add', 'post_remove', 'post_clear') else []
+    if action in ('post_add', 'post_remove'):
+        return list(pk_set)
+    if action == 'pre_clear':
+        # pk_set is not sent for clear(); collect the rows beforehand.
+        return list(getattr(instance, field.remote_field.get_accessor_name()).values_list('pk', flat=True))
+    return []
+
+
+def permissions_changed(user_ids):
+    bump_permission_versions(user_ids)
+    for user_id in user_ids:
+        invalidate_user_snapshot(user_id)
+
+
+def group_member_ids(group_ids):
+    return list(
+        User.groups.through.objects.filter(group_id__in=group_ids)
+        .values_list('user_id', flat=True).distinct()
+    )
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def user_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Expire the cached permissions and snapshots of users whose groups or
+    direct permissions changed.
+    """
+    field = User.groups.field if sender is User.groups.through else User.user_permissions.field
+    permissions_changed(changed_pks(field, instance, action, reverse, pk_set))
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Expire the cached permissions and snapshots of the members of groups
+    whose permissions changed.
+    """
+    group_ids = changed_pks(Group.permissions.field, instance, action, reverse, pk_set)
+    if group_ids:
+        permissions_changed(group_member_ids(group_ids))
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    # The memberships go with the group without an m2m_changed signal.
+    permissions_changed(group_member_ids([instance.pk]))
+
+
+@receiver(post_save, sender=ProfilingConfig)
+@receiver(post_delete, sender=ProfilingConfig)
+def profiling_config_changed(sender, **kwargs):
+    # Other processes pick the change up within PROFILE_CONFIG_TTL.
+    invalidate_sampling_config()
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    """
+    Count connections handed to Django. With the psycopg pool the signal is
+    sent on every checkout, so connection_stats() takes the connections the
+    pool actually opened from the pool's own counters.
+    """
+    record_connection_created(connection.alias)
+
+
+@receiver(connection_created)
+def instrument_queries(sender, connection, **kwargs):
+    """
+    Time the queries of requests sampled by InstrumentationMiddleware. The
+    wrapper stays on the connection object across reconnections.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
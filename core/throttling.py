@@ -0,0 +1,97 @@
+# core/throttling.py
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import ScopedRateThrottle
+
+THROTTLE_KEY = 'throttle:{scope}:{ident}:{window}'
+
+
+def hash_ident(value):
+    return hashlib.blake2b(value.encode(), digest_size=12).hexdigest()
+
+
+class SlidingWindowThrottle(ScopedRateThrottle):
+    """
+    Limit views with a `throttle_scope` to the scope's DEFAULT_THROTTLE_RATES,
+    separately for the client IP and for the account the request names
+    (its `email`, or the `uid` of a password reset), so spreading attempts
+    over many IPs or many accounts does not get around the limit.
+
+    Counts live in THROTTLE_CACHE as one counter per identity and window.
+    The count over the last `duration` seconds is estimated from the current
+    window's counter plus the previous one's, weighted by how much of it
+    still overlaps. A check is one incr() per identity, which must be atomic
+    on the backend storing the counters (system check core.E002); the
+    previous counters no longer change and are read from the local tier. Rejected
+    requests count too, so a client has to actually slow down to get
+    through again.
+    """
+
+    @property
+    def THROTTLE_RATES(self):
+        # Read on each request rather than at import, so overridden settings apply.
+        return api_settings.DEFAULT_THROTTLE_RATES
+
+    def get_identities(self, request, view):
+        data = request.data if hasattr(request.data, 'get') else {}
+        identities = [f'ip:{self.get_ident(request)}']
+        email = data.get('email')
+        if email:
+            identities.append(f'email:{hash_ident(str(email).strip().lower())}')
+        uid = view.kwargs.get('uidb64') or data.get('uid')
+        if uid:
+            identities.append(f'uid:{hash_ident(str(uid))}')
+        return identities
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope or self.scope not in self.THROTTLE_RATES:
+            return True
+        self.rate = self.get_rate()
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        cache = caches[settings.THROTTLE_CACHE]
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        self.elapsed = (self.now % self.duration) / self.duration
+
+        identities = self.get_identities(request, view)
+        previous = cache.get_many([
+            THROTTLE_KEY.format(scope=self.scope, ident=ident, window=window - 1)
+            for ident in identities
+        ])
+        self.estimate = self.previous_count = 0
+        for ident in identities:
+            count = self.increment(cache, THROTTLE_KEY.format(scope=self.scope, ident=ident, window=window))
+            previous_count = previous.get(THROTTLE_KEY.format(scope=self.scope, ident=ident, window=window - 1), 0)
+            estimate = previous_count * (1 - self.elapsed) + count
+            if estimate > self.estimate:
+                self.estimate, self.count, self.previous_count = estimate, count, previous_count
+        return self.estimate <= self.num_requests
+
+    def increment(self, cache, key):
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # First request of the window. Counters outlive it by one window
+            # to serve as the previous one.
+            if cache.add(key, 1, self.duration * 2):
+                return 1
+            return cache.incr(key)
+
+    def wait(self):
+        """
+        Seconds until the estimate is back under the limit, assuming no
+        further requests.
+        """
+        remaining = self.num_requests - self.count
+        if remaining > 0 and self.previous_count:
+            # The previous window's weight decays as the current one goes on.
+            return max(0.0, (1 - remaining / self.previous_count - self.elapsed) * self.duration)
+        # Wait for the next window, then for this one's weight to decay.
+        return (1 - self.elapsed + max(0.0, 1 - self.num_requests / self.count)) * self.duration
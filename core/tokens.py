@@ -0,0 +1,295 @@
+# core/tokens.py
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from core.backends.cache import TieredCache
+from core.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+SEQUENCE_KEY = 'jwt-blacklist:seq'
+EPOCH_KEY = 'jwt-blacklist:epoch'
+SNAPSHOT_KEY = 'jwt-blacklist:snapshot'
+REBUILD_LOCK_KEY = 'jwt-blacklist:rebuild'
+ENTRY_KEY = 'jwt-blacklist:entry:{}'
+
+# Log entries re-read after a rebuild, for blacklistings whose transaction
+# had not committed yet when the table was read.
+REBUILD_OVERLAP = 1000
+# Further behind than this, load the shared snapshot instead of replaying.
+MAX_REPLAY = 10_000
+# Seconds a missing log entry is waited for before it is considered lost.
+GAP_TIMEOUT = 5
+
+
+def is_shared_cache(cache):
+    # Files have no atomic incr() and the tiered cache's local copies would
+    # hide new log entries.
+    return not isinstance(cache, (LocMemCache, DummyCache, FileBasedCache, TieredCache))
+
+
+class BlacklistFilter:
+    """
+    Per-process Bloom filter of blacklisted refresh token JTIs.
+
+    A JTI missing from the filter is certainly not blacklisted, so the
+    BlacklistedToken lookup is only needed for the ~0.1% of tokens it
+    cannot rule out. Processes stay in sync through the JWT_BLACKLIST_CACHE
+    cache: every blacklisting increments a sequence number and stores the
+    JTI under it, and each check replays the entries it has not seen yet.
+    The filter is rebuilt from the database every
+    JWT_BLACKLIST_FILTER_REBUILD_AFTER seconds to drop expired tokens, and
+    the result is shared as a snapshot so only one process has to.
+
+    The log belongs to an epoch. A new epoch, after a cache flush or from
+    invalidate() when a JTI could not be published, makes every process
+    rebuild its filter from the database before trusting it again.
+    """
+
+    def __init__(self):
+        self.bloom = None
+        self.seq = 0
+        self.epoch = None
+        self.built_at = 0.0
+        self.gap_since = None
+        self.lock = threading.RLock()
+
+    @property
+    def cache(self):
+        return caches[settings.JWT_BLACKLIST_CACHE]
+
+    @property
+    def enabled(self):
+        """
+        'on' always uses the filter, 'shared' only with a cache every worker
+        process sees (a LocMemCache would hide other processes'
+        blacklistings), 'off' never.
+        """
+        mode = settings.JWT_BLACKLIST_FILTER
+        if mode == 'shared':
+            return is_shared_cache(self.cache)
+        return mode == 'on'
+
+    def record(self, jti):
+        """
+        Publish a newly blacklisted JTI to every process.
+        """
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+        cache = self.cache
+        try:
+            seq = cache.incr(SEQUENCE_KEY)
+        except ValueError:
+            cache.add(SEQUENCE_KEY, 0, timeout=None)
+            seq = cache.incr(SEQUENCE_KEY)
+        cache.set(ENTRY_KEY.format(seq), jti, timeout=settings.JWT_BLACKLIST_FILTER_REBUILD_AFTER)
+
+    def invalidate(self):
+        """
+        Start a new epoch, so every process rebuilds its filter from the
+        database on its next check.
+        """
+        self.cache.set(EPOCH_KEY, uuid.uuid4().hex, timeout=None)
+
+    def might_be_blacklisted(self, jti):
+        with self.lock:
+            self.sync()
+            return jti in self.bloom
+
+    def reset(self):
+        with self.lock:
+            self.bloom = None
+            self.seq = 0
+            self.epoch = None
+            self.built_at = 0.0
+            self.gap_since = None
+
+    def current_epoch(self):
+        epoch = self.cache.get(EPOCH_KEY)
+        if epoch is None:
+            # First use, or the cache was flushed with the log in it.
+            self.cache.add(EPOCH_KEY, uuid.uuid4().hex, timeout=None)
+            epoch = self.cache.get(EPOCH_KEY)
+        return epoch
+
+    def sync(self):
+        epoch = self.current_epoch()
+        if epoch != self.epoch:
+            self.load(epoch)
+            return
+        seq = self.cache.get(SEQUENCE_KEY, 0)
+        if (
+            self.bloom is None
+            or time.time() - self.built_at > settings.JWT_BLACKLIST_FILTER_REBUILD_AFTER
+            or self.bloom.count > self.bloom.capacity
+            or seq < self.seq  # the cache was flushed
+            or seq - self.seq > MAX_REPLAY
+        ):
+            self.load(epoch)
+            return
+        self.replay(seq)
+
+    def replay(self, seq):
+        if seq <= self.seq:
+            return
+        keys = [ENTRY_KEY.format(n) for n in range(self.seq + 1, seq + 1)]
+        entries = self.cache.get_many(keys)
+        first_gap = None
+        for n, key in enumerate(keys, self.seq + 1):
+            if key in entries:
+                self.bloom.add(entries[key])
+            elif first_gap is None:
+                first_gap = n
+        if first_gap is None:
+            self.seq = seq
+            self.gap_since = None
+            return
+
+        # Usually a writer between incr() and set(); the entries after it
+        # are applied already and read again once the gap is filled.
+        self.seq = first_gap - 1
+        now = time.monotonic()
+        if self.gap_since is None:
+            self.gap_since = now
+        elif now - self.gap_since > GAP_TIMEOUT:
+            logger.warning(f"JWT blacklist log entry {first_gap} is missing, rebuilding the filter")
+            self.rebuild(self.epoch)
+
+    def load(self, epoch):
+        snapshot = self.cache.get(SNAPSHOT_KEY)
+        if (
+            snapshot is not None
+            and snapshot['epoch'] == epoch
+            and (snapshot['built_at'] > self.built_at or epoch != self.epoch)
+            and time.time() - snapshot['built_at'] <= settings.JWT_BLACKLIST_FILTER_REBUILD_AFTER
+            and snapshot['bloom']['count'] <= snapshot['bloom']['capacity']
+        ):
+            self.bloom = BloomFilter.from_dict(snapshot['bloom'])
+            self.seq = snapshot['seq']
+            self.epoch = epoch
+            self.built_at = snapshot['built_at']
+            self.replay(self.cache.get(SEQUENCE_KEY, 0))
+            return
+        if (
+            self.bloom is not None
+            and epoch == self.epoch
+            and not self.cache.add(REBUILD_LOCK_KEY, 1, timeout=60)
+        ):
+            # Another process is rebuilding; the current filter stays correct.
+            self.replay(self.cache.get(SEQUENCE_KEY, 0))
+            return
+        self.rebuild(epoch)
+
+    def rebuild(self, epoch):
+        started = time.perf_counter()
+        seq = self.cache.get(SEQUENCE_KEY, 0)
+        jtis = BlacklistedToken.objects.filter(
+            token__expires_at__gt=timezone.now(),
+        ).values_list('token__jti', flat=True)
+
+        bloom = BloomFilter(
+            max(settings.JWT_BLACKLIST_FILTER_CAPACITY, 2 * jtis.count()),
+            settings.JWT_BLACKLIST_FILTER_ERROR_RATE,
+        )
+        for jti in jtis.iterator(chunk_size=10_000):
+            bloom.add(jti)
+        overlap = [ENTRY_KEY.format(n) for n in range(max(seq - REBUILD_OVERLAP, 0) + 1, seq + 1)]
+        for jti in self.cache.get_many(overlap).values():
+            bloom.add(jti)
+
+        self.bloom = bloom
+        self.seq = seq
+        self.epoch = epoch
+        self.built_at = time.time()
+        self.gap_since = None
+        self.cache.set(
+            SNAPSHOT_KEY,
+            {'epoch': epoch, 'seq': seq, 'built_at': self.built_at, 'bloom': bloom.to_dict()},
+            timeout=settings.JWT_BLACKLIST_FILTER_REBUILD_AFTER,
+        )
+        self.cache.delete(REBUILD_LOCK_KEY)
+        logger.info(
+            f"JWT blacklist filter rebuilt with {len(bloom)} tokens "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+
+blacklist_filter = BlacklistFilter()
+
+
+def is_blacklisted(jti):
+    """
+    Whether a token JTI is blacklisted, asking the database only when the
+    Bloom filter cannot rule it out (or the cache is unavailable).
+    """
+    if blacklist_filter.enabled:
+        try:
+            if not blacklist_filter.might_be_blacklisted(jti):
+                return False
+        except Exception as e:
+            logger.warning(f"JWT blacklist filter unavailable, using the database: {e}")
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    RefreshToken whose blacklist check goes through the Bloom filter.
+    """
+
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+
+def prune_expired_tokens(batch_size=None, pause=0, before=None):
+    """
+    Delete outstanding tokens that expired before `before` (now by
+    default), with their blacklist entries, `batch_size` rows per
+    transaction so no lock is held for long. Sleeps `pause` seconds between
+    batches to leave room for other writers.
+
+    Returns {'outstanding': n, 'blacklisted': n, 'batches': n}.
+    """
+    batch_size = batch_size or settings.TOKEN_PRUNE_BATCH_SIZE
+    before = before or timezone.now()
+    outstanding_label = OutstandingToken._meta.label
+    blacklisted_label = BlacklistedToken._meta.label
+    totals = {'outstanding': 0, 'blacklisted': 0, 'batches': 0}
+
+    while True:
+        with transaction.atomic():
+            ids = list(
+                OutstandingToken.objects.filter(expires_at__lte=before)
+                .order_by()
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            # The cascade removes the blacklist entries with one DELETE, as
+            # neither model has delete signals; only() keeps the token
+            # bodies out of the collector's SELECT.
+            _, deleted = OutstandingToken.objects.filter(pk__in=ids).only('pk').delete()
+        totals['outstanding'] += deleted.get(outstanding_label, 0)
+        totals['blacklisted'] += deleted.get(blacklisted_label, 0)
+        totals['batches'] += 1
+        if len(ids) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return totals
@@ -0,0 +1,8 @@
+# core/urls.py
+from django.urls import path
+
+from core import views
+
+urlpatterns = [
+    path('metrics', views.metrics, name='metrics'),
+]
@@ -0,0 +1,21 @@
+# core/views.py
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from core.metrics import render_metrics
+
+
+@require_GET
+def metrics(request):
+    """
+    Request, query, cache and outbound HTTP metrics of all processes, in the
+    Prometheus text format, for scrapers presenting METRICS_TOKEN.
+    """
+    if not settings.METRICS_TOKEN:
+        if not settings.DEBUG:
+            raise Http404
+    elif not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {settings.METRICS_TOKEN}'):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')